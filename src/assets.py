@@ -0,0 +1,427 @@
+""" Módulo responsável pelo carregamento e cache das imagens, sons, fontes
+    e textos renderizados do jogo.
+
+    Quando existe um atlas gerado por `python -m atlas`, as imagens são
+    recortadas (`subsurface`) das poucas folhas dele em vez de lidas uma a
+    uma do disco; as que não estão no atlas, ou mudaram depois dele, continuam
+    sendo lidas dos arquivos.
+
+    Os arquivos também podem ser lidos e decodificados antecipadamente, em
+    threads (`prefetch_image`, `prefetch_sound`, `prefetch_font`): as telas
+    pedem os arquivos que vão usar antes de serem exibidas (ver
+    `Screen.prefetch`), e o primeiro acesso depois disso apenas recolhe o
+    resultado, sem ler o disco durante a transição.
+"""
+
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+import json
+import pygame
+from pygame import Surface
+from pygame.font import Font
+
+
+game_dir = Path(__file__).parent.parent
+assets_dir = game_dir / "assets"
+sounds_dir = game_dir / "sounds"
+
+# Diretório, relativo à raiz das imagens, e manifesto do atlas (ver `atlas`)
+ATLAS_DIR = "atlas"
+ATLAS_MANIFEST = "atlas.json"
+ATLAS_VERSION = 1
+
+Size = tuple[int, int]
+
+# Quantidade máxima de textos renderizados mantidos em cache
+MAX_TEXTS = 256
+
+# Threads que leem e decodificam os arquivos pedidos antecipadamente. A
+# decodificação de PNG e WAV acontece fora do GIL, em C
+LOADER_THREADS = 4
+loader_executor = ThreadPoolExecutor(max_workers=LOADER_THREADS, thread_name_prefix="assets")
+
+
+class AssetRegistry:
+    """ Registro central das imagens do jogo. Cada arquivo é lido do disco uma
+        única vez e as versões redimensionadas ficam guardadas por
+        (nome, tamanho), de forma que todas as cartas, entidades e telas que
+        usam a mesma imagem compartilham a mesma `Surface`.
+
+        Sons são carregados uma vez por arquivo, fontes uma vez por
+        (arquivo, tamanho) e os textos renderizados ficam em um cache LRU de
+        tamanho limitado, indexado por (fonte, texto, cor).
+
+        Os métodos `prefetch_*` enviam a leitura de um arquivo para
+        `executor` e retornam um `Future`; o resultado é recolhido (e, no caso
+        das imagens, convertido para o formato da tela) na thread principal,
+        no primeiro pedido do arquivo. Se a leitura ainda não terminou, esse
+        pedido espera por ela em vez de ler o arquivo de novo.
+
+        As superfícies entregues são compartilhadas: quem precisar desenhar
+        sobre uma delas deve fazer uma cópia antes (`Surface.copy`). As que vêm
+        do atlas são recortes de uma folha maior, compartilhada com outras
+        imagens.
+
+        Atributos:
+            root (Path): O diretório base onde as imagens são procuradas.
+            sounds_root (Path): O diretório base onde os sons são procurados.
+            executor (Executor): Onde as leituras antecipadas são feitas.
+            max_texts (int): Quantos textos renderizados o cache guarda.
+            hits (int): Quantas requisições foram atendidas pelo cache.
+            misses (int): Quantas requisições precisaram carregar,
+                redimensionar ou renderizar algo.
+    """
+
+
+    def __init__(self, root: Path = assets_dir, max_texts: int = MAX_TEXTS,
+                 sounds_root: Path = sounds_dir, executor: ThreadPoolExecutor = loader_executor):
+        """ Construtor da classe. """
+        self.root = Path(root)
+        self.sounds_root = Path(sounds_root)
+        self.executor = executor
+        self.max_texts = max_texts
+        self.hits = 0
+        self.misses = 0
+        self._images = {}
+        self._scaled = {}
+        self._fonts = {}
+        self._sounds = {}
+        self._pending = {}
+        self._texts = OrderedDict()
+        self._atlas = None
+        self._pages = {}
+        self._sprites = {}
+
+
+    def image(self, name: str) -> Surface:
+        """ Retorna a imagem original de nome `name`, carregando-a do disco
+            apenas na primeira vez.
+
+            Parâmetros:
+                name (str): O caminho da imagem relativo a `root` e sem a
+                    extensão, como "Ogre" ou "death/RIP".
+        """
+        if name in self._images:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return self._load(name)
+
+
+    def scaled(self, name: str, size: Size) -> Surface:
+        """ Retorna a imagem `name` redimensionada para `size`. Cada par
+            (nome, tamanho) é redimensionado uma única vez.
+
+            Parâmetros:
+                name (str): O nome da imagem, como em `image`.
+                size (tuple[int, int]): As dimensões desejadas.
+        """
+        key = (name, (int(size[0]), int(size[1])))
+        surface = self._scaled.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        entry = self._atlas_entry(name)
+        # A leitura antecipada das imagens fora do atlas já vem reduzida
+        prefetched = self._pending.pop((self.root / f"{name}.png", key[1]), None)
+        if prefetched is not None:
+            surface = self._convert(prefetched.result())
+        else:
+            if self._fits_atlas(entry, key[1]):
+                source = self._atlas_sprite(name, entry)
+            else:
+                source = self._load(name)
+            surface = pygame.transform.scale(source, key[1])
+        self._scaled[key] = surface
+        return surface
+
+
+    def font(self, name: str, size: int) -> Font:
+        """ Retorna a fonte `name` no tamanho `size`, lendo o arquivo apenas na
+            primeira vez.
+
+            Parâmetros:
+                name (str): O caminho da fonte relativo a `root` e sem a
+                    extensão, como "pixel_font".
+                size (int): O tamanho da fonte.
+        """
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        self.misses += 1
+        path = self.root / f"{name}.ttf"
+        future = self._pending.pop(path, None)
+        font = Font(BytesIO(future.result()) if future else path, size)
+        self._fonts[key] = font
+        return font
+
+
+    def sound(self, name: str) -> pygame.mixer.Sound:
+        """ Retorna o som `name`, lendo o arquivo apenas na primeira vez. O
+            mixer precisa estar iniciado.
+
+            Parâmetros:
+                name (str): O caminho do som relativo a `sounds_root` e sem a
+                    extensão, como "hit_sound".
+        """
+        sound = self._sounds.get(name)
+        if sound is not None:
+            self.hits += 1
+            return sound
+
+        self.misses += 1
+        path = self.sounds_root / f"{name}.wav"
+        future = self._pending.pop(path, None)
+        sound = future.result() if future else pygame.mixer.Sound(file=path)
+        self._sounds[name] = sound
+        return sound
+
+
+    def prefetch_image(self, name: str, size: Size = None) -> Future:
+        """ Começa a ler em segundo plano o arquivo de que `image(name)` (ou
+            `scaled(name, size)`, caso `size` seja informado) precisa: a folha
+            do atlas ou a própria imagem. O `Future` termina com a superfície
+            decodificada, ainda não convertida; quem precisar da imagem deve
+            usar `image` ou `scaled` normalmente. Com `size`, uma imagem fora
+            do atlas é reduzida na própria thread de leitura, e só a versão
+            pequena fica guardada até ser usada.
+        """
+        if name in self._images or (size is not None and (name, (int(size[0]), int(size[1]))) in self._scaled):
+            return _done(None)
+        entry = self._atlas_entry(name)
+        if self._fits_atlas(entry, size):
+            if name in self._sprites or entry["page"] in self._pages:
+                return _done(None)
+            path = self.root / ATLAS_DIR / self._atlas["pages"][entry["page"]]
+        elif size is not None:
+            path, size = self.root / f"{name}.png", (int(size[0]), int(size[1]))
+            return self._prefetch((path, size), _load_scaled, path, size)
+        else:
+            path = self.root / f"{name}.png"
+        return self._prefetch(path, pygame.image.load, path)
+
+
+    def prefetch_sound(self, name: str) -> Future:
+        """ Começa a ler em segundo plano o som `name` (ver `sound`). """
+        if name in self._sounds:
+            return _done(self._sounds[name])
+        path = self.sounds_root / f"{name}.wav"
+        return self._prefetch(path, _load_sound, path)
+
+
+    def prefetch_font(self, name: str) -> Future:
+        """ Começa a ler em segundo plano o arquivo da fonte `name`; o
+            próximo tamanho pedido em `font` é criado a partir dele.
+        """
+        path = self.root / f"{name}.ttf"
+        return self._prefetch(path, Path.read_bytes, path)
+
+
+    def _prefetch(self, key, load, *args) -> Future:
+        future = self._pending.get(key)
+        if future is None:
+            future = self.executor.submit(load, *args)
+            self._pending[key] = future
+        return future
+
+
+    def text(self, font: Font, text: str, color, antialias: bool = True) -> Surface:
+        """ Retorna `text` renderizado com `font` e `color`. Os textos usados
+            com mais frequência ficam em cache; quando o limite `max_texts` é
+            atingido, o menos usado recentemente é descartado.
+        """
+        if isinstance(color, pygame.Color):
+            color = tuple(color)
+
+        key = (font, text, color, antialias)
+        surface = self._texts.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._texts.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._texts[key] = surface
+        if len(self._texts) > self.max_texts:
+            self._texts.popitem(last=False)
+        return surface
+
+
+    def stats(self) -> dict[str, int]:
+        """ Retorna os contadores do cache e a quantidade de itens
+            armazenados.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            # Imagens lidas dos arquivos ou recortadas do atlas
+            "images": len(self._images.keys() | self._sprites.keys()),
+            "scaled": len(self._scaled),
+            "fonts": len(self._fonts),
+            "sounds": len(self._sounds),
+            "texts": len(self._texts),
+            "atlas_pages": len(self._pages),
+        }
+
+
+    def _load(self, name: str) -> Surface:
+        # Lê a imagem do disco caso ainda não esteja no cache, sem alterar os
+        # contadores
+        surface = self._images.get(name)
+        if surface is None:
+            entry = self._atlas_entry(name)
+            if self._fits_atlas(entry):
+                surface = self._atlas_sprite(name, entry)
+            else:
+                surface = self._read(self.root / f"{name}.png")
+            self._images[name] = surface
+        return surface
+
+
+    def _read(self, path: Path) -> Surface:
+        # Recolhe a leitura antecipada do arquivo, caso exista
+        future = self._pending.pop(path, None)
+        return self._convert(future.result() if future else pygame.image.load(path))
+
+
+    @staticmethod
+    def _convert(surface: Surface) -> Surface:
+        # `convert_alpha` só funciona depois que o display foi criado; antes
+        # disso (nos testes, por exemplo) a imagem fica no formato original do
+        # arquivo
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
+
+
+    def _atlas_entry(self, name: str) -> dict:
+        # Posição de `name` no atlas, ou `None` caso a imagem não esteja nele
+        # ou o arquivo tenha mudado depois do empacotamento
+        if self._atlas is None:
+            self._atlas = self._read_manifest()
+        entry = self._atlas["sprites"].get(name)
+        if entry is None:
+            return None
+        try:
+            stat = (self.root / f"{name}.png").stat()
+        except OSError:
+            return None
+        if [stat.st_size, stat.st_mtime_ns] != entry["source"]:
+            return None
+        return entry
+
+
+    @staticmethod
+    def _fits_atlas(entry: dict, size: Size = None) -> bool:
+        # O atlas pode guardar uma versão reduzida das imagens muito grandes,
+        # que só serve para tamanhos menores que ela
+        if entry is None:
+            return False
+        if size is None:
+            return entry["rect"][2:] == entry["size"]
+        return size[0] <= entry["rect"][2] and size[1] <= entry["rect"][3]
+
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.root / ATLAS_DIR / ATLAS_MANIFEST, "r") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            manifest = None
+        if not isinstance(manifest, dict) or manifest.get("version") != ATLAS_VERSION:
+            return {"pages": [], "sprites": {}}
+        return manifest
+
+
+    def _atlas_sprite(self, name: str, entry: dict) -> Surface:
+        sprite = self._sprites.get(name)
+        if sprite is None:
+            page = self._pages.get(entry["page"])
+            if page is None:
+                page = self._read(self.root / ATLAS_DIR / self._atlas["pages"][entry["page"]])
+                self._pages[entry["page"]] = page
+            sprite = page.subsurface(entry["rect"])
+            self._sprites[name] = sprite
+        return sprite
+
+
+    def clear(self):
+        """ Esvazia o cache e zera os contadores. """
+        self._images.clear()
+        self._scaled.clear()
+        self._fonts.clear()
+        self._sounds.clear()
+        self._pending.clear()
+        self._texts.clear()
+        self._atlas = None
+        self._pages.clear()
+        self._sprites.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def _done(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _load_scaled(path: Path, size: Size) -> Surface:
+    return pygame.transform.scale(pygame.image.load(path), size)
+
+
+def _load_sound(path: Path) -> pygame.mixer.Sound:
+    return pygame.mixer.Sound(file=path)
+
+
+# Registro compartilhado por todo o processo
+registry = AssetRegistry()
+
+
+def image(name: str) -> Surface:
+    """ Atalho para `registry.image`. """
+    return registry.image(name)
+
+
+def scaled(name: str, size: Size) -> Surface:
+    """ Atalho para `registry.scaled`. """
+    return registry.scaled(name, size)
+
+
+def font(name: str, size: int) -> Font:
+    """ Atalho para `registry.font`. """
+    return registry.font(name, size)
+
+
+def text(font: Font, text: str, color, antialias: bool = True) -> Surface:
+    """ Atalho para `registry.text`. """
+    return registry.text(font, text, color, antialias)
+
+
+def sound(name: str) -> pygame.mixer.Sound:
+    """ Atalho para `registry.sound`. """
+    return registry.sound(name)
+
+
+def prefetch_image(name: str, size: Size = None) -> Future:
+    """ Atalho para `registry.prefetch_image`. """
+    return registry.prefetch_image(name, size)
+
+
+def prefetch_sound(name: str) -> Future:
+    """ Atalho para `registry.prefetch_sound`. """
+    return registry.prefetch_sound(name)
+
+
+def prefetch_font(name: str) -> Future:
+    """ Atalho para `registry.prefetch_font`. """
+    return registry.prefetch_font(name)
@@ -0,0 +1,155 @@
+""" Empacotamento das imagens do jogo em atlas de textura.
+
+    Junta as imagens de `assets/` (cartas, entidades, efeitos, ícones do mapa)
+    em poucas folhas de até `PAGE_SIZE` pixels e grava, em `assets/atlas/`,
+    as folhas e um manifesto JSON com a posição de cada imagem. Assim o jogo
+    lê e decodifica um punhado de arquivos em vez de dezenas, e `Card`,
+    `Entity` e `MapScreen` passam a compartilhar as mesmas superfícies (ver
+    `AssetRegistry`).
+
+    As imagens maiores que `MAX_SPRITE_SIZE` (as cartas e os efeitos têm
+    milhares de pixels, mas são desenhados com menos de cem) entram reduzidas
+    e só são usadas para tamanhos menores que a versão reduzida. Os fundos de
+    tela ficam de fora: são grandes e usados uma única vez em tamanho
+    original.
+
+    Uso (a partir de `src/`), sempre que as imagens mudarem:
+        python -m atlas
+"""
+
+
+from argparse import ArgumentParser
+from fnmatch import fnmatch
+from pathlib import Path
+import json
+import pygame
+from assets import ATLAS_DIR, ATLAS_MANIFEST, ATLAS_VERSION, assets_dir
+
+
+PAGE_SIZE = 1024
+MAX_SPRITE_SIZE = 256
+
+# Espaço livre em volta de cada imagem, para que a filtragem ao redimensionar
+# não misture imagens vizinhas
+PADDING = 2
+
+# Imagens que não entram no atlas (padrões sobre o nome, sem a extensão)
+EXCLUDED = ("*_bg",)
+
+
+def collect_sprites(root: Path = assets_dir) -> dict:
+    """ Retorna o nome (como usado em `assets.image`) e o caminho de cada
+        imagem de `root` que deve entrar no atlas.
+    """
+    sprites = {}
+    for path in sorted(root.rglob("*.png")):
+        relative = path.relative_to(root)
+        if relative.parts[0] == ATLAS_DIR:
+            continue
+        name = relative.with_suffix("").as_posix()
+        if not any(fnmatch(name, pattern) for pattern in EXCLUDED):
+            sprites[name] = path
+    return sprites
+
+
+def fit(size: tuple, max_size: int) -> tuple:
+    """ Reduz `size`, mantendo a proporção, para que nenhum lado passe de
+        `max_size`.
+    """
+    width, height = size
+    scale = max_size / max(width, height)
+    if scale >= 1:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def pack(sizes: dict, page_size: int = PAGE_SIZE, padding: int = PADDING) -> dict:
+    """ Distribui retângulos em folhas de `page_size` x `page_size` por
+        prateleiras: os mais altos primeiro, da esquerda para a direita, e uma
+        nova prateleira (ou folha) quando o retângulo não cabe mais.
+
+        Parâmetros:
+            sizes (dict[str, tuple[int, int]]): O tamanho de cada retângulo.
+
+        Retorna a posição de cada retângulo como (folha, x, y). Gera um
+        ValueError caso algum deles não caiba em uma folha vazia.
+    """
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name))
+    positions = {}
+    page = 0
+    x = y = shelf_height = 0
+    for name in order:
+        width, height = sizes[name]
+        if width + padding > page_size or height + padding > page_size:
+            raise ValueError(f"{name} ({width}x{height}) não cabe em uma folha de {page_size}x{page_size}")
+        if x + width + padding > page_size:
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        if y + height + padding > page_size:
+            page += 1
+            x = y = shelf_height = 0
+        positions[name] = (page, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+    return positions
+
+
+def build(root: Path = assets_dir, page_size: int = PAGE_SIZE, max_sprite_size: int = MAX_SPRITE_SIZE) -> dict:
+    """ Empacota as imagens de `root` e grava as folhas e o manifesto em
+        `root/atlas/`. Retorna o manifesto.
+    """
+    sources = collect_sprites(root)
+    images = {}
+    original_sizes = {}
+    for name, path in sources.items():
+        # Copiada para uma superfície de 32 bits, que `smoothscale` exige
+        original = pygame.image.load(path)
+        image = pygame.Surface(original.get_size(), pygame.SRCALPHA)
+        image.blit(original, (0, 0))
+        original_sizes[name] = image.get_size()
+        size = fit(image.get_size(), max_sprite_size)
+        images[name] = image if size == image.get_size() else pygame.transform.smoothscale(image, size)
+
+    positions = pack({name: image.get_size() for name, image in images.items()}, page_size)
+    page_count = max((page for page, _, _ in positions.values()), default=-1) + 1
+    pages = [pygame.Surface((page_size, page_size), pygame.SRCALPHA) for _ in range(page_count)]
+
+    sprites = {}
+    for name, (page, x, y) in positions.items():
+        image = images[name]
+        pages[page].blit(image, (x, y))
+        stat = sources[name].stat()
+        sprites[name] = {
+            "page": page,
+            "rect": [x, y, *image.get_size()],
+            "size": list(original_sizes[name]),
+            "source": [stat.st_size, stat.st_mtime_ns],
+        }
+
+    out_dir = root / ATLAS_DIR
+    out_dir.mkdir(exist_ok=True)
+    for old_page in out_dir.glob("atlas_*.png"):
+        old_page.unlink()
+    page_names = [f"atlas_{index}.png" for index in range(page_count)]
+    for page, page_name in zip(pages, page_names):
+        pygame.image.save(page, out_dir / page_name)
+    manifest = {"version": ATLAS_VERSION, "pages": page_names, "sprites": sprites}
+    with open(out_dir / ATLAS_MANIFEST, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    return manifest
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m atlas", description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--max-sprite-size", type=int, default=MAX_SPRITE_SIZE,
+                        help="lado máximo de cada imagem no atlas; as maiores são reduzidas")
+    args = parser.parse_args(argv)
+
+    manifest = build(page_size=args.page_size, max_sprite_size=args.max_sprite_size)
+    print(f"{len(manifest['sprites'])} imagens em {len(manifest['pages'])} folha(s) "
+          f"de {args.page_size}x{args.page_size} em {assets_dir / ATLAS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
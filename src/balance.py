@@ -0,0 +1,300 @@
+""" Simulações de Monte Carlo para balancear `cards.json` e `entities.json`.
+
+    Executa N combates simulados (ver `combat_core`) para cada par
+    (baralho, grupo de inimigos), distribuindo os lotes entre processos, e
+    gera um relatório com taxa de vitória, turnos até vencer, vida restante e
+    uso de cartas.
+
+    Uso (a partir de `src/`):
+        python -m balance --fights 10000 --lineup cyclop,water_horse --lineup poseidon
+        python -m balance --deck Facada_lvl_1,Tapa_lvl_1,Escudo_lvl_1 --format csv -o report.csv
+        python -m balance --cache
+"""
+
+
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import json
+import random
+import sys
+from statistics import NormalDist
+import combat_core as core
+
+
+# Grupos de inimigos usados pelos `CombatLevel` de `main.init`
+DEFAULT_LINEUPS = [
+    ['cyclop'],
+    ['water_horse'],
+    ['cyclop', 'water_horse'],
+    ['poseidon'],
+]
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Nível de confiança dos intervalos de `BalanceStats`
+DEFAULT_CONFIDENCE = 0.95
+
+
+class BalanceStats:
+    """ Estatísticas agregadas de vários combates de um mesmo par
+        (baralho, inimigos). Instâncias calculadas em processos diferentes
+        podem ser combinadas com `merge`.
+
+        Atributos:
+            fights (int): Quantidade de combates simulados.
+            wins (int): Quantidade de vitórias do jogador.
+            turns_to_kill (Counter): Histograma de turnos das vitórias.
+            hp_remaining (Counter): Histograma da vida restante do jogador.
+            won_hp (Counter): Histograma da vida restante nas vitórias.
+            card_usage (Counter): Quantas vezes cada carta foi jogada.
+    """
+
+    def __init__(self):
+        self.fights = 0
+        self.wins = 0
+        self.turns_to_kill = Counter()
+        self.hp_remaining = Counter()
+        self.won_hp = Counter()
+        self.card_usage = Counter()
+
+
+    def add(self, result: core.FightResult):
+        """ Contabiliza um combate. """
+        self.fights += 1
+        if result.won:
+            self.wins += 1
+            self.turns_to_kill[result.turns] += 1
+            self.won_hp[result.player_hp] += 1
+        self.hp_remaining[result.player_hp] += 1
+        self.card_usage.update(result.cards_played)
+
+
+    def merge(self, other: "BalanceStats"):
+        """ Acumula as estatísticas de `other` nesta instância. """
+        self.fights += other.fights
+        self.wins += other.wins
+        self.turns_to_kill.update(other.turns_to_kill)
+        self.hp_remaining.update(other.hp_remaining)
+        self.won_hp.update(other.won_hp)
+        self.card_usage.update(other.card_usage)
+
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.fights if self.fights else 0.0
+
+
+    @property
+    def mean_turns_to_kill(self) -> float:
+        return _mean(self.turns_to_kill)
+
+
+    @property
+    def mean_hp_remaining(self) -> float:
+        return _mean(self.hp_remaining)
+
+
+    def win_rate_interval(self, confidence: float = DEFAULT_CONFIDENCE) -> tuple:
+        """ Intervalo de confiança de Wilson da taxa de vitória. """
+        if self.fights == 0:
+            return 0.0, 1.0
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        rate, n = self.win_rate, self.fights
+        center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+        margin = z * ((rate * (1 - rate) + z * z / (4 * n)) / n) ** 0.5 / (1 + z * z / n)
+        return max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+    def hp_remaining_interval(self, confidence: float = DEFAULT_CONFIDENCE) -> tuple:
+        """ Intervalo de confiança (aproximação normal) da vida média
+            restante; a vida perdida é a inicial menos esta.
+        """
+        if self.fights < 2:
+            return 0.0, float("inf")
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        mean = self.mean_hp_remaining
+        variance = sum(count * (value - mean) ** 2 for value, count in self.hp_remaining.items()) / (self.fights - 1)
+        margin = z * (variance / self.fights) ** 0.5
+        return mean - margin, mean + margin
+
+
+    def to_dict(self) -> dict:
+        return {
+            "fights": self.fights,
+            "wins": self.wins,
+            "win_rate": self.win_rate,
+            "win_rate_interval": list(self.win_rate_interval()),
+            "mean_turns_to_kill": self.mean_turns_to_kill,
+            "mean_hp_remaining": self.mean_hp_remaining,
+            "hp_remaining_interval": list(self.hp_remaining_interval()),
+            "turns_to_kill": _sorted_histogram(self.turns_to_kill),
+            "hp_remaining": _sorted_histogram(self.hp_remaining),
+            "won_hp": _sorted_histogram(self.won_hp),
+            "card_usage": dict(self.card_usage.most_common()),
+        }
+
+
+def _mean(histogram: Counter) -> float:
+    total = sum(histogram.values())
+    if total == 0:
+        return 0.0
+    return sum(value * count for value, count in histogram.items()) / total
+
+
+def _sorted_histogram(histogram: Counter) -> dict:
+    return {str(value): histogram[value] for value in sorted(histogram)}
+
+
+def run_chunk(draw_pile_ids: list, lineup: list, seed: str, fights: int,
+              start_hp: int = None, player_name: str = "Ulisses") -> BalanceStats:
+    """ Simula `fights` combates com uma semente própria. Executada nos
+        processos do pool, por isso recebe e retorna apenas dados simples.
+    """
+    rng = random.Random(seed)
+    stats = BalanceStats()
+    for _ in range(fights):
+        stats.add(core.simulate_fight(lineup, draw_pile_ids, rng, player_name=player_name, start_hp=start_hp))
+    return stats
+
+
+def _chunks(fights: int, chunk_size: int):
+    # Divide `fights` em lotes de no máximo `chunk_size` combates
+    for start in range(0, fights, chunk_size):
+        yield min(chunk_size, fights - start)
+
+
+def run_sweep(decks: list, lineups: list, fights: int, seed: int = 0,
+              workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, cache=None) -> list:
+    """ Simula `fights` combates para cada par (baralho, inimigos).
+
+        A semente de cada lote depende apenas de `seed`, do par e da posição do
+        lote, então o resultado não muda com a quantidade de processos.
+
+        Parâmetros:
+            decks (list[list[str]]): Baralhos iniciais do jogador.
+            lineups (list[list[str]]): Grupos de inimigos.
+            fights (int): Combates por par.
+            seed (int): Semente base das simulações.
+            workers (int): Quantidade de processos; com 1, roda no processo
+                atual. Por padrão, um por núcleo.
+            chunk_size (int): Combates por lote enviado a um processo.
+            cache (OutcomeCache): Com ele, os pares vêm do cache, que simula
+                só os combates que faltam (com a própria semente) e pode
+                trazer mais que `fights` combates.
+
+        Retorna:
+            list[tuple[list, list, BalanceStats]]: Uma entrada por par, na
+            ordem de `decks` × `lineups`.
+    """
+    if cache != None:
+        pairs = [(deck, lineup) for deck in decks for lineup in lineups]
+        results = cache.get_many([(deck, lineup, None) for deck, lineup in pairs], fights, workers=workers)
+        return [(deck, lineup, stats) for (deck, lineup), stats in zip(pairs, results)]
+
+    jobs = []
+    for deck_idx, deck in enumerate(decks):
+        for lineup_idx, lineup in enumerate(lineups):
+            for chunk_idx, chunk in enumerate(_chunks(fights, chunk_size)):
+                chunk_seed = f"{seed}:{deck_idx}:{lineup_idx}:{chunk_idx}"
+                jobs.append(((deck_idx, lineup_idx), (deck, lineup, chunk_seed, chunk)))
+
+    totals = {}
+    for deck_idx in range(len(decks)):
+        for lineup_idx in range(len(lineups)):
+            totals[(deck_idx, lineup_idx)] = BalanceStats()
+
+    if workers == 1:
+        for key, args in jobs:
+            totals[key].merge(run_chunk(*args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(key, pool.submit(run_chunk, *args)) for key, args in jobs]
+            for key, future in futures:
+                totals[key].merge(future.result())
+
+    return [(decks[d], lineups[l], stats) for (d, l), stats in totals.items()]
+
+
+def write_json(report: list, file):
+    rows = []
+    for deck, lineup, stats in report:
+        rows.append({"deck": deck, "lineup": lineup, **stats.to_dict()})
+    json.dump(rows, file, indent=2)
+    file.write("\n")
+
+
+def write_csv(report: list, file):
+    card_ids = sorted(core.default_card_configurations['cards'])
+    writer = csv.writer(file)
+    writer.writerow(["deck", "lineup", "fights", "wins", "win_rate",
+                     "mean_turns_to_kill", "mean_hp_remaining",
+                     "turns_to_kill", "hp_remaining"]
+                    + [f"uses_{card_id}" for card_id in card_ids])
+    for deck, lineup, stats in report:
+        # Histogramas no formato "valor:quantidade;..." e uso médio de cada
+        # carta por combate
+        writer.writerow([
+            " ".join(deck), " ".join(lineup), stats.fights, stats.wins,
+            f"{stats.win_rate:.4f}", f"{stats.mean_turns_to_kill:.3f}",
+            f"{stats.mean_hp_remaining:.3f}",
+            ";".join(f"{k}:{v}" for k, v in _sorted_histogram(stats.turns_to_kill).items()),
+            ";".join(f"{k}:{v}" for k, v in _sorted_histogram(stats.hp_remaining).items()),
+        ] + [f"{stats.card_usage[card_id] / max(stats.fights, 1):.3f}" for card_id in card_ids])
+
+
+def _split_ids(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m balance", description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--fights", type=int, default=1000,
+                        help="combates simulados por par (baralho, inimigos)")
+    parser.add_argument("--deck", action="append", type=_split_ids,
+                        help="baralho do jogador, com ids separados por vírgula "
+                             "(pode ser repetido; padrão: o de Ulisses)")
+    parser.add_argument("--lineup", action="append", type=_split_ids,
+                        help="inimigos de um combate separados por vírgula "
+                             "(pode ser repetido; padrão: os combates do mapa)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="quantidade de processos (padrão: um por núcleo)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--cache", nargs="?", const="",
+                        help="guarda os combates simulados neste arquivo e reaproveita os já guardados "
+                             "(sem o arquivo: o cache de `outcome_cache`)")
+    args = parser.parse_args(argv)
+
+    decks = args.deck or [core.default_entity_configurations['entities']['Ulisses']['draw_pile']]
+    lineups = args.lineup or DEFAULT_LINEUPS
+
+    for card_id in {card_id for deck in decks for card_id in deck}:
+        if card_id not in core.default_card_configurations['cards']:
+            parser.error(f"carta desconhecida: {card_id}")
+    for name in {name for lineup in lineups for name in lineup}:
+        if name not in core.default_entity_configurations['entities']:
+            parser.error(f"entidade desconhecida: {name}")
+
+    cache = None
+    if args.cache != None:
+        # `outcome_cache` depende deste módulo; por isso só é importado aqui
+        from outcome_cache import CACHE_PATH, OutcomeCache
+        cache = OutcomeCache(args.cache or CACHE_PATH, args.seed, args.chunk_size)
+    report = run_sweep(decks, lineups, args.fights, args.seed, args.workers, args.chunk_size, cache)
+    if cache != None:
+        cache.close()
+
+    write = write_csv if args.format == "csv" else write_json
+    if args.output:
+        with open(args.output, "w", newline="") as file:
+            write(report, file)
+    else:
+        write(report, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,717 @@
+""" Simulação vetorizada de muitos combates de uma vez, com NumPy.
+
+    Cada posição de um lote de B combates independentes (o jogador e cada
+    inimigo do grupo) vira um conjunto de arrays de tamanho B: vida, defesa,
+    energia, multiplicador de dano, colunas de efeitos e pilhas do baralho.
+    Os turnos avançam todos os combates ao mesmo tempo, com as mesmas
+    fórmulas de `combat_core` (ataque, defesa e efeitos de `status_effects`)
+    aplicadas a máscaras dos combates em que cada carta é jogada; os combates
+    encerrados saem do lote. O jogador segue `GreedyPlayerPolicy` e os
+    inimigos, `FirstCardPolicy`.
+
+    Os embaralhamentos vêm de uma fonte à parte. `PythonShuffles` usa um
+    `random.Random` por combate, na mesma ordem do motor escalar, e reproduz
+    exatamente `simulate_fight(rng=...)`; `NumpyShuffles` sorteia as
+    permutações do lote inteiro com um gerador do NumPy, para as varreduras.
+
+    A busca em grade altera valores de `cards.json` e `entities.json` sem
+    tocar nos arquivos. Uso (a partir de `src/`):
+
+        python -m batch_combat --lineup poseidon --set Pedra_lvl_1.damage=30,42,54 --fights 100000
+        python -m batch_combat --deck Pedra_lvl_1,Tapa_lvl_1,Escudo_lvl_1 --set poseidon.max_hp=80,100,120
+
+    O NumPy é opcional: o jogo e o restante das ferramentas não dependem dele.
+"""
+
+
+from argparse import ArgumentParser
+from collections import Counter
+from itertools import permutations, product
+from time import perf_counter
+import copy
+import csv
+import json
+import sys
+import combat_core as core
+import status_effects as se
+from balance import BalanceStats, DEFAULT_LINEUPS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Códigos dos tipos de carta nos arrays
+ATTACK, DEFENSE, OFFENSIVE_EFFECT, DEFENSIVE_EFFECT = range(4)
+CARD_KINDS = {"attack": ATTACK, "defense": DEFENSE,
+              "offensive_effect": OFFENSIVE_EFFECT, "defensive_effect": DEFENSIVE_EFFECT}
+
+# Os tipos de efeito, na ordem em que são aplicados a cada turno
+EFFECT_TYPES = tuple(se.EFFECT_RULES)
+
+# Índices das regras de acúmulo nos arrays
+INDEPENDENT, INTENSITY, DURATION = (se.STACKING_RULES.index(rule) for rule in ("independent", "intensity", "duration"))
+
+# Maior pilha embaralhada com a tabela de permutações (8! linhas)
+PERMUTATION_TABLE_SIZE = 8
+
+DEFAULT_FIGHTS = 100000
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("batch_combat precisa do NumPy (pip install numpy)")
+
+
+class PythonShuffles:
+    """ Embaralhamentos com um `random.Random` por combate, feitos com
+        `shuffle` na mesma ordem do motor escalar. O combate `i` do lote tem
+        o mesmo resultado de `simulate_fight(..., rng=rngs[i])`.
+    """
+
+    def __init__(self, rngs: list):
+        self.rngs = rngs
+
+    def __call__(self, fights, length: int):
+        permutations = np.empty((len(fights), length), dtype=np.int32)
+        for row, fight in enumerate(fights.tolist()):
+            order = list(range(length))
+            self.rngs[fight].shuffle(order)
+            permutations[row] = order
+        return permutations
+
+
+class NumpyShuffles:
+    """ Embaralhamentos de todos os combates de uma vez, com um gerador do
+        NumPy. Os resultados têm a mesma distribuição do motor escalar, mas
+        não os mesmos sorteios. Pilhas pequenas sorteiam uma linha da tabela
+        com todas as permutações.
+    """
+
+    def __init__(self, seed=None):
+        self.generator = np.random.default_rng(seed)
+        self._permutations = {}
+
+    def __call__(self, fights, length: int):
+        if length > PERMUTATION_TABLE_SIZE:
+            return np.argsort(self.generator.random((len(fights), length)), axis=1)
+        table = self._permutations.get(length)
+        if table is None:
+            table = self._permutations[length] = np.array(list(permutations(range(length))),
+                                                          dtype=np.int32).reshape(-1, length)
+        return table[self.generator.integers(len(table), size=len(fights))]
+
+
+class _CardTable:
+    # As cartas das configurações, em arrays indexados pelo índice da carta
+    def __init__(self, card_configurations: dict):
+        cards = card_configurations['cards']
+        self.names = list(cards)
+        self.index = {name: index for index, name in enumerate(self.names)}
+        self.cost = np.array([info['cost'] for info in cards.values()], dtype=np.int32)
+        self.kind = np.array([CARD_KINDS[info['type']] for info in cards.values()], dtype=np.int32)
+        self.damage = np.array([info.get('damage', 0) for info in cards.values()], dtype=np.int32)
+        self.defense = np.array([info.get('defense', 0) for info in cards.values()], dtype=np.int32)
+
+        effects = [_card_effect(info) for info in cards.values()]
+        self.effect = np.array([EFFECT_TYPES.index(e.type) if e != None else -1 for e in effects], dtype=np.int32)
+        self.duration = np.array([e.duration if e != None else 0 for e in effects], dtype=np.int32)
+        self.magnitude = np.array([e.magnitude if e != None else 0 for e in effects], dtype=np.float64)
+        self.stacking = np.array([se.STACKING_RULES.index(e.stacking) if e != None else 0 for e in effects],
+                                 dtype=np.int32)
+
+    def ids(self, card_ids: list):
+        return np.array([self.index[card_id] for card_id in card_ids], dtype=np.int32)
+
+
+def _card_effect(info: dict) -> se.StatusEffect:
+    effect_type = info.get('status_effect_type')
+    if effect_type == None:
+        return None
+    return se.StatusEffect.from_info(effect_type, info['status_effect_info'])
+
+
+class _EffectSlots:
+    """ As colunas de um tipo de efeito (ver `status_effects._EffectColumn`)
+        em todos os combates do lote: até `slots` efeitos por combate, na
+        ordem de aplicação, com o turno em que expiram (zero nas posições
+        vazias) e a intensidade no turno zero de cada relógio.
+
+        Os efeitos expirados apenas viram posições vazias, com intensidade
+        zero, que não mudam as somas; as colunas só são compactadas quando um
+        combate chega à última posição.
+    """
+
+    def __init__(self, rows: int, slots: int, decay: float):
+        self.decay = decay
+        self.clock = np.zeros(rows, dtype=np.int32)
+        self.count = np.zeros(rows, dtype=np.int32)
+        self.used = np.zeros(rows, dtype=np.int32)
+        self.expires = np.zeros((slots, rows), dtype=np.int32)
+        self.bases = np.zeros((slots, rows), dtype=np.float64)
+
+    def take(self, keep):
+        self.clock = self.clock[keep]
+        self.count = self.count[keep]
+        self.used = self.used[keep]
+        self.expires = self.expires[:, keep]
+        self.bases = self.bases[:, keep]
+
+    def total(self, rows):
+        # Soma na ordem de aplicação, como `sum` sobre o array do motor
+        # escalar, para que os multiplicadores sejam idênticos
+        total = np.zeros(len(rows))
+        for slot in range(int(self.used[rows].max())):
+            total += self.bases[slot, rows]
+        return total - self.decay * self.clock[rows] * self.count[rows]
+
+    def add(self, rows, duration, magnitude, stacking):
+        clock = self.clock[rows]
+        merged = (stacking != INDEPENDENT) & (self.count[rows] > 0)
+        if merged.any():
+            # Junta ao primeiro efeito ativo do tipo
+            merged_rows, duration_m, magnitude_m, clock_m = rows[merged], duration[merged], magnitude[merged], clock[merged]
+            first = np.argmax(self.expires[:, merged_rows] > 0, axis=0)
+            base, expires = self.bases[first, merged_rows], self.expires[first, merged_rows]
+            current = base - self.decay * clock_m
+            intensity = stacking[merged] == INTENSITY
+            self.bases[first, merged_rows] = np.where(intensity, base + magnitude_m,
+                                                      base + (np.maximum(current, magnitude_m) - current))
+            self.expires[first, merged_rows] = np.where(intensity, np.maximum(expires, clock_m + duration_m),
+                                                        expires + duration_m)
+
+        appended = ~merged
+        if appended.any():
+            rows, clock = rows[appended], clock[appended]
+            full = rows[self.used[rows] >= len(self.bases)]
+            if len(full) > 0:
+                self._compact(full)
+                if self.used[full].max() >= len(self.bases):
+                    raise RuntimeError("efeitos acumulados demais para as colunas do lote")
+            slots = self.used[rows]
+            self.expires[slots, rows] = clock + duration[appended]
+            self.bases[slots, rows] = magnitude[appended] + self.decay * clock
+            self.used[rows] += 1
+            self.count[rows] += 1
+
+    def advance(self, rows):
+        # Passa um turno e esvazia as posições dos efeitos expirados
+        self.clock[rows] += 1
+        expires = self.expires[:int(self.used[rows].max()), rows]
+        expired = (expires > 0) & (expires <= self.clock[rows])
+        if expired.any():
+            slots, columns = np.nonzero(expired)
+            self.expires[slots, rows[columns]] = 0
+            self.bases[slots, rows[columns]] = 0.0
+            count = self.count[rows] - expired.sum(axis=0)
+            self.count[rows] = count
+            self.used[rows] = np.where(count == 0, 0, self.used[rows])
+
+    def _compact(self, rows):
+        # Move os efeitos ativos para o início das colunas, mantendo a ordem
+        live = self.expires[:, rows] > 0
+        order = np.argsort(~live, axis=0, kind="stable")
+        self.expires[:, rows] = np.take_along_axis(self.expires[:, rows], order, axis=0)
+        self.bases[:, rows] = np.take_along_axis(self.bases[:, rows], order, axis=0)
+        self.used[rows] = self.count[rows]
+
+
+class _EffectTable:
+    # Uma tabela de efeitos (ofensivos ou defensivos) de uma posição do
+    # lote, com colunas apenas para os tipos que as cartas podem aplicar
+    def __init__(self, rows: int, capacity: dict):
+        self.slots = {effect: _EffectSlots(rows, slots, se.EFFECT_RULES[EFFECT_TYPES[effect]].decay)
+                      for effect, slots in capacity.items()}
+
+    def take(self, keep):
+        for slots in self.slots.values():
+            slots.take(keep)
+
+    def apply(self, mask, fighter, cards: _CardTable, card):
+        """ Vetorização de `EffectTable.apply` para a carta `card` de cada
+            combate em que `mask` é verdadeira.
+        """
+        effect_of = cards.effect[card]
+        for effect, slots in self.slots.items():
+            rows = np.flatnonzero(mask & (effect_of == effect))
+            if len(rows) == 0:
+                continue
+            played = card[rows]
+            duration, magnitude = cards.duration[played], cards.magnitude[played]
+            now = fighter.life[rows] > 0
+            _apply_batch(effect, fighter, rows[now], magnitude[now])
+            duration = duration - now
+            magnitude = magnitude - slots.decay * now
+            stored = duration > 0
+            slots.add(rows[stored], duration[stored], magnitude[stored], cards.stacking[played][stored])
+
+    def tick(self, fighter):
+        """ Vetorização de `EffectTable.tick`. """
+        for effect, slots in sorted(self.slots.items()):
+            rows = np.flatnonzero((slots.count > 0) & (fighter.life > 0))
+            if len(rows) > 0:
+                _apply_batch(effect, fighter, rows, slots.total(rows))
+                slots.advance(rows)
+
+
+def _apply_batch(effect: int, fighter, rows, total):
+    # Vetorização de `status_effects.apply_batch` nos combates `rows`
+    effect_type = EFFECT_TYPES[effect]
+    if effect_type == se.EffectTypes.POISON:
+        fighter.life[rows] = np.maximum(fighter.life[rows] - total.astype(np.int32), 0)
+    elif effect_type == se.EffectTypes.REGEN:
+        fighter.life[rows] = np.minimum(fighter.life[rows] + total.astype(np.int32), fighter.max_hp)
+    elif effect_type == se.EffectTypes.STRENGTH:
+        fighter.multiplier[rows] += total
+    elif effect_type == se.EffectTypes.WEAKNESS:
+        fighter.multiplier[rows] -= total
+
+
+class _Fighter:
+    """ Uma posição do encontro (o jogador ou um inimigo) em todos os
+        combates do lote. O multiplicador de absorção não aparece porque
+        nenhum efeito implementado o altera.
+    """
+
+    def __init__(self, rows: int, info: dict, deck, offensive: dict, defensive: dict):
+        self.max_hp = info['max_hp']
+        self.max_energy = info['max_energy']
+        self.life = np.full(rows, self.max_hp, dtype=np.int32)
+        self.defense = np.zeros(rows, dtype=np.int32)
+        self.energy = np.full(rows, self.max_energy, dtype=np.int32)
+        self.multiplier = np.ones(rows, dtype=np.float64)
+        self.offensive = _EffectTable(rows, offensive)
+        self.defensive = _EffectTable(rows, defensive)
+
+        # As pilhas, com os índices das cartas; todos os combates do lote têm
+        # pilhas do mesmo tamanho, pois nenhuma carta é exaurida
+        self.draw_pile = np.tile(deck, (rows, 1))
+        self.hand = np.empty((rows, 0), dtype=np.int32)
+        self.discard_pile = np.empty((rows, 0), dtype=np.int32)
+        self.played = np.zeros((rows, 0), dtype=bool)
+
+    def take(self, keep):
+        self.life = self.life[keep]
+        self.defense = self.defense[keep]
+        self.energy = self.energy[keep]
+        self.multiplier = self.multiplier[keep]
+        self.offensive.take(keep)
+        self.defensive.take(keep)
+        self.draw_pile = self.draw_pile[keep]
+        self.hand = self.hand[keep]
+        self.discard_pile = self.discard_pile[keep]
+        self.played = self.played[keep]
+
+    def alive(self):
+        return self.life > 0
+
+    def shuffle_and_allocate(self, shuffles, fights):
+        """ Vetorização de `CombatDeck.shuffle_and_allocate`. As cartas
+            jogadas (`played`) foram para o descarte na ordem em que foram
+            jogadas, antes das que ficaram na mão.
+        """
+        hand, played = self.hand, self.played
+        if played.any():
+            # Posição de cada carta da mão no descarte
+            position = np.where(played, np.cumsum(played, axis=1) - 1,
+                                played.sum(axis=1, keepdims=True) + np.cumsum(~played, axis=1) - 1)
+            hand = np.empty_like(self.hand)
+            np.put_along_axis(hand, position, self.hand, axis=1)
+        discard_pile = np.concatenate([self.discard_pile, hand], axis=1)
+        draw_pile = self.draw_pile
+        if draw_pile.shape[1] < core.HAND_SIZE:
+            draw_pile = np.concatenate([draw_pile, discard_pile], axis=1)
+            discard_pile = discard_pile[:, :0]
+        draw_pile = np.take_along_axis(draw_pile, shuffles(fights, draw_pile.shape[1]), axis=1)
+        self.hand = draw_pile[:, :core.HAND_SIZE]
+        self.draw_pile = draw_pile[:, core.HAND_SIZE:]
+        self.discard_pile = discard_pile
+        self.played = np.zeros(self.hand.shape, dtype=bool)
+
+
+def _resolve_attack(owner: _Fighter, target: _Fighter, damage, mask):
+    # Vetorização de `combat_core.resolve_attack`
+    hit = mask & (target.defense < damage)
+    dealt = (damage * owner.multiplier).astype(np.int32)
+    new_life = target.life - (dealt - target.defense)
+    target.life = np.where(hit, np.maximum(new_life, 0), target.life)
+    target.defense = np.where(hit, 0, np.where(mask, target.defense - damage, target.defense))
+
+
+def _resolve_defense(target: _Fighter, defense, mask):
+    target.defense = np.where(mask, np.minimum(target.defense + defense, core.MAX_DEFENSE), target.defense)
+
+
+class BatchResult:
+    """ Resultados de um lote de combates, um elemento por combate.
+
+        Atributos:
+            won (ndarray[bool]): Se o jogador venceu.
+            turns (ndarray[int]): Turnos do jogador jogados.
+            player_hp (ndarray[int]): Vida restante do jogador.
+            enemy_hp (ndarray[int]): Soma da vida restante dos inimigos.
+            cards_played (ndarray[int]): Usos de cada carta, com uma coluna
+                por carta de `card_names`.
+            card_names (list[str]): As cartas das colunas de `cards_played`.
+    """
+
+    def __init__(self, fights: int, card_names: list):
+        self.won = np.zeros(fights, dtype=bool)
+        self.turns = np.zeros(fights, dtype=np.int32)
+        self.player_hp = np.zeros(fights, dtype=np.int32)
+        self.enemy_hp = np.zeros(fights, dtype=np.int32)
+        self.cards_played = np.zeros((fights, len(card_names)), dtype=np.int32)
+        self.card_names = card_names
+
+    def __len__(self):
+        return len(self.won)
+
+    @property
+    def fight_turns(self) -> int:
+        """ Soma dos turnos de todos os combates. """
+        return int(self.turns.sum())
+
+    def fight_result(self, index: int) -> core.FightResult:
+        """ O combate `index`, como no motor escalar. """
+        cards_played = Counter({self.card_names[card]: int(uses)
+                                for card, uses in enumerate(self.cards_played[index]) if uses})
+        return core.FightResult(bool(self.won[index]), int(self.turns[index]), int(self.player_hp[index]),
+                                int(self.enemy_hp[index]), cards_played)
+
+    def stats(self) -> BalanceStats:
+        """ As estatísticas agregadas do lote, como em `balance`. """
+        stats = BalanceStats()
+        stats.fights = len(self)
+        stats.wins = int(self.won.sum())
+        stats.turns_to_kill = _histogram(self.turns[self.won])
+        stats.hp_remaining = _histogram(self.player_hp)
+        stats.won_hp = _histogram(self.player_hp[self.won])
+        stats.card_usage = Counter({name: int(uses) for name, uses
+                                    in zip(self.card_names, self.cards_played.sum(axis=0)) if uses})
+        return stats
+
+
+def _histogram(values) -> Counter:
+    keys, counts = np.unique(values, return_counts=True)
+    return Counter(dict(zip(keys.tolist(), counts.tolist())))
+
+
+class _Batch:
+    """ O estado de todos os combates ainda em andamento de um lote. """
+
+    def __init__(self, fights: int, enemy_names: list, draw_pile_ids: list, player_name: str,
+                 cards: _CardTable, entities: dict, shuffles):
+        self.cards = cards
+        self.shuffles = shuffles
+        self.index = np.arange(fights)
+        deck = cards.ids(draw_pile_ids)
+
+        # Colunas de efeitos só para o que o baralho do jogador aplica: os
+        # inimigos apenas atacam e defendem
+        offensive = _effect_capacity(cards, deck, OFFENSIVE_EFFECT)
+        defensive = _effect_capacity(cards, deck, DEFENSIVE_EFFECT)
+        self.player = _Fighter(fights, entities[player_name], deck, {}, defensive)
+        self.enemies = []
+        for name in enemy_names:
+            info = entities[name]
+            policy = core.create_enemy_policy(info.get('policy'))
+            if policy != None and not isinstance(policy, core.FirstCardPolicy):
+                raise ValueError(f"{name}: o lote só simula inimigos com a política first_card")
+            self.enemies.append(_Fighter(fights, info, cards.ids(info['draw_pile']), offensive, {}))
+        self.cards_played = np.zeros((fights, len(cards.names)), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.index)
+
+    def take(self, keep):
+        self.index = self.index[keep]
+        self.player.take(keep)
+        for enemy in self.enemies:
+            enemy.take(keep)
+        self.cards_played = self.cards_played[keep]
+
+    def enemy_life(self):
+        return np.stack([enemy.life for enemy in self.enemies])
+
+    def won(self):
+        return ~(self.enemy_life() > 0).any(axis=0)
+
+    def begin(self):
+        self.player.shuffle_and_allocate(self.shuffles, self.index)
+
+    def play_player_turn(self):
+        """ Vetorização de `GreedyPlayerPolicy.play_turn`. """
+        cards, player = self.cards, self.player
+        rows = np.arange(len(self))
+        stopped = np.zeros(len(self), dtype=bool)
+        for position in range(player.hand.shape[1]):
+            card = player.hand[:, position]
+            kind = cards.kind[card]
+            cost = cards.cost[card]
+
+            # O alvo das cartas ofensivas é o inimigo vivo com menos vida;
+            # sem inimigos vivos, o jogador para de jogar
+            life = self.enemy_life()
+            alive = life > 0
+            offensive = (kind == ATTACK) | (kind == OFFENSIVE_EFFECT)
+            stopped |= offensive & ~alive.any(axis=0)
+            playable = ~stopped & (cost <= player.energy)
+            if not playable.any():
+                continue
+            target = np.argmin(np.where(alive, life, np.iinfo(np.int32).max), axis=0)
+
+            for index, enemy in enumerate(self.enemies):
+                hit = playable & (target == index)
+                _resolve_attack(player, enemy, cards.damage[card], hit & (kind == ATTACK))
+                enemy.offensive.apply(hit & (kind == OFFENSIVE_EFFECT), enemy, cards, card)
+            _resolve_defense(player, cards.defense[card], playable & (kind == DEFENSE))
+            player.defensive.apply(playable & (kind == DEFENSIVE_EFFECT), player, cards, card)
+
+            player.energy -= np.where(playable, cost, 0)
+            player.played[:, position] = playable
+            self.cards_played[rows, card] += playable
+
+    def end_player_turn(self):
+        for enemy in self.enemies:
+            enemy.defense[:] = 0
+            enemy.shuffle_and_allocate(self.shuffles, self.index)
+            enemy.offensive.tick(enemy)
+            enemy.defensive.tick(enemy)
+        self.player.energy[:] = self.player.max_energy
+        self.player.shuffle_and_allocate(self.shuffles, self.index)
+        self.player.multiplier[:] = 1.0
+
+    def run_enemy_turn(self):
+        """ Vetorização de `Encounter.run_enemy_turn` com `FirstCardPolicy`:
+            cada inimigo joga a mão em ordem enquanto tiver energia.
+        """
+        cards, player = self.cards, self.player
+        for enemy in self.enemies:
+            # As cartas que o inimigo não joga também vão para o descarte, na
+            # ordem da mão, então `played` continua falso
+            for position in range(enemy.hand.shape[1]):
+                card = enemy.hand[:, position]
+                kind = cards.kind[card]
+                cost = cards.cost[card]
+                acting = enemy.alive() & (enemy.energy > 0) & (cost <= enemy.energy)
+                attack = acting & (kind == ATTACK) & player.alive()
+                defense = acting & (kind == DEFENSE)
+                _resolve_attack(enemy, player, cards.damage[card], attack)
+                _resolve_defense(enemy, cards.defense[card], defense)
+                enemy.energy -= np.where(attack | defense, cost, 0)
+
+    def end_enemies_turn(self):
+        self.player.defense[:] = 0
+        self.player.offensive.tick(self.player)
+        self.player.defensive.tick(self.player)
+        for enemy in self.enemies:
+            enemy.energy[:] = enemy.max_energy
+
+
+def _effect_capacity(cards: _CardTable, deck, kind: int) -> dict:
+    # Quantidade máxima de efeitos ativos de cada tipo: no máximo uma mão
+    # inteira de cartas do tipo por turno, cada uma ativa pela sua duração
+    capacity = {}
+    for card in set(deck.tolist()):
+        if cards.kind[card] != kind:
+            continue
+        effect = int(cards.effect[card])
+        copies = min(int((deck == card).sum()), core.HAND_SIZE)
+        capacity[effect] = capacity.get(effect, 0) + copies * int(cards.duration[card])
+    return {effect: min(slots, core.HAND_SIZE * int(cards.duration.max())) for effect, slots in capacity.items()}
+
+
+def simulate_batch(enemy_names: list, draw_pile_ids: list = None, fights: int = DEFAULT_FIGHTS,
+                   shuffles=None, seed=None, player_name: str = "Ulisses", max_turns: int = 100,
+                   card_configurations: dict = None, entity_configurations: dict = None) -> BatchResult:
+    """ Simula `fights` combates entre `player_name` e os inimigos de
+        `enemy_names` de uma vez, como `simulate_fight` com a política
+        padrão do jogador.
+
+        Parâmetros:
+            draw_pile_ids (list): Baralho do jogador; por padrão, o de
+                `entities.json`.
+            shuffles: Fonte dos embaralhamentos, chamada com os índices dos
+                combates e o tamanho da pilha (ver `PythonShuffles`); por
+                padrão, `NumpyShuffles(seed)`.
+            card_configurations, entity_configurations (dict): Dados no
+                formato de `game_data`; por padrão, os do jogo.
+    """
+    require_numpy()
+    card_configurations = card_configurations or core.default_card_configurations
+    entities = (entity_configurations or core.default_entity_configurations)['entities']
+    cards = _CardTable(card_configurations)
+    if draw_pile_ids is None:
+        draw_pile_ids = entities[player_name]['draw_pile']
+    if shuffles is None:
+        shuffles = NumpyShuffles(seed)
+
+    result = BatchResult(fights, cards.names)
+    batch = _Batch(fights, enemy_names, draw_pile_ids, player_name, cards, entities, shuffles)
+
+    # Os combates encerrados têm o resultado registrado na hora, mas só saem
+    # do lote no fim do turno; até lá seguem sem efeito nos resultados
+    done = np.zeros(fights, dtype=bool)
+
+    def finish(over, won: bool):
+        over &= ~done
+        if not over.any():
+            return
+        index = batch.index[over]
+        result.won[index] = won
+        result.turns[index] = turns
+        result.player_hp[index] = batch.player.life[over]
+        result.enemy_hp[index] = batch.enemy_life()[:, over].sum(axis=0)
+        result.cards_played[index] = batch.cards_played[over]
+        done[over] = True
+
+    turns = 0
+    batch.begin()
+    while turns < max_turns and len(batch) > 0:
+        turns += 1
+        batch.play_player_turn()
+        finish(batch.won(), True)
+        batch.end_player_turn()
+        finish(batch.won(), True)
+        batch.run_enemy_turn()
+        batch.end_enemies_turn()
+        finish(~batch.player.alive(), False)
+        if done.any():
+            batch.take(~done)
+            done = done[~done]
+    finish(np.ones(len(batch), dtype=bool), False)
+    return result
+
+
+def apply_overrides(overrides: dict, card_configurations: dict = None, entity_configurations: dict = None) -> tuple:
+    """ Retorna cópias das configurações com os valores de `overrides`
+        trocados, sem alterar as originais.
+
+        Parâmetros:
+            overrides (dict[str, float]): Valores por caminho, começando pelo
+                id de uma carta ou pelo nome de uma entidade, como
+                "Pedra_lvl_1.damage", "poseidon.max_hp" ou
+                "Veneno_lvl_1.status_effect_info.damage". Gera um KeyError
+                para caminhos que não existem.
+    """
+    cards = copy.deepcopy(card_configurations or core.default_card_configurations)
+    entities = copy.deepcopy(entity_configurations or core.default_entity_configurations)
+    for path, value in overrides.items():
+        name, *keys = path.split(".")
+        if name in cards['cards']:
+            node = cards['cards'][name]
+        elif name in entities['entities']:
+            node = entities['entities'][name]
+        else:
+            raise KeyError(f"{path}: carta ou entidade desconhecida")
+        for key in keys[:-1]:
+            node = node[key]
+        if not keys or not isinstance(node.get(keys[-1]), (int, float)):
+            raise KeyError(f"{path}: não é um valor numérico dos dados")
+        node[keys[-1]] = value
+    return cards, entities
+
+
+def grid_search(grid: dict, lineups: list, draw_pile_ids: list = None, fights: int = DEFAULT_FIGHTS,
+                seed: int = 0, player_name: str = "Ulisses") -> list:
+    """ Simula cada combinação dos valores de `grid` contra cada grupo de
+        inimigos.
+
+        Parâmetros:
+            grid (dict[str, list]): Os valores testados para cada caminho (ver
+                `apply_overrides`).
+
+        Retorna:
+            list[tuple[dict, list, BatchResult]]: Uma entrada por par
+            (combinação, inimigos).
+    """
+    report = []
+    paths = list(grid)
+    for values in product(*(grid[path] for path in paths)):
+        overrides = dict(zip(paths, values))
+        cards, entities = apply_overrides(overrides)
+        for lineup in lineups:
+            result = simulate_batch(lineup, draw_pile_ids, fights, seed=seed, player_name=player_name,
+                                    card_configurations=cards, entity_configurations=entities)
+            report.append((overrides, lineup, result))
+    return report
+
+
+def write_json(report: list, file):
+    rows = [{"params": params, "lineup": lineup, **result.stats().to_dict()} for params, lineup, result in report]
+    json.dump(rows, file, indent=2)
+    file.write("\n")
+
+
+def write_csv(report: list, file):
+    paths = list(report[0][0]) if report else []
+    writer = csv.writer(file)
+    writer.writerow(paths + ["lineup", "fights", "wins", "win_rate", "mean_turns_to_kill", "mean_hp_remaining"])
+    for params, lineup, result in report:
+        stats = result.stats()
+        writer.writerow([params[path] for path in paths] + [
+            " ".join(lineup), stats.fights, stats.wins, f"{stats.win_rate:.4f}",
+            f"{stats.mean_turns_to_kill:.3f}", f"{stats.mean_hp_remaining:.3f}"])
+
+
+def _split_ids(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_setting(value: str) -> tuple:
+    # "caminho=v1,v2,..." → (caminho, [v1, v2, ...])
+    path, _, values = value.partition("=")
+    if not values:
+        raise ValueError(value)
+    return path.strip(), [float(item) if "." in item else int(item) for item in _split_ids(values)]
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m batch_combat", description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--fights", type=int, default=DEFAULT_FIGHTS,
+                        help="combates simulados por combinação e grupo de inimigos")
+    parser.add_argument("--deck", type=_split_ids,
+                        help="baralho do jogador, com ids separados por vírgula (padrão: o de Ulisses)")
+    parser.add_argument("--lineup", action="append", type=_split_ids,
+                        help="inimigos de um combate separados por vírgula "
+                             "(pode ser repetido; padrão: os combates do mapa)")
+    parser.add_argument("--set", action="append", type=_parse_setting, default=[], dest="grid",
+                        help="valores testados de um campo dos dados, como Pedra_lvl_1.damage=30,42,54 "
+                             "(pode ser repetido; as combinações formam a grade)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        parser.error("o NumPy não está instalado (pip install numpy)")
+    for card_id in args.deck or ():
+        if card_id not in core.default_card_configurations['cards']:
+            parser.error(f"carta desconhecida: {card_id}")
+    for name in {name for lineup in args.lineup or () for name in lineup}:
+        if name not in core.default_entity_configurations['entities']:
+            parser.error(f"entidade desconhecida: {name}")
+    grid = dict(args.grid)
+    try:
+        apply_overrides({path: values[0] for path, values in grid.items()})
+    except KeyError as error:
+        parser.error(error.args[0])
+
+    start = perf_counter()
+    report = grid_search(grid, args.lineup or DEFAULT_LINEUPS, args.deck, args.fights, args.seed)
+    elapsed = perf_counter() - start
+    turns = sum(result.fight_turns for _, _, result in report)
+    print(f"{len(report) * args.fights} combates, {turns} turnos em {elapsed:.2f} s "
+          f"({turns / elapsed / 1e6:.2f} milhões de turnos por segundo)", file=sys.stderr)
+
+    write = write_csv if args.format == "csv" else write_json
+    if args.output:
+        with open(args.output, "w", newline="") as file:
+            write(report, file)
+    else:
+        write(report, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,825 @@
+""" Módulo com as regras de combate do jogo, independente do pygame.
+
+    Aqui ficam as fórmulas das cartas, a estrutura dos baralhos e a ordem dos
+    turnos de um encontro. As telas (`CombatLevel`, `Entity`, `Card`) usam
+    estas regras e apenas acrescentam sprites, animações e sons por meio dos
+    métodos `engage_*` das entidades; sem elas, um combate inteiro pode ser
+    simulado sem display, mixer ou superfícies.
+"""
+
+
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+from types import MappingProxyType
+import random
+from combat_state import CombatantSnapshot, DeckSnapshot, EncounterSnapshot
+# Dados já validados de `cards.json` e `entities.json` (ver `game_data`)
+from game_data import DataError
+from game_data import card_configurations as default_card_configurations
+from game_data import entity_configurations as default_entity_configurations
+import status_effects as se
+
+MAX_DEFENSE = 50
+HAND_SIZE = 5
+
+# Tipo dos arrays das pilhas (inteiros sem sinal de 2 bytes)
+PILE_TYPECODE = "H"
+
+
+def resolve_attack(owner, target, damage: int):
+    """ Aplica o dano de uma carta de ataque em `target`, considerando a defesa
+        do alvo e os multiplicadores das duas entidades.
+    """
+    if target.current_defense < damage:
+        # Subtrai a diferença entre o dano e a defesa da vida atual do alvo
+        dealt = int((damage*owner.damage_multiplier)/target.absorption_multiplier)
+        new_target_hp = target.current_life - (dealt - target.current_defense)
+        if new_target_hp <= 0:
+            target.current_life = 0
+            target.engage_death()
+        else:
+            target.current_life = new_target_hp
+        target.current_defense = 0
+    else:
+        target.current_defense -= damage
+    owner.engage_attack()
+    target.engage_hit()
+
+
+def resolve_defense(target, defense: int):
+    """ Aumenta a defesa de `target`, respeitando a defesa máxima. """
+    target.current_defense = min(target.current_defense + defense, target.max_defense)
+
+
+def instantiate_status_effect(status_effect_id, **kwargs) -> se.StatusEffect:
+    """ Cria o efeito de status descrito por `status_effect_id` (o número de
+        `cards.json` ou o `EffectTypes` correspondente) com os parâmetros de
+        `cards.json` (ver `status_effects.EFFECT_RULES`). Gera um KeyError
+        caso falte algum parâmetro.
+    """
+    chosen_effect_type = se.EffectTypes(status_effect_id)
+    try:
+        return se.StatusEffect.from_info(chosen_effect_type, kwargs)
+    except KeyError as error:
+        raise KeyError(f"parâmetro {error} ausente para o efeito {chosen_effect_type.name}") from error
+
+
+def resolve_effect(owner, target, status_effect: se.StatusEffect, offensive: bool):
+    """ Aplica imediatamente `status_effect` em `target` e o registra na tabela
+        de efeitos ofensivos ou defensivos do alvo.
+    """
+    if offensive:
+        owner.engage_attack()
+        target.applied_offensive_effects.apply(status_effect, target)
+    else:
+        target.applied_defensive_effects.apply(status_effect, target)
+
+
+def charge_card(owner, card, hand_index: int = None):
+    """ Cobra o custo de `card` e a move da mão de `owner` para o descarte.
+        Com `hand_index`, descarta a cópia dessa posição da mão.
+    """
+    owner.current_energy -= card.cost
+    if hand_index is None:
+        owner.deck.discard_card(card)
+    else:
+        owner.deck.discard_at(hand_index)
+    owner.deck.selected_card = None
+
+
+class CardDef:
+    """
+    Regras de uma carta de `cards.json`, sem sprite. Existe uma única instância
+    imutável por carta, criada ao importar o módulo (ver `card_def`); os
+    baralhos guardam apenas o índice dela em `CARD_DEFS`.
+
+    Atributos
+    ---------
+        id : int
+            Índice da carta em `CARD_DEFS`
+        name : str
+            Identificador da carta em `cards.json`
+        cost : int
+            Custo energético da carta
+        type : str
+            "attack", "defense", "offensive_effect" ou "defensive_effect"
+        damage : int
+            Dano das cartas de ataque
+        defense : int
+            Defesa das cartas de defesa
+        status_effect_id : int
+            Número do efeito das cartas de efeito em `cards.json`
+        status_effect_type : EffectTypes
+            Tipo do efeito, já convertido por `game_data`
+        status_effect_info : Mapping
+            Parâmetros do efeito
+        status_effect : StatusEffect
+            O efeito aplicado pela carta, criado uma única vez
+    """
+    __slots__ = ("id", "name", "cost", "type", "damage", "defense",
+                 "status_effect_id", "status_effect_type", "status_effect_info", "status_effect")
+
+    def __init__(self, id: int, name: str, card_info: dict):
+        set_field = super().__setattr__
+        set_field("id", id)
+        set_field("name", name)
+        set_field("cost", card_info['cost'])
+        set_field("type", card_info['type'])
+        set_field("damage", card_info.get('damage', 0))
+        set_field("defense", card_info.get('defense', 0))
+        set_field("status_effect_id", card_info.get('status_effect_id'))
+        set_field("status_effect_type", card_info.get('status_effect_type'))
+        set_field("status_effect_info", MappingProxyType(dict(card_info.get('status_effect_info', {}))))
+        status_effect = None
+        if self.status_effect_type != None:
+            try:
+                status_effect = instantiate_status_effect(self.status_effect_type, **self.status_effect_info)
+            except KeyError as error:
+                raise DataError([f"cards.{name}.status_effect_info: {error.args[0]}"]) from error
+        set_field("status_effect", status_effect)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __repr__(self):
+        return f"CardDef({self.name!r})"
+
+    def check_energy(self, owner) -> bool:
+        return self.cost <= owner.current_energy
+
+    def check_target(self, owner, target) -> bool:
+        if self.type == 'defense' or self.type == 'defensive_effect':
+            return owner == target
+        return not owner == target
+
+    def validate_application(self, owner, target) -> bool:
+        return (self.check_energy(owner) and self.check_target(owner,target) and target.check_is_alive())
+
+    def resolve(self, owner, target):
+        """ Aplica o efeito da carta em `target`, sem validar a jogada nem
+            cobrar o custo.
+        """
+        if self.type == 'attack':
+            resolve_attack(owner, target, self.damage)
+        elif self.type == 'defense':
+            resolve_defense(target, self.defense)
+        else:
+            resolve_effect(owner, target, self.status_effect, self.type == 'offensive_effect')
+
+    def apply_card(self, owner, target, hand_index: int = None) -> bool:
+        """ Aplica a carta em `target` caso a jogada seja válida, cobrando seu
+            custo (ver `charge_card`). Retorna se a carta foi de fato jogada.
+        """
+        if not self.validate_application(owner, target):
+            return False
+        self.resolve(owner, target)
+        charge_card(owner, self, hand_index)
+        return True
+
+
+# Todas as cartas de `cards.json`, na ordem do arquivo; o índice de cada uma é
+# o seu `CardDef.id`
+CARD_DEFS = tuple(CardDef(index, card_id, card_info) for index, (card_id, card_info)
+                  in enumerate(default_card_configurations['cards'].items()))
+CARD_IDS = {card.name: card.id for card in CARD_DEFS}
+
+
+def card_def(card_id: str) -> CardDef:
+    """ Retorna o `CardDef` da carta `card_id`. """
+    return CARD_DEFS[CARD_IDS[card_id]]
+
+
+def _pile(cards) -> array:
+    # Pilha compacta com os índices das cartas
+    return array(PILE_TYPECODE, [card.id for card in cards])
+
+
+class CombatDeck:
+    """
+    Pilhas de cartas de uma entidade durante o combate. Cada pilha é um array
+    compacto com os índices das cartas em `CARD_DEFS`, então embaralhar,
+    comprar e descartar só movem inteiros.
+
+    Atributos
+    ---------
+        hand : tuple[CardDef]
+            Cartas disponíveis para serem jogadas no round atual
+        draw_pile : tuple[CardDef]
+            Cartas disponíveis para os próximos rounds
+        discard_pile : tuple[CardDef]
+            Cartas já usadas, que voltam ao `draw_pile` quando ele acaba
+        exhaust_pile : tuple[CardDef]
+            Cartas indisponíveis até o fim do combate
+        owner : Combatant
+            Dono do baralho
+        selected_card
+            Carta escolhida pelo dono para ser jogada
+
+    As propriedades das pilhas retornam cópias; o baralho é alterado apenas
+    pelos seus métodos ou atribuindo uma pilha inteira. Os arrays podem estar
+    compartilhados com um snapshot (ver `snapshot`) e são copiados antes da
+    primeira alteração depois dele.
+    """
+    def __init__(self, draw_pile: list = None):
+        self._shared = False
+        self._hand = array(PILE_TYPECODE)
+        self._draw_pile = _pile(draw_pile or ())
+        self._discard_pile = array(PILE_TYPECODE)
+        self._exhaust_pile = array(PILE_TYPECODE)
+        self.owner = None
+        self.selected_card = None
+
+    def _own(self):
+        # Copia as pilhas compartilhadas com um snapshot antes de alterá-las
+        if self._shared:
+            self._hand = array(PILE_TYPECODE, self._hand)
+            self._draw_pile = array(PILE_TYPECODE, self._draw_pile)
+            self._discard_pile = array(PILE_TYPECODE, self._discard_pile)
+            self._exhaust_pile = array(PILE_TYPECODE, self._exhaust_pile)
+            self._shared = False
+
+    @property
+    def hand(self) -> tuple:
+        return tuple(CARD_DEFS[i] for i in self._hand)
+
+    @hand.setter
+    def hand(self, cards):
+        self._own()
+        self._hand = _pile(cards)
+
+    @property
+    def draw_pile(self) -> tuple:
+        return tuple(CARD_DEFS[i] for i in self._draw_pile)
+
+    @draw_pile.setter
+    def draw_pile(self, cards):
+        self._own()
+        self._draw_pile = _pile(cards)
+
+    @property
+    def discard_pile(self) -> tuple:
+        return tuple(CARD_DEFS[i] for i in self._discard_pile)
+
+    @discard_pile.setter
+    def discard_pile(self, cards):
+        self._own()
+        self._discard_pile = _pile(cards)
+
+    @property
+    def exhaust_pile(self) -> tuple:
+        return tuple(CARD_DEFS[i] for i in self._exhaust_pile)
+
+    @exhaust_pile.setter
+    def exhaust_pile(self, cards):
+        self._own()
+        self._exhaust_pile = _pile(cards)
+
+    @property
+    def hand_ids(self) -> array:
+        """ Os índices das cartas da mão. Não deve ser alterado. """
+        return self._hand
+
+    @property
+    def draw_pile_ids(self) -> array:
+        """ Os índices das cartas do `draw_pile`. Não deve ser alterado. """
+        return self._draw_pile
+
+    def card_at(self, hand_index: int) -> CardDef:
+        return CARD_DEFS[self._hand[hand_index]]
+
+    def add_card(self, card: CardDef):
+        """ Acrescenta `card` ao `draw_pile`. """
+        self._own()
+        self._draw_pile.append(card.id)
+
+    def snapshot(self) -> DeckSnapshot:
+        """ Retorna as pilhas atuais sem copiá-las; o baralho passa a
+            copiá-las antes da próxima alteração.
+        """
+        self._shared = True
+        return DeckSnapshot(self._hand, self._draw_pile, self._discard_pile,
+                            self._exhaust_pile, self.selected_card)
+
+    def restore(self, snapshot: DeckSnapshot):
+        """ Volta às pilhas de `snapshot`, sem copiá-las. """
+        self._shared = True
+        self._hand = snapshot.hand
+        self._draw_pile = snapshot.draw_pile
+        self._discard_pile = snapshot.discard_pile
+        self._exhaust_pile = snapshot.exhaust_pile
+        self.selected_card = snapshot.selected_card
+
+    @classmethod
+    def from_ids(cls, draw_pile_ids: list):
+        return cls([card_def(card_id) for card_id in draw_pile_ids])
+
+    def set_owner(self, owner):
+        self.owner = owner
+
+    def shuffle_and_allocate(self, rng=random):
+        """ Descarta a mão atual, embaralha o `draw_pile` e compra a próxima mão.
+
+            Parâmetros:
+                rng: Fonte de aleatoriedade com o método `shuffle`, como o
+                    módulo `random` ou uma instância de `random.Random`.
+        """
+        self._own()
+        # limpar mao atual e mover para pilha de descarte
+        self._discard_pile += self._hand
+        self._hand = array(PILE_TYPECODE)
+        self.selected_card = None
+        # Caso não temos cartas suficentes para formar uma mão adcionamos do deck de descarte
+        if len(self._draw_pile) < HAND_SIZE:
+            self._draw_pile += self._discard_pile
+            self._discard_pile = array(PILE_TYPECODE)
+        # Embaralhamos o deck e removemos as primeiras cartas
+        rng.shuffle(self._draw_pile)
+        self._hand = self._draw_pile[:HAND_SIZE]
+        del self._draw_pile[:HAND_SIZE]
+
+    def discard_card(self, *args):
+        """ Remove as cartas da mão atual e as adiciona à pilha de descarte. """
+        self._own()
+        for each_card in args:
+            self._discard_at(self._hand_index(each_card))
+
+    def discard_at(self, hand_index: int):
+        """ Move a carta da posição `hand_index` da mão para o descarte. """
+        self._own()
+        self._discard_at(hand_index)
+
+    def _hand_index(self, card) -> int:
+        # Cópias da mesma carta são equivalentes; usamos a primeira
+        return self._hand.index(card.id)
+
+    def _discard_at(self, hand_index: int):
+        self._discard_pile.append(self._hand[hand_index])
+        del self._hand[hand_index]
+
+
+class Combatant:
+    """
+    Estado de combate de uma entidade: vida, defesa, energia, multiplicadores,
+    efeitos e baralho. `Entity` herda desta classe e sobrescreve os métodos
+    `engage_*`, que aqui não fazem nada, para tocar animações e sons.
+
+    Atributos
+    ---------
+        name : str
+            Nome da entidade em `entities.json`
+        current_life, max_hp : int
+            Vida atual e máxima
+        current_defense, max_defense : int
+            Defesa atual e máxima
+        current_energy, max_energy : int
+            Energia atual e máxima para aplicar cartas
+        damage_multiplier, absorption_multiplier : float
+            Multiplicadores do dano causado e do dano recebido
+        applied_offensive_effects : EffectTable
+            Efeitos negativos aplicados por inimigos
+        applied_defensive_effects : EffectTable
+            Efeitos positivos aplicados por si mesmo
+        deck : CombatDeck
+            Baralho da entidade
+        policy : EnemyPolicy
+            Política que escolhe as cartas da entidade quando ela é um inimigo;
+            com `None`, a primeira carta da mão (ver `FirstCardPolicy`)
+
+    Assim como as pilhas do baralho, as tabelas de efeitos são copiadas no
+    primeiro acesso depois de um snapshot.
+    """
+    def __init__(self, name: str, max_hp: int, max_energy: int, deck: CombatDeck, policy=None):
+        self._effects_shared = False
+        self.name = name
+        self.max_defense = MAX_DEFENSE
+        self.current_defense = 0
+        self.current_life = max_hp
+        self.max_hp = max_hp
+        self.max_energy = max_energy
+        self.current_energy = max_energy
+
+        self.damage_multiplier = 1
+        self.absorption_multiplier = 1
+
+        self.applied_offensive_effects = se.EffectTable()
+        self.applied_defensive_effects = se.EffectTable()
+
+        self.deck = deck
+        self.deck.set_owner(self)
+        self.policy = policy
+
+    @classmethod
+    def from_config(cls, name: str, draw_pile_ids: list = None):
+        """ Cria a entidade `name` de `entities.json`, opcionalmente com outro
+            baralho inicial.
+        """
+        entity_info = default_entity_configurations['entities'][name]
+        if draw_pile_ids is None:
+            draw_pile_ids = entity_info['draw_pile']
+        return cls(name, entity_info['max_hp'], entity_info['max_energy'],
+                   CombatDeck.from_ids(draw_pile_ids),
+                   create_enemy_policy(entity_info.get('policy')))
+
+    def clone(self) -> "Combatant":
+        """ Cria uma cópia independente do estado de combate da entidade, sem
+            sprites nem sons, para simulações. A cópia compartilha as pilhas e
+            os efeitos até alterá-los (ver `snapshot`) e usa a política padrão,
+            para que as buscas não se repitam dentro das próprias simulações.
+        """
+        other = Combatant(self.name, self.max_hp, self.max_energy, CombatDeck())
+        other.max_defense = self.max_defense
+        other.restore(self.snapshot())
+        other.deck.selected_card = None
+        return other
+
+    def _own_effects(self):
+        if self._effects_shared:
+            self._offensive_effects = self._offensive_effects.copy()
+            self._defensive_effects = self._defensive_effects.copy()
+            self._effects_shared = False
+
+    @property
+    def applied_offensive_effects(self) -> se.EffectTable:
+        self._own_effects()
+        return self._offensive_effects
+
+    @applied_offensive_effects.setter
+    def applied_offensive_effects(self, value: se.EffectTable):
+        self._own_effects()
+        self._offensive_effects = value
+
+    @property
+    def applied_defensive_effects(self) -> se.EffectTable:
+        self._own_effects()
+        return self._defensive_effects
+
+    @applied_defensive_effects.setter
+    def applied_defensive_effects(self, value: se.EffectTable):
+        self._own_effects()
+        self._defensive_effects = value
+
+    def snapshot(self) -> CombatantSnapshot:
+        """ Retorna o estado de combate atual em tempo constante, compartilhando
+            as tabelas de efeitos e as pilhas do baralho (ver `combat_state`).
+        """
+        self._effects_shared = True
+        return CombatantSnapshot(self.current_life, self.current_defense, self.current_energy,
+                                 self.damage_multiplier, self.absorption_multiplier,
+                                 self._offensive_effects, self._defensive_effects,
+                                 self.deck.snapshot())
+
+    def restore(self, snapshot: CombatantSnapshot):
+        """ Volta ao estado de `snapshot`, em tempo constante. O mesmo snapshot
+            pode ser restaurado várias vezes.
+        """
+        self.current_life = snapshot.current_life
+        self.current_defense = snapshot.current_defense
+        self.current_energy = snapshot.current_energy
+        self.damage_multiplier = snapshot.damage_multiplier
+        self.absorption_multiplier = snapshot.absorption_multiplier
+        self._offensive_effects = snapshot.applied_offensive_effects
+        self._defensive_effects = snapshot.applied_defensive_effects
+        self._effects_shared = True
+        self.deck.restore(snapshot.deck)
+
+    def check_is_alive(self):
+        return self.current_life > 0
+
+    def engage_hit(self): pass
+
+    def engage_attack(self): pass
+
+    def engage_death(self): pass
+
+    def apply_offensive_effects(self):
+        self.applied_offensive_effects.tick(self)
+
+    def apply_defensive_effects(self):
+        self.applied_defensive_effects.tick(self)
+
+    def clear_multipliers(self):
+        self.absorption_multiplier = 1
+        self.damage_multiplier = 1
+
+
+class EnemyPolicy(ABC):
+    """ Escolhe as cartas de um inimigo durante o turno dele.
+
+    Atributos
+    ---------
+        background : bool
+            Indica se a escolha é demorada o bastante para ser feita fora do
+            loop principal, sobre uma cópia do encontro (ver `Encounter.clone`)
+    """
+    background = False
+
+    @abstractmethod
+    def choose(self, encounter, enemy) -> int:
+        """ Retorna o índice, na mão de `enemy`, da carta a ser jogada. """
+
+
+class FirstCardPolicy(EnemyPolicy):
+    """ Política padrão: sempre a primeira carta da mão. """
+    def choose(self, encounter, enemy) -> int:
+        return 0
+
+
+# Políticas que podem ser escolhidas pelo campo "policy" de `entities.json`.
+# `enemy_ai` acrescenta as políticas de busca ao ser importado
+ENEMY_POLICIES = {
+    "first_card": FirstCardPolicy,
+}
+
+_first_card_policy = FirstCardPolicy()
+
+
+def create_enemy_policy(config) -> EnemyPolicy:
+    """ Cria a política descrita no campo "policy" de uma entidade: o nome da
+        política ou um dicionário com o nome ("name") e os parâmetros dela.
+        Sem configuração, retorna `None` (a política padrão).
+    """
+    if config is None:
+        return None
+    if isinstance(config, str):
+        config = {"name": config}
+    options = dict(config)
+    name = options.pop("name")
+    if name not in ENEMY_POLICIES:
+        # Importado aqui pois `enemy_ai` depende deste módulo
+        import enemy_ai
+    if name not in ENEMY_POLICIES:
+        raise ValueError(f"Política de inimigo desconhecida: {name}")
+    return ENEMY_POLICIES[name](**options)
+
+
+class Encounter:
+    """
+    Um combate entre o jogador e um grupo de inimigos. Controla a ordem dos
+    turnos; a escolha das cartas do jogador fica com quem conduz o encontro (a
+    tela de combate ou uma política de simulação).
+
+    Atributos
+    ---------
+        player : Combatant
+            O jogador
+        enemies : list[Combatant]
+            Os inimigos do encontro
+        rng
+            Fonte de aleatoriedade usada para embaralhar os baralhos
+        is_player_turn : bool
+            Indica se é a vez do jogador
+        cards_played : Counter
+            Quantas vezes o jogador usou cada carta
+    """
+    def __init__(self, player: Combatant, enemies: list, rng=random):
+        self.player = player
+        self.enemies = enemies
+        self.rng = rng
+        self.is_player_turn = True
+        self.cards_played = Counter()
+
+    def clone(self, rng=None) -> "Encounter":
+        """ Cria uma cópia independente do encontro (ver `Combatant.clone`),
+            que embaralha com `rng`; por padrão, com um `random.Random` novo.
+        """
+        other = Encounter(self.player.clone(), [enemy.clone() for enemy in self.enemies],
+                          rng if rng is not None else random.Random())
+        other.is_player_turn = self.is_player_turn
+        return other
+
+    def snapshot(self) -> EncounterSnapshot:
+        """ Retorna o estado atual do encontro, para ser restaurado com
+            `restore`. O custo depende apenas da quantidade de entidades.
+        """
+        return EncounterSnapshot(self.player.snapshot(),
+                                 tuple(enemy.snapshot() for enemy in self.enemies),
+                                 self.is_player_turn, dict(self.cards_played))
+
+    def restore(self, snapshot: EncounterSnapshot):
+        self.player.restore(snapshot.player)
+        for enemy, enemy_snapshot in zip(self.enemies, snapshot.enemies):
+            enemy.restore(enemy_snapshot)
+        self.is_player_turn = snapshot.is_player_turn
+        self.cards_played = Counter(snapshot.cards_played)
+
+    def begin(self):
+        """ Prepara o início do combate: compra a mão do jogador e restaura a
+            energia, a defesa e os multiplicadores dele e a vida dos inimigos.
+        """
+        self.player.deck.shuffle_and_allocate(self.rng)
+        self.player.clear_multipliers()
+        self.player.current_defense = 0
+        self.player.current_energy = self.player.max_energy
+        for enemy in self.enemies:
+            enemy.current_life = enemy.max_hp
+        self.is_player_turn = True
+
+    def play_card(self, card, target) -> bool:
+        """ Joga `card` da mão do jogador em `target`. Retorna se a carta foi
+            aplicada.
+        """
+        played = card.apply_card(self.player, target)
+        if played:
+            self.cards_played[card.name] += 1
+        return played
+
+    def play_at(self, hand_index: int, target) -> bool:
+        """ Joga em `target` a carta da posição `hand_index` da mão do jogador,
+            descartando essa cópia, e não a primeira igual a ela. É assim que
+            as jogadas gravadas no replay são reproduzidas. Retorna se a carta
+            foi aplicada.
+        """
+        card = self.player.deck.card_at(hand_index)
+        played = card.apply_card(self.player, target, hand_index)
+        if played:
+            self.cards_played[card.name] += 1
+        return played
+
+    def end_player_turn(self):
+        for each_enemy in self.enemies:
+            each_enemy.current_defense = 0
+            each_enemy.deck.shuffle_and_allocate(self.rng)
+            each_enemy.apply_offensive_effects()
+            each_enemy.apply_defensive_effects()
+        self.player.current_energy = self.player.max_energy
+        self.player.deck.shuffle_and_allocate(self.rng)
+        self.player.clear_multipliers()
+        self.is_player_turn = False
+
+    def acting_enemy(self) -> Combatant:
+        """ Retorna o primeiro inimigo que ainda pode agir neste turno, ou
+            `None` caso nenhum possa.
+        """
+        for enemy in self.enemies:
+            if enemy.check_is_alive() and enemy.current_energy > 0 and len(enemy.deck.hand_ids) > 0:
+                return enemy
+        return None
+
+    def enemy_policy(self, enemy: Combatant) -> EnemyPolicy:
+        return enemy.policy if enemy.policy is not None else _first_card_policy
+
+    def play_enemy_card(self, enemy: Combatant, card) -> bool:
+        """ Joga `card` da mão de `enemy`: ataques no jogador e defesas no
+            próprio inimigo. Retorna se a carta foi aplicada.
+        """
+        enemy.deck.selected_card = card
+        played = False
+        if card.type == 'attack':
+            played = card.apply_card(enemy, self.player)
+        elif card.type == 'defense':
+            played = card.apply_card(enemy, enemy)
+        # Caso o inimigo não possa jogar a carta atual ainda queremos
+        # olhar as próximas, assim descartamos a carta e prosseguimos
+        if not played:
+            enemy.deck.discard_card(card)
+            enemy.deck.selected_card = None
+        return played
+
+    def step_enemy_turn(self, hand_index: int = None) -> bool:
+        """ Faz o primeiro inimigo que ainda pode agir jogar uma carta da mão,
+            escolhida pela política dele ou dada por `hand_index`. Quando
+            nenhum inimigo pode agir, encerra o turno dos inimigos. Retorna se
+            alguma carta foi escolhida.
+        """
+        enemy = self.acting_enemy()
+        if enemy is None:
+            self.end_enemies_turn()
+            return False
+        if hand_index is None:
+            hand_index = self.enemy_policy(enemy).choose(self, enemy)
+        self.play_enemy_card(enemy, enemy.deck.card_at(hand_index))
+        return True
+
+    def run_enemy_turn(self):
+        """ Executa o turno inteiro dos inimigos de uma só vez. """
+        while self.step_enemy_turn():
+            pass
+
+    def end_enemies_turn(self):
+        self.player.current_defense = 0
+        self.player.apply_offensive_effects()
+        self.player.apply_defensive_effects()
+        for each_enemy in self.enemies:
+            each_enemy.current_energy = each_enemy.max_energy
+        self.is_player_turn = True
+
+    def check_win(self) -> bool:
+        for each_enemy in self.enemies:
+            if each_enemy.check_is_alive():
+                return False
+        return True
+
+    def check_loss(self) -> bool:
+        return not self.player.check_is_alive()
+
+    def is_over(self) -> bool:
+        return self.check_win() or self.check_loss()
+
+
+class GreedyPlayerPolicy:
+    """ Política simples para o jogador nas simulações: joga a primeira carta
+        possível da mão, repetindo até não conseguir jogar mais nenhuma. Cartas
+        ofensivas miram o inimigo vivo com menos vida; sem inimigos vivos, o
+        turno acaba.
+    """
+    def play_turn(self, encounter: Encounter):
+        # A energia só diminui durante o turno, então uma carta que não pôde ser
+        # jogada não volta a ser jogável e basta percorrer a mão uma vez
+        for card_id in encounter.player.deck.hand_ids.tolist():
+            card = CARD_DEFS[card_id]
+            target = self.choose_target(encounter, card)
+            if target is None:
+                break
+            encounter.play_card(card, target)
+
+    def choose_target(self, encounter: Encounter, card):
+        if card.type == 'defense' or card.type == 'defensive_effect':
+            return encounter.player
+        target = None
+        for enemy in encounter.enemies:
+            if enemy.current_life > 0 and (target is None or enemy.current_life < target.current_life):
+                target = enemy
+        return target
+
+
+class FightResult:
+    """
+    Resultado de um combate simulado.
+
+    Atributos
+    ---------
+        won : bool
+            Se o jogador venceu
+        turns : int
+            Quantos turnos do jogador foram jogados
+        player_hp : int
+            Vida restante do jogador
+        enemy_hp : int
+            Soma da vida restante dos inimigos
+        cards_played : Counter
+            Quantas vezes o jogador usou cada carta
+    """
+    def __init__(self, won: bool, turns: int, player_hp: int, enemy_hp: int, cards_played: Counter):
+        self.won = won
+        self.turns = turns
+        self.player_hp = player_hp
+        self.enemy_hp = enemy_hp
+        self.cards_played = cards_played
+
+    def __repr__(self):
+        return (f"FightResult(won={self.won}, turns={self.turns}, "
+                f"player_hp={self.player_hp}, enemy_hp={self.enemy_hp})")
+
+
+def run_encounter(encounter: Encounter, player_policy=None, max_turns: int = 100) -> FightResult:
+    """ Conduz `encounter` do início ao fim, com `player_policy` escolhendo as
+        cartas do jogador. O combate é interrompido após `max_turns` turnos.
+    """
+    if player_policy is None:
+        player_policy = GreedyPlayerPolicy()
+
+    turns = 0
+    encounter.begin()
+    while turns < max_turns and not encounter.is_over():
+        turns += 1
+        player_policy.play_turn(encounter)
+        if encounter.check_win():
+            break
+        encounter.end_player_turn()
+        if encounter.check_win():
+            break
+        encounter.run_enemy_turn()
+
+    return FightResult(
+        won=encounter.check_win(),
+        turns=turns,
+        player_hp=encounter.player.current_life,
+        enemy_hp=sum(enemy.current_life for enemy in encounter.enemies),
+        cards_played=encounter.cards_played,
+    )
+
+
+def simulate_fight(enemy_names: list, draw_pile_ids: list = None, rng=None,
+                   player_policy=None, player_name: str = "Ulisses",
+                   max_turns: int = 100, start_hp: int = None) -> FightResult:
+    """ Simula um combate completo entre `player_name` e os inimigos de
+        `enemy_names`, como em `CombatLevel(staged_enemies=...)`.
+
+        Parâmetros:
+            enemy_names (list): Nomes dos inimigos em `entities.json`.
+            draw_pile_ids (list): Baralho do jogador; por padrão, o de
+                `entities.json`.
+            rng: Fonte de aleatoriedade dos embaralhamentos. Por padrão, um
+                `random.Random` novo.
+            player_policy: Objeto com o método `play_turn(encounter)`.
+            max_turns (int): Limite de turnos do combate.
+            start_hp (int): Vida inicial do jogador; por padrão, a máxima.
+    """
+    if rng is None:
+        rng = random.Random()
+    player = Combatant.from_config(player_name, draw_pile_ids)
+    if start_hp != None:
+        player.current_life = start_hp
+    enemies = [Combatant.from_config(name) for name in enemy_names]
+    return run_encounter(Encounter(player, enemies, rng), player_policy, max_turns)
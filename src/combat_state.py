@@ -0,0 +1,65 @@
+""" Cópias compactas do estado de um combate, para buscas e para desfazer
+    jogadas.
+
+    Um snapshot guarda apenas os valores de combate (vida, defesa, energia,
+    multiplicadores, efeitos e pilhas do baralho), sem sprites, sons ou
+    retângulos das entidades visuais. As pilhas e as tabelas de efeitos não são
+    copiadas: o snapshot e a entidade passam a compartilhá-las, e a entidade só
+    faz a cópia quando for alterá-las de novo (cópia na escrita; ver
+    `Combatant.snapshot` e `CombatDeck.snapshot`). Assim, tirar e restaurar um
+    snapshot tem custo constante, independente do tamanho dos baralhos, e as
+    pilhas e tabelas que não mudam continuam compartilhadas entre vários snapshots.
+"""
+
+
+from array import array
+from status_effects import EffectTable
+
+
+class DeckSnapshot:
+    """ Pilhas de um `CombatDeck`, como arrays de índices de cartas. Os arrays
+        são compartilhados e nunca devem ser alterados.
+    """
+    __slots__ = ("hand", "draw_pile", "discard_pile", "exhaust_pile", "selected_card")
+
+    def __init__(self, hand: array, draw_pile: array, discard_pile: array, exhaust_pile: array, selected_card):
+        self.hand = hand
+        self.draw_pile = draw_pile
+        self.discard_pile = discard_pile
+        self.exhaust_pile = exhaust_pile
+        self.selected_card = selected_card
+
+
+class CombatantSnapshot:
+    """ Estado de combate de um `Combatant`. As tabelas de efeitos são
+        compartilhadas e nunca devem ser alteradas.
+    """
+    __slots__ = ("current_life", "current_defense", "current_energy",
+                 "damage_multiplier", "absorption_multiplier",
+                 "applied_offensive_effects", "applied_defensive_effects", "deck")
+
+    def __init__(self, current_life: int, current_defense: int, current_energy: int,
+                 damage_multiplier: float, absorption_multiplier: float,
+                 applied_offensive_effects: EffectTable, applied_defensive_effects: EffectTable,
+                 deck: DeckSnapshot):
+        self.current_life = current_life
+        self.current_defense = current_defense
+        self.current_energy = current_energy
+        self.damage_multiplier = damage_multiplier
+        self.absorption_multiplier = absorption_multiplier
+        self.applied_offensive_effects = applied_offensive_effects
+        self.applied_defensive_effects = applied_defensive_effects
+        self.deck = deck
+
+
+class EncounterSnapshot:
+    """ Estado de um `Encounter`: o do jogador, o de cada inimigo e de quem é
+        o turno.
+    """
+    __slots__ = ("player", "enemies", "is_player_turn", "cards_played")
+
+    def __init__(self, player: CombatantSnapshot, enemies: tuple, is_player_turn: bool, cards_played: dict):
+        self.player = player
+        self.enemies = enemies
+        self.is_player_turn = is_player_turn
+        self.cards_played = cards_played
@@ -1,43 +1,35 @@
 import random
-from pathlib import Path
+import assets
 import cards
-import json
 import pygame
+from combat_core import CARD_DEFS, CombatDeck, card_def
 
-
-game_dir = Path(__file__).parent.parent
-cards_json_path = game_dir / "assets" / "cards.json"
-
-# Carregando json de configuracoes para construir cartas
-with open(file=cards_json_path,mode='r') as card_config:
-    default_card_configurations = json.load(card_config)
-
-class Deck:
+class Deck(CombatDeck):
     """
     Classe que estrutura baralhos de toda entidade
 
+    As pilhas guardam apenas os índices das cartas (ver `CombatDeck`); as
+    cartas com sprite (`cards.Card`) existem só para a mão atual, criadas
+    quando ela é acessada pela primeira vez depois de comprada.
+
     Atributos
     ---------
         hand : list
             Coleção de cartas atualmente disponiveis para serem jogadas no round de combate
-        draw_pile : list
+        draw_pile : tuple
             Coleção de cartas disponiveis para serem usados em próximos rounds de comabte 
-        discrad_pile : list
+        discrad_pile : tuple
             Coleção de cartas usadas durante os rounds de comabte - podem ser feitas disponiveis 
             caso o draw_pile ficar pequeno o suficiente
-        exhaust_pile : list
+        exhaust_pile : tuple
             Coleção de cartas que estao indisponiveis pelo nivel de jogo
         owner : Entity
             variavel da classe Entidade que indica de quem pertence o baralho - usado 
             para checar a aplicação de cartas
     """
     def __init__(self,draw_pile_ids=[]):
-        self.hand = []
-        self.draw_pile = self.build_draw_pile(draw_pile_ids)
-        self.discard_pile = []
-        self.exhaust_pile =[]
-        self.owner = None
-        self.selected_card = None
+        self._hand_cards = None
+        super().__init__(self.build_draw_pile(draw_pile_ids))
 
     def __str__(self):
         """Metodo responsavel pela representacao em string do deck
@@ -48,70 +40,63 @@ class Deck:
         hand_names = []
         discard_pile_names = []
         for each_card in self.hand:
-            hand_names.append(each_card._name)
+            hand_names.append(each_card.name)
         for each_card in self.discard_pile:
-            discard_pile_names.append(each_card._name)
+            discard_pile_names.append(each_card.name)
         return f"hand:{hand_names}\ndiscard pile:{discard_pile_names}"
+
+    @property
+    def hand(self) -> list:
+        """Cartas com sprite da mão atual, na ordem da mão"""
+        if self._hand_cards == None:
+            # posicionamos as cartas no display
+            self._hand_cards = []
+            for card_index,card_id in enumerate(self.hand_ids):
+                card = cards.Card(CARD_DEFS[card_id])
+                card.x_pos = 100 + 75 * card_index
+                self._hand_cards.append(card)
+        return self._hand_cards
+
+    @hand.setter
+    def hand(self, hand_cards):
+        CombatDeck.hand.fset(self, hand_cards)
+        self._hand_cards = None
     
-    def shuffle_and_allocate(self):
+    def shuffle_and_allocate(self, rng=random):
         """Metodo responsavel pelo embaralhamento do 'draw_pile' e alocacao da mao 
         atual do jogador no inicio de cada round d combate
         """
-        # limpar mao atual e mover para pilha de descarte
-        self.discard_card(*self.hand)    
-        self.selected_card = None
-        # Checamos quantas cartas estão disponíveis
-        cards_to_draw = len(self.draw_pile) 
-        # Caso não temos cartas suficentes para formar uma mão adcionamos do deck de descarte
-        if cards_to_draw < 5: 
-            self.draw_pile+=self.discard_pile
-            self.discard_pile = []
-        # Embaralhamos o deck e removemos as primeiras 5 cartas
-        random.shuffle(self.draw_pile)
-        next_hand = self.draw_pile[:5]
-        del(self.draw_pile[:5])
-        # posicionamos as cartas no display e consturimos nossa mao
-        for card_index,card in enumerate(next_hand):
-            card.x_pos = 100 + 75 * card_index
-        self.hand = next_hand
+        super().shuffle_and_allocate(rng)
+        self._hand_cards = None
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        self._hand_cards = None
+
+    def _hand_index(self, card) -> int:
+        # A carta clicada pelo jogador é uma das cartas com sprite da mão
+        if self._hand_cards != None:
+            for card_index,hand_card in enumerate(self._hand_cards):
+                if hand_card is card:
+                    return card_index
+        return super()._hand_index(card)
+
+    def _discard_at(self, hand_index: int):
+        super()._discard_at(hand_index)
+        if self._hand_cards != None:
+            del self._hand_cards[hand_index]
     
     def build_draw_pile(self,draw_pile_ids:list):
-        """Metodo responsavel por consultar arquivo de configuracao e instanciar
-        novas cartas no 'draw_pile'
+        """Metodo responsavel por consultar as definições das cartas do
+        'draw_pile'
 
         Args:
-            draw_pile_ids (list): lista de nomes de cartas a serem instanciadas
+            draw_pile_ids (list): lista de nomes de cartas
 
         Retorna:
-            list: lista de objetos do tipo Card - baralho disponivel do jogador
+            list: lista de `CardDef` - baralho disponivel do jogador
         """
-        draw_pile = []
-        # iteramos sobre cada identificador de cada carta no baralho 
-        # para depois busacar no arquivo de configuracao
-        for card_id in draw_pile_ids: 
-            card_info = default_card_configurations['cards'][card_id]
-            card_type = card_info['type']
-            if card_type == 'attack':
-                draw_pile.append(cards.AttackCard(card_id,
-                                                  card_info['cost'],card_info['damage'],
-                                                  card_type))
-            elif card_type == 'defense':
-                draw_pile.append(cards.DefenseCard(card_id,
-                                                   card_info['cost'],card_info['defense'],
-                                                   card_type))
-            elif card_type == "offensive_effect":
-                draw_pile.append(cards.OffensiveEffectCard(card_id, 
-                                                  card_info['cost'],
-                                                  card_type,
-                                                  card_info['status_effect_id'],
-                                                  **card_info['status_effect_info']))
-            elif card_type == "defensive_effect":
-                draw_pile.append(cards.DefensiveEffectCard(card_id, 
-                                                  card_info['cost'],
-                                                  card_type,
-                                                  card_info['status_effect_id'],
-                                                  **card_info['status_effect_info']))
-        return draw_pile
+        return [card_def(card_id) for card_id in draw_pile_ids]
     
     def draw_hand_on_screen(self,screen:pygame.display):
         """metodo atualiza centro de cartas na mao do jogador e desenha na tela 
@@ -126,22 +111,14 @@ class Deck:
                 card.rect.center=(card.x_pos,card.y_pos)
             screen.blit(card.sprite,card.rect)
 
-    def set_owner(self,owner):
-        """Define owner de baralho do jogador
-        
-        Args:
-            owner (Entity): variavel da classe Entidade que indica de quem pertence o baralho
+    def load_sprites(self):
+        """Carrega os sprites de todas as cartas do baralho, para que as mãos compradas
+        durante o combate não leiam imagens do disco
         """
-        self.owner = owner
+        for card_id in set(self.hand_ids) | set(self.draw_pile_ids) | set(self._discard_pile):
+            assets.scaled(CARD_DEFS[card_id].name,cards.CARD_SPRITE_SIZE)
 
-    def discard_card(self,*args:cards.Card):
-        """Metodo remove carta de mao atual do jogador e adciona a pilha de descarte
-        """
-        for each_card in args:
-            self.hand.remove(each_card)
-            self.discard_pile.append(each_card)
-    
     def add_single_card(self,card_id:str) -> cards.Card:
-        new_card = self.build_draw_pile(draw_pile_ids=[card_id])
-        self.draw_pile.append(new_card[0])
-        return new_card[0]
+        definition = card_def(card_id)
+        self.add_card(definition)
+        return cards.Card(definition)
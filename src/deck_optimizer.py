@@ -0,0 +1,419 @@
+""" Busca das recompensas que maximizam a chance de vencer uma partida.
+
+    Ao longo de uma rota do mapa, cada combate vencido (menos o último) rende
+    uma carta, escolhida entre as de `reward_card_ids`. A busca em feixe
+    (beam search) percorre os combates em ordem: cada candidato (as cartas
+    escolhidas até ali) é expandido com cada recompensa possível, os filhos
+    enfrentam o combate seguinte e apenas os `beam_width` com maior chance de
+    sobreviver seguem adiante.
+
+    A vida passa de um combate para o outro como uma distribuição de
+    probabilidade. O resultado de um combate depende só do baralho (como
+    multiconjunto, pois o baralho é embaralhado no início), dos inimigos e da
+    vida inicial, agrupada em faixas de `HP_BUCKET` pontos; cada trio é
+    simulado uma única vez (`fight_outcome`), nos processos do pool, e
+    memorizado; com `--cache`, os trios ficam guardados entre execuções (ver
+    `outcome_cache`). Assim como em `simulate_fight`, cada combate começa sem
+    efeitos de status e com inimigos novos.
+
+    O relatório traz as melhores escolhas, a chance de vencer a partida e,
+    para cada recompensa, a melhor chance obtida com cada carta, o que ajuda a
+    pesar as recompensas e a achar cartas fortes demais. Uso (a partir de
+    `src/`):
+
+        python -m deck_optimizer --fights 300 --beam 6
+        python -m deck_optimizer --choices 2,0,1,0 --verify 2000 --format json
+        python -m deck_optimizer --cache
+"""
+
+
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+import json
+import random
+import sys
+import combat_core as core
+from default_map import FIREPLACE_HP, build_default_map
+from map_graph import MapGraph
+from map_node import MapNode, MapNodeType
+from balance import BalanceStats, run_chunk
+from outcome_cache import CACHE_PATH, OutcomeCache, bucket_hp, deck_key
+from replay import reward_card_ids
+from route_analysis import RouteAnalysis, encounter_hp_loss
+
+
+DEFAULT_FIGHTS = 200
+DEFAULT_BEAM_WIDTH = 4
+
+# Probabilidades menores que esta são descartadas das distribuições de vida
+MIN_PROBABILITY = 1e-4
+
+# Casas decimais da chance de sobreviver comparadas entre candidatos; abaixo
+# disso as diferenças são erro de arredondamento das somas, e a vida desempata
+SURVIVAL_DIGITS = 9
+
+# Etapa de fogueira na rota; as demais etapas são os grupos de inimigos
+FIREPLACE = "fireplace"
+
+
+def fight_outcome(deck: tuple, lineup: tuple, start_hp: int, fights: int, seed,
+                  player_name: str = "Ulisses") -> dict:
+    """ Simula `fights` combates do baralho `deck` contra `lineup`, começando
+        com `start_hp` de vida. Executada nos processos do pool, por isso
+        recebe e retorna apenas dados simples.
+
+        Retorna:
+            dict[int, int]: Quantos combates terminaram com cada vida; zero
+            conta as derrotas e os combates que passaram do limite de turnos.
+    """
+    seed = f"{seed}:{','.join(deck)}:{','.join(lineup)}:{start_hp}"
+    return final_hp(run_chunk(list(deck), list(lineup), seed, fights, start_hp, player_name))
+
+
+def final_hp(stats: BalanceStats) -> dict:
+    """ A vida ao fim dos combates de `stats`, com zero para as derrotas e
+        os combates que passaram do limite de turnos (ver `fight_outcome`).
+    """
+    outcome = dict(stats.won_hp)
+    if stats.fights > stats.wins:
+        outcome[0] = stats.fights - stats.wins
+    return outcome
+
+
+def route_stages(route: list) -> list:
+    """ As etapas de uma rota (lista de `MapNode`): `FIREPLACE` ou a tupla
+        com os inimigos de cada combate. Nós sem combate nem fogueira, como a
+        raiz, são ignorados.
+    """
+    stages = []
+    for node in route:
+        if node.type == MapNodeType.FIREPLACE:
+            stages.append(FIREPLACE)
+        elif node.encounter:
+            stages.append(tuple(node.encounter))
+    return stages
+
+
+class Candidate:
+    """ Uma sequência de recompensas e o estado da partida depois dela.
+
+        Atributos:
+            picks (tuple[str]): As cartas escolhidas, em ordem.
+            deck (tuple[str]): O baralho resultante (ver `deck_key`).
+            hp (dict[int, float]): A probabilidade de chegar vivo à etapa
+                atual com cada vida.
+    """
+    __slots__ = ("picks", "deck", "hp")
+
+    def __init__(self, picks: tuple, deck: tuple, hp: dict):
+        self.picks = picks
+        self.deck = deck
+        self.hp = hp
+
+    @property
+    def survival(self) -> float:
+        # As somas de probabilidades podem passar de 1 por arredondamento
+        return min(sum(self.hp.values()), 1.0)
+
+    @property
+    def mean_hp(self) -> float:
+        survival = self.survival
+        return sum(hp * p for hp, p in self.hp.items()) / survival if survival else 0.0
+
+    def score(self) -> tuple:
+        # Maior chance de sobreviver; no empate, mais vida
+        return round(self.survival, SURVIVAL_DIGITS), self.mean_hp
+
+
+class OptimizerResult:
+    """ O resultado de `DeckOptimizer.search`.
+
+        Atributos:
+            picks (tuple[str]): As melhores escolhas, uma por recompensa.
+            deck (tuple[str]): O baralho final.
+            win_rate (float): A chance de vencer a rota com essas escolhas.
+            mean_hp (float): A vida média ao fim da rota, nas vitórias.
+            pick_scores (list[dict[str, tuple[float, float]]]): Para cada
+                recompensa, a maior chance de sobreviver ao combate seguinte
+                com cada carta e a vida média nesse caso.
+            simulations (int): Quantidade de trios (baralho, inimigos, faixa
+                de vida) simulados.
+    """
+
+    def __init__(self, best: Candidate, pick_scores: list, simulations: int):
+        self.picks = best.picks
+        self.deck = best.deck
+        self.win_rate = best.survival
+        self.mean_hp = best.mean_hp
+        self.pick_scores = pick_scores
+        self.simulations = simulations
+
+    def to_dict(self) -> dict:
+        return {
+            "picks": list(self.picks),
+            "deck": list(self.deck),
+            "win_rate": self.win_rate,
+            "mean_hp": self.mean_hp,
+            "pick_scores": [{card: {"survival": survival, "mean_hp": mean_hp}
+                             for card, (survival, mean_hp) in _ranked(scores)} for scores in self.pick_scores],
+            "simulations": self.simulations,
+        }
+
+
+class DeckOptimizer:
+    """ Busca em feixe das recompensas de uma rota.
+
+        Atributos:
+            stages (list): As etapas da rota (ver `route_stages`).
+            rewards (list[str]): As cartas que podem ser escolhidas.
+            outcomes (dict): Os resultados já simulados, por (baralho,
+                inimigos, vida inicial); pode ser preenchido de antemão para
+                reaproveitar simulações.
+            cache (OutcomeCache): Onde buscar e guardar os resultados entre
+                execuções; sem ele, cada trio é simulado com `fight_outcome`.
+    """
+
+    def __init__(self, stages: list, rewards: list = None, fights: int = DEFAULT_FIGHTS,
+                 beam_width: int = DEFAULT_BEAM_WIDTH, seed: int = 0, workers: int = None,
+                 player_name: str = "Ulisses", cache: OutcomeCache = None):
+        """ Construtor da classe.
+
+            Parâmetros:
+                fights (int): Combates simulados por (baralho, inimigos,
+                    faixa de vida).
+                workers (int): Quantidade de processos; com 1, roda no
+                    processo atual. Por padrão, um por núcleo.
+        """
+        self.stages = stages
+        self.rewards = rewards if rewards != None else reward_card_ids()
+        self.fights = fights
+        self.beam_width = beam_width
+        self.seed = seed
+        self.workers = workers
+        self.player_name = player_name
+        self.cache = cache
+        player = core.default_entity_configurations['entities'][player_name]
+        self.max_hp = player['max_hp']
+        self.draw_pile = list(player['draw_pile'])
+        self.outcomes = {}
+
+
+    def search(self) -> OptimizerResult:
+        """ Executa a busca e retorna as melhores escolhas. """
+        fight_stages = [index for index, stage in enumerate(self.stages) if stage != FIREPLACE]
+        last_fight = fight_stages[-1] if fight_stages else -1
+        beam = [Candidate((), deck_key(self.draw_pile), {self.max_hp: 1.0})]
+        pick_scores = []
+
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers != 1 else None
+        try:
+            rewarded = False
+            for index, stage in enumerate(self.stages):
+                if stage == FIREPLACE:
+                    beam = [self._rest(candidate) for candidate in beam]
+                    continue
+
+                beam = self._fight(beam, stage, pool)
+                if rewarded:
+                    # Cada carta vale o melhor dos filhos que a escolheram
+                    scores = {}
+                    for candidate in beam:
+                        card = candidate.picks[-1]
+                        scores[card] = max(scores.get(card, (0.0, 0.0)), candidate.score())
+                    pick_scores.append(scores)
+                beam = self._prune(beam)
+
+                rewarded = index != last_fight
+                if rewarded:
+                    beam = [Candidate(candidate.picks + (card,), deck_key(candidate.deck + (card,)), candidate.hp)
+                            for candidate in beam for card in self.rewards]
+        finally:
+            if pool != None:
+                pool.shutdown()
+
+        return OptimizerResult(max(beam, key=Candidate.score), pick_scores, len(self.outcomes))
+
+
+    def evaluate(self, picks: list) -> Candidate:
+        """ Passa as recompensas `picks`, em ordem, pela rota, com o mesmo
+            modelo da busca, no processo atual.
+        """
+        fight_stages = [index for index, stage in enumerate(self.stages) if stage != FIREPLACE]
+        candidate = Candidate((), deck_key(self.draw_pile), {self.max_hp: 1.0})
+        for index, stage in enumerate(self.stages):
+            if stage == FIREPLACE:
+                candidate = self._rest(candidate)
+                continue
+            candidate = self._fight([candidate], stage, None)[0]
+            if index != fight_stages[-1]:
+                card = picks[len(candidate.picks)]
+                candidate = Candidate(candidate.picks + (card,), deck_key(candidate.deck + (card,)), candidate.hp)
+        return candidate
+
+
+    def _rest(self, candidate: Candidate) -> Candidate:
+        hp = Counter()
+        for value, probability in candidate.hp.items():
+            hp[min(value + FIREPLACE_HP, self.max_hp)] += probability
+        return Candidate(candidate.picks, candidate.deck, dict(hp))
+
+
+    def _fight(self, beam: list, lineup: tuple, pool) -> list:
+        """ Passa cada candidato pelo combate contra `lineup`. """
+        needed = {(candidate.deck, lineup, bucket_hp(hp, self.max_hp)) for candidate in beam for hp in candidate.hp}
+        self._simulate([key for key in needed if key not in self.outcomes], pool)
+
+        fought = []
+        for candidate in beam:
+            hp = Counter()
+            for value, probability in candidate.hp.items():
+                start = bucket_hp(value, self.max_hp)
+                outcome = self.outcomes[(candidate.deck, lineup, start)]
+                total = sum(outcome.values())
+                for end, count in outcome.items():
+                    # A vida final é deslocada pela distância até o
+                    # representante da faixa
+                    final = min(end + value - start, self.max_hp) if end > 0 else 0
+                    if final > 0:
+                        hp[final] += probability * count / total
+            fought.append(Candidate(candidate.picks, candidate.deck,
+                                    {value: p for value, p in hp.items() if p >= MIN_PROBABILITY}))
+        return fought
+
+
+    def _simulate(self, keys: list, pool):
+        if self.cache != None:
+            results = self.cache.get_many(keys, self.fights, self.player_name, workers=1, pool=pool)
+            for key, stats in zip(keys, results):
+                self.outcomes[key] = final_hp(stats)
+            return
+        if pool == None:
+            for key in keys:
+                self.outcomes[key] = fight_outcome(*key, self.fights, self.seed, self.player_name)
+            return
+        futures = [(key, pool.submit(fight_outcome, *key, self.fights, self.seed, self.player_name)) for key in keys]
+        for key, future in futures:
+            self.outcomes[key] = future.result()
+
+
+    def _prune(self, beam: list) -> list:
+        # Os melhores candidatos, um por baralho: o futuro depende apenas do
+        # baralho e da vida
+        best = {}
+        for candidate in beam:
+            current = best.get(candidate.deck)
+            if current == None or candidate.score() > current.score():
+                best[candidate.deck] = candidate
+        return sorted(best.values(), key=Candidate.score, reverse=True)[:self.beam_width]
+
+
+def simulate_run(stages: list, picks: list, runs: int, seed=0, player_name: str = "Ulisses") -> float:
+    """ Simula `runs` partidas completas pela rota, com a vida exata de um
+        combate para o outro e as cartas de `picks` como recompensas.
+        Retorna a fração de vitórias.
+    """
+    rng = random.Random(f"{seed}:run")
+    player_info = core.default_entity_configurations['entities'][player_name]
+    fight_count = sum(stage != FIREPLACE for stage in stages)
+    wins = 0
+    for _ in range(runs):
+        deck = list(player_info['draw_pile'])
+        hp = player_info['max_hp']
+        fights = 0
+        for stage in stages:
+            if stage == FIREPLACE:
+                hp = min(hp + FIREPLACE_HP, player_info['max_hp'])
+                continue
+            player = core.Combatant.from_config(player_name, deck)
+            player.current_life = hp
+            enemies = [core.Combatant.from_config(name) for name in stage]
+            result = core.run_encounter(core.Encounter(player, enemies, rng))
+            if not result.won:
+                break
+            hp = result.player_hp
+            fights += 1
+            if fights < fight_count:
+                deck.append(picks[fights - 1])
+        else:
+            wins += 1
+    return wins / runs if runs else 0.0
+
+
+def route_from_choices(root: MapNode, choices: list) -> list:
+    """ A rota que parte de `root` e segue o filho `choices[i]` em cada nó. """
+    route = [root]
+    for choice in choices:
+        route.append(route[-1].children[choice])
+    return route
+
+
+def _ranked(scores: dict) -> list:
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def write_text(result: OptimizerResult, stages: list, file):
+    fights = [stage for stage in stages if stage != FIREPLACE]
+    file.write("Rota: " + " → ".join(stage if stage == FIREPLACE else "+".join(stage) for stage in stages) + "\n")
+    for index, pick in enumerate(result.picks):
+        ranked = _ranked(result.pick_scores[index])
+        others = ", ".join(f"{card} {survival:.3f}/{mean_hp:.1f}" for card, (survival, mean_hp) in ranked[:4])
+        file.write(f"Depois de {'+'.join(fights[index])}: {pick} ({others})\n")
+    file.write(f"Chance de vencer: {result.win_rate:.3f}, vida média no fim: {result.mean_hp:.1f}\n")
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m deck_optimizer", description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--fights", type=int, default=DEFAULT_FIGHTS,
+                        help="combates simulados por (baralho, inimigos, faixa de vida)")
+    parser.add_argument("--beam", type=int, default=DEFAULT_BEAM_WIDTH, help="candidatos mantidos a cada combate")
+    parser.add_argument("--choices", type=lambda value: [int(item) for item in value.split(",") if item.strip()],
+                        help="índices dos filhos escolhidos a partir da raiz do mapa padrão "
+                             "(padrão: a rota mais segura de `route_analysis`)")
+    parser.add_argument("--verify", type=int, default=0,
+                        help="partidas completas simuladas para conferir a chance de vencer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="quantidade de processos (padrão: um por núcleo)")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    parser.add_argument("--cache", nargs="?", const=CACHE_PATH,
+                        help="guarda os combates simulados neste arquivo e reaproveita os já guardados "
+                             "(sem o arquivo: o cache de `outcome_cache`)")
+    args = parser.parse_args(argv)
+
+    cache = OutcomeCache(args.cache, args.seed) if args.cache != None else None
+    root = build_default_map()
+    if args.choices != None:
+        try:
+            route = route_from_choices(root, args.choices)
+        except IndexError:
+            parser.error("escolha inválida em --choices")
+    else:
+        graph = MapGraph(root)
+        loss = encounter_hp_loss([node.encounter for node in graph.nodes if node.encounter],
+                                 fights=args.fights, seed=args.seed, workers=args.workers, cache=cache)
+        route = RouteAnalysis(graph, loss).safest_route()
+    stages = route_stages(route)
+
+    start = perf_counter()
+    result = DeckOptimizer(stages, fights=args.fights, beam_width=args.beam, seed=args.seed,
+                           workers=args.workers, cache=cache).search()
+    elapsed = perf_counter() - start
+    verified = simulate_run(stages, result.picks, args.verify, args.seed) if args.verify else None
+    if cache != None:
+        cache.close()
+
+    if args.format == "json":
+        json.dump({"stages": [stage if stage == FIREPLACE else list(stage) for stage in stages],
+                   **result.to_dict(), "verified_win_rate": verified}, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        write_text(result, stages, sys.stdout)
+        if verified != None:
+            print(f"Chance de vencer em {args.verify} partidas completas: {verified:.3f}")
+        print(f"Busca em {elapsed:.1f} s, {result.simulations} combinações simuladas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+""" O mapa da campanha: posições, tipos e arestas dos nós e os inimigos de cada
+    combate.
+
+    As telas de cada nó são escolhidas por quem constrói o mapa (ver
+    `main.init`), o que permite montar o mesmo grafo sem pygame nas simulações
+    e na reexecução de replays (ver `replay`).
+"""
+
+
+from typing import Callable
+from map_node import MapNode, MapNodeType
+
+
+# Vida recuperada nas fogueiras
+FIREPLACE_HP = 20
+
+
+def build_default_map(screen_for: Callable = lambda type, encounter: None) -> MapNode:
+    """ Cria os nós do mapa e retorna a raiz.
+
+        Parâmetros:
+            screen_for (Callable): Recebe o tipo do nó e os inimigos do combate
+                (ou `None`) e retorna a tela do nó. Por padrão, os nós ficam
+                sem tela.
+    """
+    def node(pos, type, encounter=None):
+        return MapNode(pos, type, screen_for(type, encounter), encounter)
+
+    root = node((220, 450), MapNodeType.STORY)
+
+    f1 = node((200,180), MapNodeType.FIREPLACE)
+    f2 = node((150,100), MapNodeType.FIREPLACE)
+    f3 = node((290,130), MapNodeType.FIREPLACE)
+
+    first_child_mid = node((200, 350), MapNodeType.BATTLE, ['cyclop'])
+    first_child_left = node((130,380), MapNodeType.BATTLE, ['water_horse'])
+    first_child_right = node((300,380), MapNodeType.BATTLE, ['water_horse'])
+
+    second_child_mid = node((250, 270), MapNodeType.BATTLE, ['cyclop'])
+    second_child_left = node((100, 300), MapNodeType.BATTLE, ['cyclop'])
+    second_child_right = node((370, 310), MapNodeType.BATTLE, ['cyclop'])
+
+    third_child_mid = node((300, 262), MapNodeType.BATTLE, ['cyclop'])
+    third_child_left = node((120,230), MapNodeType.BATTLE, ['cyclop', 'water_horse'])
+    third_child_mid_left = node((170, 250), MapNodeType.BATTLE, ['cyclop'])
+    third_child_mid_right = node((300, 210), MapNodeType.BATTLE, ['cyclop'])
+
+    fourth_child_left = node((100, 170), MapNodeType.BATTLE, ['cyclop'])
+    fourth_child_mid = node((240, 200), MapNodeType.BATTLE, ['cyclop'])
+
+    boss = node((220, 80), MapNodeType.BOSS, ['poseidon'])
+
+    root.add_children(first_child_right)
+    root.add_children(first_child_left)
+    root.add_children(first_child_mid)
+    first_child_right.add_children(second_child_right)
+    first_child_left.add_children(second_child_left)
+    first_child_right.add_children(second_child_mid)
+    first_child_mid.add_children(second_child_mid)
+    second_child_mid.add_children(third_child_mid_right)
+    second_child_left.add_children(third_child_left)
+    second_child_right.add_children(third_child_mid)
+    second_child_mid.add_children(third_child_mid_left)
+    third_child_mid_left.add_children(f1)
+    third_child_left.add_children(f1)
+    third_child_left.add_children(fourth_child_left)
+    third_child_mid.add_children(fourth_child_mid)
+    third_child_mid_right.add_children(f3)
+    fourth_child_left.add_children(f2)
+    fourth_child_mid.add_children(boss)
+    f2.add_children(boss)
+    f1.add_children(boss)
+    f3.add_children(boss)
+
+    return root
@@ -0,0 +1,155 @@
+""" Políticas de busca para os inimigos.
+
+    `MonteCarloPolicy` escolhe a carta de um inimigo simulando, sobre cópias do
+    encontro, o restante do turno e alguns turnos seguintes para cada carta da
+    mão, com o jogador seguindo `GreedyPlayerPolicy`. Cada simulação embaralha
+    os baralhos de forma diferente, então a média dos resultados estima o valor
+    esperado de cada carta. A busca respeita um orçamento de tempo por turno e
+    é feita por `CombatLevel` em uma thread, enquanto a animação da carta
+    anterior é exibida.
+
+    A política é escolhida por entidade em `entities.json`:
+
+        "poseidon": { ..., "policy": "mcts" }
+        "poseidon": { ..., "policy": {"name": "mcts", "turn_budget_ms": 8} }
+
+    Como o número de simulações depende da velocidade da máquina, combates com
+    esses inimigos só são reproduzidos pelos replays (ver `replay`) quando
+    `iterations` é usado no lugar do orçamento de tempo.
+"""
+
+
+from math import log, sqrt
+from time import perf_counter
+import random
+from combat_core import ENEMY_POLICIES, HAND_SIZE, Combatant, EnemyPolicy, Encounter, GreedyPlayerPolicy
+
+
+# Orçamento padrão de cada inimigo por turno; bem abaixo da duração da
+# animação de ataque, para que a busca termine antes dela
+TURN_BUDGET_MS = 12
+
+# Turnos completos simulados depois do turno atual dos inimigos
+HORIZON = 2
+
+EXPLORATION = sqrt(2)
+
+# Cada turno simulado multiplica a avaliação por este fator, para que os
+# inimigos prefiram vencer antes
+DISCOUNT = 0.9
+
+
+def evaluate(encounter: Encounter) -> float:
+    """ Avalia o encontro do ponto de vista dos inimigos, entre 0 (todos os
+        inimigos mortos) e 1 (jogador morto).
+    """
+    if encounter.check_loss():
+        return 1.0
+    if encounter.check_win():
+        return 0.0
+    player = encounter.player
+    enemy_life = sum(enemy.current_life for enemy in encounter.enemies)
+    enemy_max_hp = sum(enemy.max_hp for enemy in encounter.enemies)
+    return 0.5 * (1 - player.current_life / player.max_hp) + 0.5 * enemy_life / enemy_max_hp
+
+
+class MonteCarloPolicy(EnemyPolicy):
+    """ Busca de Monte Carlo com UCB1 sobre as cartas da mão do inimigo.
+
+        Atributos:
+            turn_budget_ms (float): Tempo máximo de busca do inimigo em um
+                turno. Um inimigo escolhe no máximo `HAND_SIZE` cartas por
+                turno, então cada escolha usa no máximo essa fração dele.
+            iterations (int): Quando definido, a quantidade fixa de simulações
+                por escolha, sem limite de tempo; com `seed`, as escolhas
+                passam a ser reproduzíveis.
+            horizon (int): Turnos completos simulados após o atual.
+            exploration (float): Constante de exploração do UCB1.
+            rng (random.Random): Usado nos embaralhamentos das simulações.
+    """
+    background = True
+
+    def __init__(self, turn_budget_ms: float = TURN_BUDGET_MS, iterations: int = None,
+                 horizon: int = HORIZON, exploration: float = EXPLORATION, seed=None):
+        """ Construtor da classe. """
+        self.turn_budget_ms = turn_budget_ms
+        self.iterations = iterations
+        self.horizon = horizon
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+
+
+    def choose(self, encounter: Encounter, enemy: Combatant) -> int:
+        # Cartas iguais têm o mesmo resultado; simulamos apenas a primeira
+        candidates = []
+        seen = set()
+        for hand_index, card_id in enumerate(enemy.deck.hand_ids):
+            if card_id not in seen:
+                seen.add(card_id)
+                candidates.append(hand_index)
+        if len(candidates) == 1:
+            return candidates[0]
+
+        deadline = perf_counter() + self.turn_budget_ms / 1000 / HAND_SIZE
+        enemy_index = encounter.enemies.index(enemy)
+
+        # Todas as simulações partem da mesma cópia, restaurada a cada vez em
+        # tempo constante (ver `combat_state`)
+        sim = encounter.clone(self.rng)
+        root = sim.snapshot()
+        visits = [0] * len(candidates)
+        totals = [0.0] * len(candidates)
+
+        iteration = 0
+        while True:
+            if self.iterations is not None:
+                if iteration >= max(self.iterations, len(candidates)):
+                    break
+            elif iteration >= len(candidates) and perf_counter() >= deadline:
+                # Cada carta é simulada ao menos uma vez, mesmo sem tempo
+                break
+
+            if iteration < len(candidates):
+                choice = iteration
+            else:
+                choice = max(range(len(candidates)), key=lambda i: self._ucb(visits, totals, i, iteration))
+
+            sim.restore(root)
+            visits[choice] += 1
+            totals[choice] += self.rollout(sim, enemy_index, candidates[choice])
+            iteration += 1
+
+        best = max(range(len(candidates)), key=lambda i: totals[i] / visits[i])
+        return candidates[best]
+
+
+    def rollout(self, sim: Encounter, enemy_index: int, hand_index: int) -> float:
+        """ Simula em `sim`, que é alterado, a jogada da carta `hand_index` pelo
+            inimigo `enemy_index` e os turnos seguintes, e retorna a avaliação
+            do resultado (ver `evaluate`).
+        """
+        enemy = sim.enemies[enemy_index]
+        sim.play_enemy_card(enemy, enemy.deck.card_at(hand_index))
+        sim.run_enemy_turn()
+
+        player_policy = GreedyPlayerPolicy()
+        discount = 1.0
+        for _ in range(self.horizon):
+            if sim.is_over():
+                break
+            discount *= DISCOUNT
+            player_policy.play_turn(sim)
+            if sim.check_win():
+                break
+            sim.end_player_turn()
+            if sim.check_win():
+                break
+            sim.run_enemy_turn()
+        return evaluate(sim) * discount
+
+
+    def _ucb(self, visits: list, totals: list, i: int, iteration: int) -> float:
+        return totals[i] / visits[i] + self.exploration * sqrt(log(iteration) / visits[i])
+
+
+ENEMY_POLICIES["mcts"] = MonteCarloPolicy
@@ -1,19 +1,52 @@
-from pathlib import Path
 import pygame
+import assets
 from deck import Deck
-import json
+from combat_core import Combatant, create_enemy_policy, default_entity_configurations
 from enum import Enum
 import pygame.mixer as pm
+from screen import TIMESTEP
 
-game_dir = Path(__file__).parent.parent
-entities_json_path = game_dir / "assets" / "entities.json"
+pm.init()
 
-with open(file=entities_json_path,mode='r') as enemy_config:
-    default_entity_configurations = json.load(enemy_config)
+# Tamanho dos sprites das entidades na criação e depois de `CombatLevel.onenter`
+ENTITY_SPRITE_SIZE = (100 * .7, 100 * .7)
+COMBAT_SPRITE_SIZE = (150 * .7, 150 * .7)
+DEATH_SPRITE_SIZE = (75, 75)
 
-class Entity():
+ATTACK_DURATION_MS = 400
+ATTACK_SPEED = 10 * 60 / 1000 # pixels por ms (10 pixels por frame a 60 fps)
+HIT_DURATION_MS = 150
+HIT_DISPLACEMENT = 8
+HIT_PERIOD_MS = 1000 / 60 # a entidade troca de lado a cada 1/60 s
+
+# Cor multiplicada sobre o sprite enquanto a entidade treme após um golpe
+HIT_TINT = (255, 110, 110)
+
+def prefetch_entity(name: str):
+    """ Pede em segundo plano os sprites e sons usados pela entidade `name`
+        (ver `assets.prefetch_image`).
+    """
+    for size in (ENTITY_SPRITE_SIZE, COMBAT_SPRITE_SIZE):
+        assets.prefetch_image(name, size)
+    assets.prefetch_image("death/RIP", DEATH_SPRITE_SIZE)
+    assets.prefetch_sound("hit_sound")
+    assets.prefetch_sound("death_sound")
+
+def tinted(surface:pygame.Surface,color:tuple) -> pygame.Surface:
+    """Cópia de `surface` com as cores multiplicadas por `color`, mantendo a transparência"""
+    variant = surface.copy()
+    variant.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+    return variant
+
+class SpriteState(Enum):
+    ALIVE = 0
+    HIT = 1
+    DEAD = 2
+
+class Entity(Combatant):
     """
     Classe que representa uma entidade qualquer no jogo, dentre as possibilidades estabelecidas.
+    As regras de combate vêm de `Combatant`; aqui ficam o sprite, as animações e os sons.
 
     Atributos
     ----------
@@ -28,7 +61,12 @@ class Entity():
         deck : Deck
             Conjunto de cartas associado à entidade
         sprite : pygame.image
-            Sprite reprsentativo da entidade
+            Sprite reprsentativo da entidade, o de `sprite_state` entre os de `sprites`
+        sprites : dict[SpriteState, pygame.Surface]
+            As versões do sprite para cada estado, no tamanho atual, criadas uma única vez
+            por tamanho (ver `use_sprite_size`)
+        sprite_state : SpriteState
+            O estado visual da entidade; muda apenas nas transições (golpe, morte)
         name : str
             Nome da entidade
         max_energy : int
@@ -39,41 +77,36 @@ class Entity():
     def __init__(self,name:str,x_pos:int,y_pos:int):
         try:
             entity_info = default_entity_configurations['entities'][name]
-            self.max_defense = 50
-            self.current_defense = 0
-            self.current_life = entity_info['max_hp']
-            self.max_hp = entity_info['max_hp']
-            self.deck = Deck(draw_pile_ids=entity_info['draw_pile']) 
-            self.name = name
-
-            self.damage_multiplier = 1
-            self.absorption_multiplier = 1
+            # definimos o dono do deck como a propria entidade
+            super().__init__(name, entity_info['max_hp'], entity_info['max_energy'],
+                             Deck(draw_pile_ids=entity_info['draw_pile']),
+                             create_enemy_policy(entity_info.get('policy')))
 
-            self.applied_offensive_effects = [] # lista de efeitos negativos aplicados por inimigos
-            self.applied_defensive_effects = [] # lista de efeitos positivos aplicados por si mesmo
-
-            img_path = game_dir / "assets" / f"{self.name}.png"
-            img = pygame.image.load(img_path)
-            self.sprite = pygame.transform.scale(img,(100 * .7,100 * .7)) # fixa as dimensões de todas as entidades em quadrados de 150x150
-
-            self.max_energy = entity_info['max_energy']
-            self.current_energy = entity_info['max_energy']
+            self._sprite_sets = {}
+            self.sprite_state = SpriteState.ALIVE
             self.x_pos = x_pos
             self.y_pos = y_pos
-            self.rect = self.sprite.get_rect()
-            self.deck.set_owner(self) # definimos o dono do deck como a porpria entidade
+            self.rect = pygame.Rect(0, 0, 0, 0)
+            self.use_sprite_size(ENTITY_SPRITE_SIZE) # fixa as dimensões de todas as entidades em quadrados
 
             self.origin_x = x_pos
+            self.previous_x = x_pos # posição no passo anterior, para interpolar o desenho
             self.animation_state = AnimationState.REST
-            self.animation_start_time = None
+            self.animation_elapsed = 0 # tempo da animação atual em ms
 
-            self.death_sound = pm.Sound(file="sounds/hit_sound.wav")
+            # Textos da barra de status, renderizados novamente só quando os valores mudam
+            self._hp_label = None
+            self._hp_text_img = None
+
+            # Os sons são carregados junto com a entidade, e não no primeiro golpe
+            self.attack_sound = assets.sound("hit_sound")
+            self.death_sound = assets.sound("death_sound")
         except FileNotFoundError as error:
-            print(f"{error}: asset of name {self.name} was not found in folder 'assets'")
+            print(f"{error}: asset of name {name} was not found in folder 'assets'")
     def __str__(self):
         return f"name:{self.name}\ndeck:{self.deck.__str__()}\nenergy:{self.current_energy}/{self.max_energy}"
     
-    def draw_entity(self,screen:pygame.display):
+    def draw_entity(self,screen:pygame.display,alpha:float=1.0):
         """
         Função que desenha uma entidade qualquer do jogo, por meio do método screen.blit.
 
@@ -81,25 +114,41 @@ class Entity():
         ----------
         screen : pygame.display
             Display do jogo
+        alpha : float
+            Fração do passo de simulação já decorrida, usada para interpolar a
+            posição entre o passo anterior e o atual
         """
-        self.rect.center = (self.x_pos,self.y_pos)
+        x_pos = self.previous_x + (self.x_pos - self.previous_x) * alpha
+        self.rect.center = (x_pos,self.y_pos)
         screen.blit(self.sprite,self.rect)
         self.draw_status_bar(screen)
     
+    def draw_static(self,screen:pygame.display):
+        """
+        Desenha as partes da interface da entidade que não mudam durante o combate.
+        Chamado uma única vez, na camada fixa de `CombatLevel`; nada é desenhado por padrão.
+        """
+        pass
+
     def __draw_status_rectangle(self,screen:pygame.display,background_width:int,height:int,dyanamic_bar_size:int,
                                 x:int,y:int, primary_color:str, bg_color:str):
-        
-        pygame.draw.rect(screen,bg_color, pygame.Rect(x, y, background_width, height))
+        # O fundo é desenhado apenas na parte que a barra não cobre
+        dyanamic_bar_size = int(dyanamic_bar_size)
         pygame.draw.rect(screen, primary_color, pygame.Rect(x, y, dyanamic_bar_size, height))
+        if dyanamic_bar_size < background_width:
+            pygame.draw.rect(screen,bg_color, pygame.Rect(x + dyanamic_bar_size, y, background_width - dyanamic_bar_size, height))
 
     def draw_status_bar(self, screen: pygame.display):
         if self.check_is_alive():
             # Coordenadas Base e dimensoes para retangulos - deslocados para canto esquero do personagem
-            x, y = self.x_pos - 62, self.y_pos - 35
+            x, y = self.rect.centerx - 62, self.y_pos - 35
             background_width = 65
 
-            # Rendereizando fonte e calculando tamanho de cada barra
-            hp_text_img = pygame.font.Font("assets/pixel_font.ttf", 9).render(f'{self.current_life}/{self.max_hp}', True, 'white')
+            # Rendereizando texto (apenas quando a vida muda) e calculando tamanho de cada barra
+            hp_label = (self.current_life, self.max_hp)
+            if hp_label != self._hp_label:
+                self._hp_label = hp_label
+                self._hp_text_img = assets.text(assets.font("pixel_font", 9), f'{self.current_life}/{self.max_hp}', 'white')
             health_bar_size = background_width * (self.current_life / self.max_hp)
             defense_bar_size = background_width * (self.current_defense / self.max_defense)
 
@@ -107,76 +156,101 @@ class Entity():
             self.__draw_status_rectangle(screen, background_width,  5, defense_bar_size, x + 25, y, 'blue', 'gray')
 
             # Desenhar texto indicador de vida atual
-            screen.blit(hp_text_img, (x + 27, y - 12))
+            screen.blit(self._hp_text_img, (x + 27, y - 12))
+
+    def use_sprite_size(self,size:tuple):
+        """
+        Troca o tamanho do sprite da entidade. As versões de cada estado são montadas
+        na primeira vez que um tamanho é usado e guardadas; as trocas seguintes não leem
+        nem redimensionam imagens.
+        """
+        sprites = self._sprite_sets.get(size)
+        if sprites == None:
+            alive = assets.scaled(self.name,size)
+            sprites = {
+                SpriteState.ALIVE: alive,
+                SpriteState.HIT: tinted(alive,HIT_TINT),
+                SpriteState.DEAD: assets.scaled("death/RIP",DEATH_SPRITE_SIZE),
+            }
+            self._sprite_sets[size] = sprites
+        self.sprites = sprites
+        self._show_sprite()
+
+    def set_sprite_state(self,state:SpriteState):
+        """
+        Muda o estado visual da entidade. Não faz nada caso ela já esteja em `state`,
+        então pode ser chamada a cada frame sem custo.
+        """
+        if state != self.sprite_state:
+            self.sprite_state = state
+            self._show_sprite()
+
+    def _show_sprite(self):
+        # Mantém o centro do retângulo, usado para desenhar e para os cliques
+        self.sprite = self.sprites[self.sprite_state]
+        self.rect = self.sprite.get_rect(center=self.rect.center)
 
-    def check_is_alive(self):
-        return self.current_life > 0
-    
     def death_animate(self):
-        img_path = game_dir / "assets" / "death" / f"RIP.png"
-        img = pygame.image.load(img_path)
-        self.sprite = pygame.transform.scale(img,(75, 75)) 
+        self.set_sprite_state(SpriteState.DEAD)
 
     def engage_hit(self):
         self.animation_state = AnimationState.SHAKE
-        self.animation_start_time = pygame.time.get_ticks()
+        self.animation_elapsed = 0
+        if self.check_is_alive():
+            self.set_sprite_state(SpriteState.HIT)
 
     def engage_attack(self):
         self.animation_state = AnimationState.ATTACK
-        self.animation_start_time = pygame.time.get_ticks()
+        self.animation_elapsed = 0
+        self.attack_sound.play()
+
+    def engage_death(self):
         self.death_sound.play()
 
-    def attack_animate(self,invert_direction:bool):
-        duration_ms = 400
-        x_displacement = 10
+    def animate(self,invert_direction:bool,dt:float=TIMESTEP):
+        """
+        Avança em `dt` segundos a animação atual da entidade. Chamado uma vez
+        por passo de simulação, inclusive em repouso, para que `previous_x`
+        acompanhe a posição usada na interpolação do desenho.
+        """
+        self.previous_x = self.x_pos
+        if self.animation_state == AnimationState.ATTACK or self.animation_state == AnimationState.RETREAT:
+            self.attack_animate(invert_direction,dt)
+        elif self.animation_state == AnimationState.SHAKE:
+            self.hit_animate(dt)
+
+    def attack_animate(self,invert_direction:bool,dt:float=TIMESTEP):
+        # A entidade avança até a metade da animação e depois volta; a posição
+        # é calculada a partir do tempo decorrido, e não somada a cada frame
         direction = (-1) ** (int(invert_direction))
+        self.animation_elapsed += dt * 1000
+        elapsed_time = self.animation_elapsed
+
+        if elapsed_time < ATTACK_DURATION_MS / 2:
+            self.animation_state = AnimationState.ATTACK
+            self.x_pos = self.origin_x + ATTACK_SPEED * elapsed_time * direction
+        elif elapsed_time < ATTACK_DURATION_MS:
+            self.animation_state = AnimationState.RETREAT
+            self.x_pos = self.origin_x + ATTACK_SPEED * (ATTACK_DURATION_MS - elapsed_time) * direction
+        else:
+            self.animation_state = AnimationState.REST
+            self.x_pos = self.origin_x
 
-        current_time = pygame.time.get_ticks()
-        elapsed_time = current_time - self.animation_start_time
-        if self.animation_state == AnimationState.ATTACK:
-            if elapsed_time < duration_ms//2:
-                self.x_pos += x_displacement*direction
-            else: 
-                self.animation_state = AnimationState.RETREAT
-
-        elif self.animation_state == AnimationState.RETREAT:
-            if elapsed_time < duration_ms:
-                self.x_pos -= x_displacement*direction
-            else:
-                self.animation_state = AnimationState.REST
-                self.x_pos = self.origin_x
-
-    def hit_animate(self):
+    def hit_animate(self,dt:float=TIMESTEP):
         if self.animation_state == AnimationState.SHAKE:
-            duration_ms = 150
-            x_displacement = 8
-
-            current_time = pygame.time.get_ticks()
-            elapsed_time = current_time - self.animation_start_time
-            if elapsed_time < duration_ms:
-                if self.x_pos <= self.origin_x:
-                    self.x_pos = self.origin_x + x_displacement
-                elif self.x_pos > self.origin_x:
-                    self.x_pos = self.origin_x - x_displacement
+            self.animation_elapsed += dt * 1000
+            elapsed_time = self.animation_elapsed
+            if elapsed_time < HIT_DURATION_MS:
+                # Arredonda para o passo mais próximo, evitando erros de ponto flutuante
+                side = (-1) ** (int(elapsed_time / HIT_PERIOD_MS + .5) + 1)
+                self.x_pos = self.origin_x + HIT_DISPLACEMENT * side
             else:
                 self.x_pos = self.origin_x
                 self.animation_state = AnimationState.REST
+                if self.sprite_state == SpriteState.HIT:
+                    self.set_sprite_state(SpriteState.ALIVE)
 
 
-    def apply_offensive_effects(self):
-        for status_effect in self.applied_offensive_effects:
-            status_effect.apply_effect(affected=self)
-            if status_effect.duration == 0:
-                self.applied_offensive_effects.remove(status_effect)
-    def apply_defensive_effects(self):
-        for status_effect in self.applied_defensive_effects:
-            status_effect.apply_effect(affected=self)
-            if status_effect.duration == 0:
-                self.applied_defensive_effects.remove(status_effect)
-    def clear_multipliers(self):
-        self.absorption_multiplier = 1
-        self.damage_multiplier = 1
-
 class Enemy(Entity):
     """
     Classe que representa um inimigo no jogo - herda classe 'Entity'
@@ -211,13 +285,19 @@ class Ulisses(Entity):
         self.level = 0
         self.xp = 0
         self.coins = 0
-        self.deck.shuffle_and_allocate()
+        self._energy_label = None
+        self._energy_text_img = None
         
+    def draw_static(self,screen:pygame.display):
+        # O círculo da energia fica sempre no mesmo lugar; só o número muda
+        pygame.draw.circle(screen,pygame.Color('#3dad62'),(35,250),15)
+
     def draw_status_bar(self,screen:pygame.display):
         super().draw_status_bar(screen)
-        energy_text_img = pygame.font.Font("assets/pixel_font.ttf", 18).render(f'{self.current_energy}', True, 'white')
-        pygame.draw.circle(screen,pygame.Color('#3dad62'),(35,250),15)
-        screen.blit(energy_text_img,(30,242))
+        if self.current_energy != self._energy_label:
+            self._energy_label = self.current_energy
+            self._energy_text_img = assets.text(assets.font("pixel_font", 18), f'{self.current_energy}', 'white')
+        screen.blit(self._energy_text_img,(30,242))
 
     def insufficient_energy_animate(self):
         pass
@@ -1,6 +1,10 @@
 import pygame
-from screen import Screen
+import assets
 from entities import Ulisses
+from screen import Screen, TIMESTEP
+
+DURATION = 2 # segundos até voltar ao mapa
+FRAME_DURATION_MS = 1000 * 8 / 60 # duração de cada sprite da fogueira
 
 class FireplaceScreen(Screen):
     def __init__(self, surface: pygame.Surface, next_screen: Screen, hp: int, ulisses: Ulisses):
@@ -15,7 +19,7 @@ class FireplaceScreen(Screen):
         self.text_surface = font.render(f"Você recuperou {hp} HP", False, (255,255,255))
         self.text_pos = (surface_size + (-self.text_surface.get_width(), 100)) / 2
 
-        ss = pygame.image.load("assets/fireplace.png")
+        ss = assets.image("fireplace")
         self.sprites = [
             ss.subsurface((0,0,64,64)),
             ss.subsurface((64,0,64,64)),
@@ -26,22 +30,29 @@ class FireplaceScreen(Screen):
 
     def handle_event(self, event: pygame.event.Event):
         if event.type == pygame.KEYDOWN and event.dict["key"] == 32:
-            self.timeout = 1000
+            self.timeout = DURATION
 
     def update(self):
-        self.timeout += 1
+        self.timeout += TIMESTEP
 
-        if self.timeout > 120: # 2 segundos a 60 fps
+        if self.timeout >= DURATION:
             return self.map
 
-    def draw(self):
-        self.animation_time += 1
+    def dirty_rects(self):
+        # A fogueira é animada em todos os frames; o texto não muda
+        self.invalidate(pygame.Rect(self.sprite_pos, (64, 64)))
+        return self._take_dirty_rects()
+
+    def draw(self, alpha: float = 1.0):
+        # A animação também roda durante as transições, quando `update` não é
+        # chamado, então usa o tempo real desde a entrada na tela
+        animation_time = pygame.time.get_ticks() - self.enter_time
 
-        sprite_idx = int(self.animation_time / 8) % 5
+        sprite_idx = int(animation_time // FRAME_DURATION_MS) % 5
         self.surface.blit(self.sprites[sprite_idx], self.sprite_pos)
         self.surface.blit(self.text_surface, dest=self.text_pos)
 
     def onenter(self):
-        self.animation_time = 0
+        self.enter_time = pygame.time.get_ticks()
         self.timeout = 0
         self.ulisses.current_life = min(self.ulisses.current_life + self.hp, self.ulisses.max_hp)
@@ -0,0 +1,291 @@
+""" Dados do jogo (`cards.json` e `entities.json`), validados e pré-compilados.
+
+    `python -m game_data` (a partir de `src/`) confere os dois arquivos contra
+    o esquema abaixo: campos desconhecidos (como erros de digitação), tipos e
+    valores inválidos, parâmetros que faltam para o tipo de efeito de uma
+    carta, cartas inexistentes no `draw_pile` de uma entidade e políticas de
+    inimigo inválidas. Se tudo estiver certo, grava um único pacote
+    pré-compilado, `assets/game_data.pickle`, com os efeitos já convertidos
+    para `EffectTypes`; caso contrário, termina com a lista de erros.
+
+    O jogo carrega os dados uma única vez, na primeira leitura de
+    `card_configurations` ou `entity_configurations` (ver `combat_core`). Sem
+    o pacote, ou se os JSON tiverem mudado depois dele, os JSON são validados
+    e compilados na hora, então dados inválidos nunca chegam ao combate.
+"""
+
+
+from argparse import ArgumentParser
+from pathlib import Path
+import json
+import pickle
+import sys
+from status_effects import EFFECT_RULES, STACKING_RULES, EffectTypes
+
+
+game_dir = Path(__file__).parent.parent
+cards_json_path = game_dir / "assets" / "cards.json"
+entities_json_path = game_dir / "assets" / "entities.json"
+bundle_path = game_dir / "assets" / "game_data.pickle"
+
+# Muda sempre que o formato do pacote mudar, invalidando os pacotes antigos
+BUNDLE_VERSION = 1
+
+CARD_TYPES = ("attack", "defense", "offensive_effect", "defensive_effect")
+
+# Campos aceitos em cada carta e em cada entidade, com seus tipos
+CARD_FIELDS = {
+    "name": str,
+    "cost": int,
+    "type": str,
+    "damage": int,
+    "defense": int,
+    "status_effect_id": int,
+    "status_effect_info": dict,
+}
+ENTITY_FIELDS = {
+    "max_hp": int,
+    "max_energy": int,
+    "draw_pile": list,
+    "drop_xp": int,
+    "policy": (str, dict),
+}
+
+# Campos obrigatórios de cada tipo de carta, além de "name", "cost" e "type"
+CARD_TYPE_FIELDS = {
+    "attack": ("damage",),
+    "defense": ("defense",),
+    "offensive_effect": ("status_effect_id", "status_effect_info"),
+    "defensive_effect": ("status_effect_id", "status_effect_info"),
+}
+
+# Parâmetros de cada efeito em "status_effect_info", vindos das regras dos
+# efeitos; os efeitos sem regra ainda não têm implementação. Além deles, o
+# campo opcional "stacking" escolhe a regra de acúmulo (ver `STACKING_RULES`)
+EFFECT_PARAMETERS = {effect_type: ("duration", rule.parameter) for effect_type, rule in EFFECT_RULES.items()}
+
+
+class DataError(ValueError):
+    """ Erros de validação dos arquivos de dados. `errors` traz uma mensagem
+        por erro, com o caminho do campo (como `cards.Veneno_lvl_1.cost`).
+    """
+    def __init__(self, errors: list):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def _is_type(value, expected) -> bool:
+    # `bool` é subclasse de `int`, mas `true` nunca é um número válido aqui
+    if isinstance(value, bool):
+        return expected is bool
+    return isinstance(value, expected)
+
+
+def _check_fields(info, fields: dict, required: tuple, path: str, errors: list) -> bool:
+    """ Confere os campos de `info` contra `fields`, acrescentando os problemas
+        em `errors`. Retorna se `info` pode ser validado campo a campo.
+    """
+    if not isinstance(info, dict):
+        errors.append(f"{path}: deveria ser um objeto")
+        return False
+    for key, value in info.items():
+        if key not in fields:
+            errors.append(f"{path}.{key}: campo desconhecido")
+        elif not _is_type(value, fields[key]):
+            errors.append(f"{path}.{key}: tipo inválido ({type(value).__name__})")
+    for key in required:
+        if key not in info:
+            errors.append(f"{path}.{key}: campo obrigatório ausente")
+    return True
+
+
+def _compile_card(card_id: str, info, errors: list) -> dict:
+    path = f"cards.{card_id}"
+    if not _check_fields(info, CARD_FIELDS, ("name", "cost", "type"), path, errors):
+        return None
+    card = dict(info)
+
+    if _is_type(card.get("cost"), int) and card["cost"] < 0:
+        errors.append(f"{path}.cost: não pode ser negativo")
+    card_type = card.get("type")
+    if card_type not in CARD_TYPES:
+        errors.append(f"{path}.type: deveria ser um de {', '.join(CARD_TYPES)}")
+        return card
+    for key in CARD_TYPE_FIELDS[card_type]:
+        if key not in card:
+            errors.append(f"{path}.{key}: obrigatório em cartas do tipo {card_type}")
+
+    if card_type in ("offensive_effect", "defensive_effect") and _is_type(card.get("status_effect_id"), int):
+        try:
+            effect_type = EffectTypes(card["status_effect_id"])
+        except ValueError:
+            errors.append(f"{path}.status_effect_id: efeito desconhecido ({card['status_effect_id']})")
+            return card
+        if effect_type not in EFFECT_PARAMETERS:
+            errors.append(f"{path}.status_effect_id: o efeito {effect_type.name} não tem implementação")
+            return card
+        card["status_effect_type"] = effect_type
+
+        parameters = card.get("status_effect_info")
+        if isinstance(parameters, dict):
+            expected = EFFECT_PARAMETERS[effect_type]
+            for key, value in parameters.items():
+                if key == "stacking":
+                    if value not in STACKING_RULES:
+                        errors.append(f"{path}.status_effect_info.stacking: deveria ser um de {', '.join(STACKING_RULES)}")
+                elif key not in expected:
+                    errors.append(f"{path}.status_effect_info.{key}: parâmetro desconhecido para {effect_type.name}")
+                elif not _is_type(value, (int, float)):
+                    errors.append(f"{path}.status_effect_info.{key}: deveria ser um número")
+            for key in expected:
+                if key not in parameters:
+                    errors.append(f"{path}.status_effect_info.{key}: obrigatório para {effect_type.name}")
+            duration = parameters.get("duration")
+            if _is_type(duration, int) and duration <= 0:
+                errors.append(f"{path}.status_effect_info.duration: deveria ser positivo")
+    return card
+
+
+def _compile_entity(name: str, info, card_ids, errors: list) -> dict:
+    path = f"entities.{name}"
+    if not _check_fields(info, ENTITY_FIELDS, ("max_hp", "max_energy", "draw_pile"), path, errors):
+        return None
+    entity = dict(info)
+
+    if _is_type(entity.get("max_hp"), int) and entity["max_hp"] <= 0:
+        errors.append(f"{path}.max_hp: deveria ser positivo")
+    if _is_type(entity.get("max_energy"), int) and entity["max_energy"] < 0:
+        errors.append(f"{path}.max_energy: não pode ser negativo")
+
+    draw_pile = entity.get("draw_pile")
+    if isinstance(draw_pile, list):
+        if not draw_pile:
+            errors.append(f"{path}.draw_pile: o baralho não pode ser vazio")
+        for index, card_id in enumerate(draw_pile):
+            if card_id not in card_ids:
+                errors.append(f"{path}.draw_pile[{index}]: carta desconhecida ({card_id})")
+
+    policy = entity.get("policy")
+    if isinstance(policy, dict) and not isinstance(policy.get("name"), str):
+        errors.append(f"{path}.policy.name: campo obrigatório ausente")
+    return entity
+
+
+def compile_data(cards: dict, entities: dict) -> dict:
+    """ Valida o conteúdo de `cards.json` e `entities.json` e retorna os dados
+        compilados, no mesmo formato dos arquivos. Gera um `DataError` com
+        todos os problemas encontrados.
+    """
+    errors = []
+    compiled_cards = {}
+    compiled_entities = {}
+
+    if _check_fields(cards, {"cards": dict}, ("cards",), "cards.json", errors):
+        for card_id, info in cards.get("cards", {}).items():
+            compiled_cards[card_id] = _compile_card(card_id, info, errors)
+    if _check_fields(entities, {"entities": dict}, ("entities",), "entities.json", errors):
+        for name, info in entities.get("entities", {}).items():
+            compiled_entities[name] = _compile_entity(name, info, compiled_cards, errors)
+
+    if errors:
+        raise DataError(errors)
+    return {"cards": compiled_cards, "entities": compiled_entities}
+
+
+def source_stamps(sources: tuple = (cards_json_path, entities_json_path)) -> tuple:
+    """ Tamanho e data de modificação dos JSON, para saber se o pacote está
+        atualizado sem lê-los.
+    """
+    stamps = []
+    for source in sources:
+        stat = Path(source).stat()
+        stamps.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(stamps)
+
+
+def compile_sources(cards_path: Path = cards_json_path, entities_path: Path = entities_json_path) -> dict:
+    """ Lê, valida e compila os JSON, retornando o pacote sem gravá-lo. """
+    stamps = source_stamps((cards_path, entities_path))
+    with open(cards_path, "r") as file:
+        cards = json.load(file)
+    with open(entities_path, "r") as file:
+        entities = json.load(file)
+    return {"version": BUNDLE_VERSION, "sources": stamps, **compile_data(cards, entities)}
+
+
+def build(path: Path = bundle_path, cards_path: Path = cards_json_path,
+          entities_path: Path = entities_json_path) -> dict:
+    """ Valida os JSON e grava o pacote em `path`. Gera um `DataError` caso
+        os dados sejam inválidos, sem alterar o pacote existente.
+    """
+    bundle = compile_sources(cards_path, entities_path)
+    _check_policies(bundle)
+    with open(path, "wb") as file:
+        pickle.dump(bundle, file, protocol=pickle.HIGHEST_PROTOCOL)
+    return bundle
+
+
+def load(path: Path = bundle_path, cards_path: Path = cards_json_path,
+         entities_path: Path = entities_json_path) -> dict:
+    """ Carrega o pacote de `path`, ou compila os JSON caso ele não exista,
+        seja de outra versão ou esteja desatualizado.
+    """
+    try:
+        with open(path, "rb") as file:
+            bundle = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        bundle = None
+
+    if (not isinstance(bundle, dict) or bundle.get("version") != BUNDLE_VERSION
+            or bundle.get("sources") != source_stamps((cards_path, entities_path))):
+        bundle = compile_sources(cards_path, entities_path)
+    return bundle
+
+
+def _check_policies(bundle: dict):
+    # As políticas ficam registradas em `combat_core`, que depende deste
+    # módulo; por isso só são conferidas no build
+    from combat_core import create_enemy_policy
+    errors = []
+    for name, entity in bundle["entities"].items():
+        try:
+            create_enemy_policy(entity.get("policy"))
+        except (TypeError, ValueError) as error:
+            errors.append(f"entities.{name}.policy: {error}")
+    if errors:
+        raise DataError(errors)
+
+
+# O pacote é carregado na primeira leitura de `card_configurations` ou
+# `entity_configurations` (ao importar `combat_core`), e não ao importar este
+# módulo; assim `python -m game_data` relata os erros dos dados inválidos
+_configurations = {}
+
+
+def __getattr__(name: str):
+    if name in ("card_configurations", "entity_configurations"):
+        if not _configurations:
+            bundle = load()
+            _configurations["card_configurations"] = {"cards": bundle["cards"]}
+            _configurations["entity_configurations"] = {"entities": bundle["entities"]}
+        return _configurations[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m game_data", description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", default=bundle_path,
+                        help=f"arquivo do pacote (padrão: {bundle_path.relative_to(game_dir)})")
+    args = parser.parse_args(argv)
+
+    try:
+        bundle = build(Path(args.output))
+    except DataError as error:
+        for message in error.errors:
+            print(message, file=sys.stderr)
+        sys.exit(f"{len(error.errors)} erro(s) nos dados do jogo")
+    print(f"{len(bundle['cards'])} cartas e {len(bundle['entities'])} entidades gravadas em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,52 @@
+import atexit
 import math
+import os
 import pygame
 
 
 
-from entities import Ulisses
+import assets
+from entities import Ulisses, prefetch_entity
 from world_level import CombatLevel,RewardScreen
-from map import MapScreen
-from map_node import MapNode, MapNodeType
+from map import MapScreen, TRAILS_CACHE_DIR
+from map_node import MapNodeType
+from default_map import FIREPLACE_HP, build_default_map
 from fireplace import FireplaceScreen
 from menu import MenuScreen
+from screen import TIMESTEP
+from profiler import FrameProfiler
+from replay import GameRun
+
+def init(surface: pygame.Surface, run: GameRun = None):
+    # Os arquivos das telas são lidos em paralelo; cada tela recolhe os seus
+    # ao ser criada
+    for name in ("menu_bg", "map_bg", "map_icons", "map_trail_marks", "fireplace"):
+        assets.prefetch_image(name)
+    for name in ("title-font", "pixel_font"):
+        assets.prefetch_font(name)
+    prefetch_entity("Ulisses")
 
-def init(surface: pygame.Surface):
     ulisses = Ulisses()
-    map = MapScreen(surface)
-    reward_screen = RewardScreen(surface,ulisses,map)
-    fireplace = FireplaceScreen(surface, map, 20, ulisses)
-    cyclop_combat = CombatLevel(surface, background_name="combat_bg", staged_enemies=['Ogre'], ulisses=ulisses, next_screen=reward_screen)
-    water_horse_and_cyclop = CombatLevel(surface, background_name="combat_bg", staged_enemies=['cyclop', 'water_horse'], ulisses=ulisses, next_screen=reward_screen)
-    water_horse_combat = CombatLevel(surface, background_name="combat_bg", staged_enemies=['water_horse'], ulisses=ulisses, next_screen=reward_screen)
-    boss_combat = CombatLevel(surface, background_name="combat_bg", staged_enemies=['poseidon'], ulisses=ulisses, next_screen=reward_screen)
-    cyclop_combat = CombatLevel(surface, background_name="combat_bg", staged_enemies=['cyclop'], ulisses=ulisses, next_screen=reward_screen)
-    
-
-    root = MapNode((220, 450), MapNodeType.STORY, None)
-
-    f1 = MapNode((200,180), MapNodeType.FIREPLACE, fireplace)
-    f2 = MapNode((150,100), MapNodeType.FIREPLACE, fireplace)
-    f3 = MapNode((290,130), MapNodeType.FIREPLACE, fireplace)
-
-    first_child_mid = MapNode((200, 350), MapNodeType.BATTLE, cyclop_combat)
-    first_child_left = MapNode((130,380), MapNodeType.BATTLE, water_horse_combat)
-    first_child_right = MapNode((300,380), MapNodeType.BATTLE, water_horse_combat)
-
-    second_child_mid = MapNode((250, 270), MapNodeType.BATTLE, cyclop_combat)
-    second_child_left = MapNode((100, 300), MapNodeType.BATTLE, cyclop_combat)
-    second_child_right = MapNode((370, 310), MapNodeType.BATTLE, cyclop_combat)
-
-    third_child_mid = MapNode((300, 262), MapNodeType.BATTLE, cyclop_combat)
-    third_child_left = MapNode((120,230), MapNodeType.BATTLE, water_horse_and_cyclop)
-    third_child_mid_left = MapNode((170, 250), MapNodeType.BATTLE, cyclop_combat)
-    third_child_mid_right = MapNode((300, 210), MapNodeType.BATTLE, cyclop_combat)
-
-    fourth_child_left = MapNode((100, 170), MapNodeType.BATTLE, cyclop_combat)
-    fourth_child_mid = MapNode((240, 200), MapNodeType.BATTLE, cyclop_combat)
-
-    boss = MapNode((220, 80), MapNodeType.BOSS, boss_combat)
-
-    root.add_children(first_child_right)
-    root.add_children(first_child_left)
-    root.add_children(first_child_mid)
-    first_child_right.add_children(second_child_right)
-    first_child_left.add_children(second_child_left)
-    first_child_right.add_children(second_child_mid)
-    first_child_mid.add_children(second_child_mid)
-    second_child_mid.add_children(third_child_mid_right)
-    second_child_left.add_children(third_child_left)
-    second_child_right.add_children(third_child_mid)
-    second_child_mid.add_children(third_child_mid_left)
-    third_child_mid_left.add_children(f1)
-    third_child_left.add_children(f1)
-    third_child_left.add_children(fourth_child_left)
-    third_child_mid.add_children(fourth_child_mid)
-    third_child_mid_right.add_children(f3)
-    fourth_child_left.add_children(f2)
-    fourth_child_mid.add_children(boss)
-    f2.add_children(boss)
-    f1.add_children(boss)
-    f3.add_children(boss)
-    map.load(root)
+    map = MapScreen(surface, run, TRAILS_CACHE_DIR)
+    reward_screen = RewardScreen(surface,ulisses,map,run)
+    fireplace = FireplaceScreen(surface, map, FIREPLACE_HP, ulisses)
+
+    # Um `CombatLevel` para cada grupo de inimigos, compartilhado pelos nós
+    combats = {}
+    def screen_for(node_type: MapNodeType, encounter: list):
+        if node_type == MapNodeType.FIREPLACE:
+            return fireplace
+        if encounter == None:
+            return None
+        key = tuple(encounter)
+        if key not in combats:
+            combats[key] = CombatLevel(surface, background_name="combat_bg", staged_enemies=encounter,
+                                       ulisses=ulisses, next_screen=reward_screen, run=run)
+        return combats[key]
+
+    map.load(build_default_map(screen_for))
+    # As telas dos primeiros nós são lidas enquanto o menu é exibido
+    map.prefetch()
 
     return MenuScreen(surface, map)
 
@@ -81,6 +60,30 @@ pygame.init()
 SCREEN_DIMENSIONS = (1000,700) # Valores temporários
 SCALE = 2
 
+# Renderização por regiões: apenas as áreas que cada tela informa em
+# `Screen.dirty_rects` são ampliadas e enviadas à janela. Desativado por padrão
+DIRTY_RECTS = os.environ.get("ODYSSEY_DIRTY_RECTS", "0") not in ("", "0")
+
+# Limite de quadros por segundo; 0 desativa o limite. A lógica do jogo roda
+# sempre a `UPDATE_RATE` passos por segundo, independente deste valor
+FPS = int(os.environ.get("ODYSSEY_FPS", "60"))
+
+# Evita que uma pausa longa (arrastar a janela, por exemplo) gere uma avalanche
+# de passos de simulação no frame seguinte
+MAX_FRAME_TIME = 0.25
+
+# Velocidade da transição entre telas, em radianos por segundo
+TRANSITION_SPEED = 6
+
+# Arquivo (.json para o trace do Chrome, ou .csv) onde as medições de tempo de
+# cada frame são salvas ao sair. O overlay com os percentis é exibido com F3
+PROFILE_PATH = os.environ.get("ODYSSEY_PROFILE")
+
+# Semente da partida (por padrão, uma nova a cada execução) e arquivo onde as
+# ações do jogador são gravadas ao sair, para reexecução com `python -m replay`
+RUN_SEED = os.environ.get("ODYSSEY_SEED")
+REPLAY_PATH = os.environ.get("ODYSSEY_REPLAY")
+
 window_surface = pygame.display.set_mode(SCREEN_DIMENSIONS)
 downscaled_surface = pygame.Surface(
     (SCREEN_DIMENSIONS[0] / SCALE, SCREEN_DIMENSIONS[1] / SCALE)
@@ -88,7 +91,8 @@ downscaled_surface = pygame.Surface(
 clock = pygame.time.Clock()
 running = True
 
-current_screen = init(downscaled_surface)
+run = GameRun(int(RUN_SEED) if RUN_SEED else None, record=REPLAY_PATH != None)
+current_screen = init(downscaled_surface, run)
 current_screen.onenter()
 
 transition_progress = math.pi / 2 # Para ter uma transição no início do jogo
@@ -96,14 +100,68 @@ transition_surface = pygame.Surface(downscaled_surface.get_size())
 transition_surface.fill((0,0,0))
 transition_to = None
 
+# Tempo do último frame e tempo acumulado ainda não simulado, em segundos
+frame_time = 0
+accumulator = 0
+
+# Só existe quando as medições estão ativas, para não custar nada no jogo normal
+profiler = FrameProfiler(record=True) if PROFILE_PATH else None
+show_profiler = False
+
+
+def save_profile():
+    """ Salva as medições em `PROFILE_PATH` e mostra um resumo no terminal.
+        Registrada com `atexit`, pois o menu encerra o jogo com `sys.exit`.
+    """
+    profiler.export(PROFILE_PATH)
+    for phase, (p50, p95, p99) in profiler.summary().items():
+        print(f"{phase:<10} p50={p50:.2f}ms p95={p95:.2f}ms p99={p99:.2f}ms")
+
+if PROFILE_PATH:
+    atexit.register(save_profile)
+
+if REPLAY_PATH:
+    atexit.register(lambda: run.log.save(REPLAY_PATH))
+
+
+def present(rects):
+    """ Amplia as regiões `rects` de `downscaled_surface` e as envia à janela.
+        Com `None`, envia a tela inteira.
+    """
+    if rects is None:
+        scaled_surface = pygame.transform.scale_by(downscaled_surface, SCALE)
+        window_surface.blit(scaled_surface, (0,0))
+        pygame.display.flip()
+        return
+
+    bounds = downscaled_surface.get_rect()
+    window_rects = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if rect.width == 0 or rect.height == 0:
+            continue
+        scaled_surface = pygame.transform.scale_by(downscaled_surface.subsurface(rect), SCALE)
+        window_rects.append(window_surface.blit(scaled_surface, (rect.x * SCALE, rect.y * SCALE)))
+    if window_rects:
+        pygame.display.update(window_rects)
+
 
 while running:
+    # Regiões a serem enviadas à janela neste frame; durante as transições a
+    # tela inteira é enviada
+    rects = None
+
+    if profiler:
+        profiler.begin_frame(type(current_screen).__name__)
+
     # Roda apenas enquanto a transição estiver em progresso
     if transition_progress < math.pi:
         # Não atualiza nem processa os eventos; apenas desenha a tela atual
+        if profiler: profiler.mark("draw")
         current_screen.draw()
+        if profiler: profiler.mark("transition")
 
-        transition_progress += 0.1
+        transition_progress += TRANSITION_SPEED * frame_time
 
         # Troca `current_screen` na metade da transição, quando a tela estiver
         # toda preta, para o jogador não perceber
@@ -111,6 +169,7 @@ while running:
             pygame.event.clear() # Ignora eventos acionados durante a transição
             current_screen = transition_to
             current_screen.onenter()
+            current_screen.invalidate()
             transition_to = None
 
         # "Desenha" a transição sobre a surface principal.
@@ -119,6 +178,7 @@ while running:
         downscaled_surface.blit(transition_surface, (0,0))
 
     else:
+        if profiler: profiler.mark("events")
         for event in pygame.event.get():
             # Pré-processa os eventos do mouse para que as telas não tenham
             # que lidar com `SCALE`
@@ -132,21 +192,57 @@ while running:
             elif event.type == pygame.QUIT:
                 running = False
 
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_profiler = not show_profiler
+                if profiler == None:
+                    profiler = FrameProfiler()
+                    profiler.begin_frame(type(current_screen).__name__)
+                    profiler.mark("events")
+                elif not show_profiler and not PROFILE_PATH:
+                    # Sem gravação, as medições só servem para o painel
+                    profiler = None
+                continue
+
             current_screen.handle_event(event)
 
-        next_screen = current_screen.update()
-        current_screen.draw()
+        # Executa quantos passos de tamanho fixo couberem no tempo decorrido;
+        # a sobra fica para o próximo frame e é usada para interpolar o desenho
+        if profiler: profiler.mark("update")
+        accumulator += frame_time
+        next_screen = None
+        while accumulator >= TIMESTEP and next_screen == None:
+            next_screen = current_screen.update()
+            accumulator -= TIMESTEP
+
+        if DIRTY_RECTS and not show_profiler:
+            rects = current_screen.dirty_rects()
+
+        # Telas sem alterações não são desenhadas novamente
+        if profiler: profiler.mark("draw")
+        if rects != []:
+            current_screen.draw(accumulator / TIMESTEP)
 
         # Se a função `update()` retornou algo, começa a transição e armazena
         # a tela retornada para fazer a substituição depois
         if next_screen != None:
             transition_to = next_screen
             transition_progress = 0
+            accumulator = 0
+            rects = None
+
+    if profiler: profiler.mark("scale")
+    if show_profiler:
+        scaled_surface = pygame.transform.scale_by(downscaled_surface, SCALE)
+        window_surface.blit(scaled_surface, (0,0))
+        profiler.mark("overlay")
+        profiler.draw_overlay(window_surface)
+        pygame.display.flip()
+    else:
+        present(rects)
 
-    scaled_surface = pygame.transform.scale_by(downscaled_surface, SCALE)
-    window_surface.blit(scaled_surface, (0,0))
+    if profiler:
+        profiler.end_frame()
 
-    pygame.display.flip()
-    clock.tick(60)
+    frame_time = min(clock.tick(FPS) / 1000, MAX_FRAME_TIME)
 
 pygame.quit()
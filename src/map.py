@@ -1,19 +1,50 @@
 """ Módulo responsável pelas mecânicas do mapa do jogo """
 
 
+from concurrent.futures import ThreadPoolExecutor
 import pygame
 from pygame import Surface
 from pygame.event import Event
 from pygame.math import Vector2, clamp
+from map_graph import MapGraph
 from map_node import MapNode, MapNodeType, Point
-import math
+from map_trails import TrailBaker
 import random
+import assets
+from replay import Action, GameRun
+from route_analysis import RouteAnalysis, encounter_hp_loss
 from screen import Screen
+from spatial_index import SpatialGrid
 
 
 SCROLL_SPEED = 7
 MARGIN = 20
 
+# Raio dos nós para o hover e para as trilhas; o do boss é também a metade do
+# maior sprite de nó
+NODE_RADIUS = 20
+BOSS_NODE_RADIUS = 32
+
+# Tecla que mostra a rota mais segura a partir do nó atual (ver
+# `route_analysis`) e combates simulados por grupo de inimigos para calculá-la
+ROUTES_KEY = pygame.K_F4
+ROUTE_FIGHTS = 200
+ROUTE_COLOR = (230, 190, 60)
+
+# A análise das rotas roda em outra thread, para não travar a tela do mapa
+routes_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="routes")
+
+# Diretório padrão dos mapas com as trilhas já desenhadas (ver `TrailBaker`)
+TRAILS_CACHE_DIR = assets.game_dir / "cache" / "maps"
+
+
+def analyze_routes(graph: MapGraph) -> RouteAnalysis:
+    """ Simula os grupos de inimigos do mapa e analisa as rotas (ver
+        `route_analysis`). Executada em `routes_executor`.
+    """
+    encounters = [node.encounter for node in graph.nodes if node.encounter]
+    return RouteAnalysis(graph, encounter_hp_loss(encounters, fights=ROUTE_FIGHTS, workers=1))
+
 
 class MapScreen(Screen):
     """ Tela responsável por exibir o mapa do jogo.
@@ -34,10 +65,35 @@ class MapScreen(Screen):
                 começou a scrollar com o botão primário.
             scroll_interval (int): Indica o limite no scroll do jogador,
                 calculado a partir do tamanho do mapa e de uma margem fixa.
+            run (GameRun): A partida atual, na qual as escolhas de caminho são
+                gravadas. Opcional.
+            graph (MapGraph): A estrutura do mapa carregado em `load`, com a
+                ordem topológica, a profundidade e os nós alcançáveis de cada
+                nó.
+            nodes (list[MapNode]): Os nós do mapa, em ordem de visita da
+                busca em largura a partir da raiz.
+            node_index (SpatialGrid): Índice das posições dos nós, criado em
+                `load`, usado no hover e para desenhar apenas os nós visíveis.
+            trails (TrailBaker): Desenha as trilhas sobre o fundo do mapa
+                (`map_sprite`), redesenhando apenas os blocos alterados.
+            cache_dir (Path): Onde guardar os mapas com as trilhas já
+                desenhadas. Opcional; sem ele o mapa é sempre desenhado.
+            routes (RouteAnalysis): A análise das rotas do mapa, calculada em
+                `routes_executor` na primeira vez que a sobreposição é
+                exibida; None até ficar pronta.
+            routes_future (Future): O cálculo de `routes` em andamento, ou
+                None.
+            show_routes (bool): Indica se a rota mais segura a partir do nó
+                atual é desenhada sobre o mapa (tecla `ROUTES_KEY`).
     """
 
-    def __init__(self, surface: Surface):
+    def __init__(self, surface: Surface, run: GameRun = None, cache_dir=None):
         """ Construtor da classe. """
+        self.run = run
+        self.cache_dir = cache_dir
+        self.routes = None
+        self.routes_future = None
+        self.show_routes = False
         self._load_sprites()
         self.pos = Vector2(surface.get_size())
         self.pos -= self.map_sprite.get_size()
@@ -63,23 +119,27 @@ class MapScreen(Screen):
                     nó, todos conectados a ele também serão inclusos no
                     conjunto; exceto os anteriores, caso existam.
         """
-
-        def add_children(n): # Função auxiliar; não critique, ficou bom :>
-            self.nodes.update(n.children)
-            for child in n.children:
-                add_children(child)
-        
-        self.nodes = set([root])
-        add_children(root)
+        self.graph = MapGraph(root)
+        self.nodes = self.graph.nodes
+        self.routes = None
+        # Uma análise ainda em andamento é do mapa anterior e é descartada
+        self.routes_future = None
+        self.node_index = SpatialGrid(self.nodes)
 
         self.current_node = root
         root.activate()
 
-        for node in self.nodes:
-            self._bake_trail(node)
+        # As trilhas de um mapa já visto são lidas do disco; a gravação de um
+        # mapa novo acontece em outra thread
+        self.trails.load(self.graph, self._node_radius)
+        self.trails.bake_all(self.cache_dir, self._sources_key(),
+                             lambda surface, path: assets.loader_executor.submit(pygame.image.save, surface, path))
 
 
     def handle_event(self, ev: Event):
+        previous_hover = self.hovered_node
+        previous_y = self.pos.y
+
         if ev.type == pygame.MOUSEMOTION:
             self._mouse_motion(ev.dict["pos"])
 
@@ -89,6 +149,12 @@ class MapScreen(Screen):
         elif ev.type == pygame.MOUSEBUTTONUP:
             self._mouse_up(ev.dict["pos"], ev.dict["button"])
 
+        elif ev.type == pygame.KEYDOWN and ev.key == ROUTES_KEY:
+            self.show_routes = not self.show_routes
+            if self.show_routes and self.routes == None and self.routes_future == None:
+                self.routes_future = routes_executor.submit(analyze_routes, self.graph)
+            self.invalidate()
+
         elif ev.type == pygame.MOUSEWHEEL:
             self.hovered_node = None
             self.pos.y = clamp(
@@ -97,23 +163,56 @@ class MapScreen(Screen):
                 self.scroll_interval[1],
             )
 
+        # Com o scroll o mapa inteiro se move; caso contrário, apenas os nós
+        # que entraram ou saíram do hover mudam de sprite
+        if self.pos.y != previous_y:
+            self.invalidate()
+        elif self.hovered_node != previous_hover:
+            for node in (previous_hover, self.hovered_node):
+                if node != None:
+                    self.invalidate(self._node_rect(node))
+
 
     def update(self):
+        if self.routes_future != None and self.routes_future.done():
+            self.routes = self.routes_future.result()
+            self.routes_future = None
+            if self.show_routes:
+                self.invalidate()
         if self.choosen_node != None:
             tmp = self.choosen_node.screen
             self.choosen_node = None
             return tmp
 
 
-    def draw(self):
+    def draw(self, alpha: float = 1.0):
         self.surface.fill((0,0,0))
         self.surface.blit(self.map_sprite, self.pos)
+        if self.show_routes:
+            self._draw_routes()
 
-        for node in self.nodes:
+        # Apenas os nós cujo sprite aparece na tela, em coordenadas do mapa
+        visible = pygame.Rect(-self.pos, self.surface.get_size()).inflate(BOSS_NODE_RADIUS * 2, BOSS_NODE_RADIUS * 2)
+        for node in self.node_index.query_rect(visible):
             self._render_node(node)
 
 
+    def dirty_rects(self):
+        return self._take_dirty_rects()
+
+
+    def prefetch(self):
+        """ Pede em segundo plano os arquivos das telas dos nós que podem ser
+            escolhidos a partir do nó atual.
+        """
+        for child in self.current_node.children:
+            if child.screen != None:
+                child.screen.prefetch()
+
+
     def onenter(self):
+        self.prefetch()
+
         # Torna o nó atual visível na região inferior da tela, alterando a posição
         # Y em que o mapa é desenhado
         self.pos.y = clamp(
@@ -131,10 +230,12 @@ class MapScreen(Screen):
                 self.scroll_interval[1],
             )
 
-        for node in self.nodes:
+        # Apenas os nós próximos ao mouse, do mais próximo ao mais distante
+        map_pos = Vector2(mouse_pos) - self.pos
+        for node in self.node_index.query_radius(map_pos, BOSS_NODE_RADIUS):
             if not node.is_navigable: continue
-            
-            dist = (node.pos - mouse_pos + self.pos).length()
+
+            dist = (node.pos - map_pos).length()
 
             if (dist < self._node_radius(node)):
                 self.hovered_node = node
@@ -147,9 +248,12 @@ class MapScreen(Screen):
         if button != 1: return
         
         if self.hovered_node != None:
+            if self.run != None:
+                choice = self.current_node.children.index(self.hovered_node)
+                self.run.record(Action.MAP_CHOICE, choice)
             self.current_node.navigate_to(self.hovered_node)
-            self._bake_trail(self.hovered_node)
-            self._bake_trail(self.current_node)
+            self.trails.invalidate_node(self.hovered_node)
+            self.trails.bake()
 
             self.current_node = self.hovered_node
             self.choosen_node = self.hovered_node
@@ -165,9 +269,12 @@ class MapScreen(Screen):
 
 
     def _load_sprites(self):
-        self.map_sprite = pygame.image.load("assets/map_bg.png").convert_alpha()
+        # O mapa recebe as trilhas desenhadas pelo `TrailBaker` em uma cópia,
+        # sem alterar a imagem compartilhada do cache
+        self.trails = TrailBaker(assets.image("map_bg"), assets.image("map_trail_marks"))
+        self.map_sprite = self.trails.surface
 
-        ss = pygame.image.load("assets/map_icons.png").convert_alpha()
+        ss = assets.image("map_icons")
         self.node_sprites = [
             ss.subsurface((144, 0,  48, 48)), # nó de fogueira distante
             ss.subsurface((144, 48,  48, 48)), # nó de história distante
@@ -190,41 +297,34 @@ class MapScreen(Screen):
             ss.subsurface((64,  144, 64, 64)),
         ]
 
-        self.trail_marks_sprite = pygame.image.load("assets/map_trail_marks.png").convert_alpha()
-
-
-    # Desenha as arestas entre um nó e todos os seus "filhos". O desenho é feito
-    # diretamente na textura do mapa ao invés de na tela, o que evita que as
-    # arestas precisem ser renderizadas novamente em cada frame
-    def _bake_trail(self, origin: MapNode):
-        for child in origin.children:
-            diff_raw = child.pos - origin.pos
-            diff_normal = diff_raw.normalize()
 
-            start = origin.pos + diff_normal * self._node_radius(origin)
-            end = child.pos - diff_normal * self._node_radius(child)
 
-            diff = end - start
+    # Desenha a rota mais segura a partir do nó atual, sob os nós, e a vida
+    # perdida esperada nela
+    def _draw_routes(self):
+        if self.routes == None:
+            label = assets.text(assets.font("pixel_font", 9), "Calculando rotas...", ROUTE_COLOR)
+            self.surface.blit(label, (4, 4))
+            return
+        route = self.routes.safest_route(self.current_node)
+        if len(route) > 1:
+            pygame.draw.lines(self.surface, ROUTE_COLOR, False, [node.pos + self.pos for node in route], 3)
+        loss = self.routes.safest_loss[self.current_node]
+        label = f"Rota mais segura: {loss:.0f} de vida" if route else "Nenhuma rota até o boss"
+        self.surface.blit(assets.text(assets.font("pixel_font", 9), label, ROUTE_COLOR), (4, 4))
 
-            distance = diff.length()
-            angle_idx = math.floor(.5 - math.atan2(diff.y, diff.x) * 12 / math.pi)
 
-            num_marks = math.floor(distance / 16)
-            inc = diff / num_marks if num_marks != 0 else Vector2(0, 0)
-
-            for i in range(num_marks + 1):
-                x = (int(origin.pos.x) + i) % 4 # Variações
-                x += 4 * child.was_visited # Cor
-                y = angle_idx % 6
-
-                sprite = self.trail_marks_sprite.subsurface((x << 4, y << 4, 16, 16))
-
-                if (angle_idx % 12) >= 6:
-                    sprite = pygame.transform.rotate(sprite, 90)
-
-                p = start + inc * i if num_marks > 0 else (start + end) / 2
-                s = Vector2(sprite.get_size())
-                self.map_sprite.blit(sprite, p - s / 2)
+    # Identifica as imagens usadas nas trilhas, para que um mapa guardado em
+    # disco deixe de valer quando elas mudarem
+    def _sources_key(self) -> str:
+        key = []
+        for name in ("map_bg", "map_trail_marks"):
+            try:
+                stat = (assets.registry.root / f"{name}.png").stat()
+                key.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+            except OSError:
+                key.append(name)
+        return "|".join(key)
 
 
     # Renderiza um único nó
@@ -242,7 +342,13 @@ class MapScreen(Screen):
         self.surface.blit(sprite, node.pos - (w >> 1, h >> 1) + self.pos)
 
 
+    # A região da tela ocupada pelo sprite de um nó
+    def _node_rect(self, node: MapNode) -> pygame.Rect:
+        w, h = self.node_sprites[node.type.value].get_size()
+        return pygame.Rect(node.pos - (w >> 1, h >> 1) + self.pos, (w, h))
+
+
     # O raio de um nó. Usado para detecção do hover do mouse e para saber até
-    # onde desenhar os caminhos que incidem no nó em `_bake_trail`
+    # onde desenhar os caminhos que incidem no nó (ver `TrailBaker`)
     def _node_radius(self, node: MapNode):
-        return 32 if node.type == MapNodeType.BOSS else 20
+        return BOSS_NODE_RADIUS if node.type == MapNodeType.BOSS else NODE_RADIUS
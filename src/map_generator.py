@@ -0,0 +1,200 @@
+""" Geração procedural de mapas em camadas, com semente.
+
+    O mapa é um grafo acíclico em camadas, como no Slay the Spire: a raiz fica
+    embaixo, cada camada tem alguns nós distribuídos em `width` colunas e
+    todos os nós da última camada levam ao boss. As arestas ligam apenas
+    camadas vizinhas e nunca se cruzam; cada nó tem ao menos um pai e um
+    filho, então todos os caminhos começam na raiz e terminam no boss.
+
+    Como `build_default_map`, `MapGenerator.generate` recebe a função que cria
+    as telas dos nós e retorna a raiz do grafo que `MapScreen.load` usa. A
+    geração é linear no número de nós; a partir de `src/`:
+
+        python -m map_generator --width 180 --depth 120 --seed 7
+"""
+
+
+from argparse import ArgumentParser
+from bisect import bisect_right
+from time import perf_counter
+from typing import Callable
+import random
+from map_graph import MapGraph
+from map_node import MapNode, MapNodeType
+
+
+# Tipos dos nós das camadas e seus pesos; a primeira camada é sempre de
+# batalhas e a última camada antes do boss, de fogueiras
+DEFAULT_TYPE_WEIGHTS = {
+    MapNodeType.BATTLE: 6,
+    MapNodeType.FIREPLACE: 2,
+    MapNodeType.STORY: 2,
+}
+
+# Inimigos de cada faixa do mapa: a partir da fração da profundidade indicada,
+# os combates são sorteados entre os grupos da faixa
+DEFAULT_ENEMY_POOLS = [
+    (0.0, [['cyclop'], ['water_horse']]),
+    (0.5, [['cyclop'], ['cyclop', 'water_horse']]),
+]
+DEFAULT_BOSS = ['poseidon']
+
+# Chance de um nó ganhar um filho a mais (ou um filho ganhar um pai a mais)
+# em vez de a próxima aresta seguir na diagonal
+BRANCH_CHANCE = 0.35
+
+
+class MapGenerator:
+    """ Gera mapas em camadas a partir de uma semente.
+
+        Atributos:
+            width (int): Quantidade de colunas, o máximo de nós por camada.
+            depth (int): Quantidade de camadas entre a raiz e o boss.
+            seed: A semente; a mesma semente e os mesmos parâmetros geram
+                sempre o mesmo mapa.
+            min_nodes (int): Mínimo de nós por camada.
+            type_weights (dict[MapNodeType, float]): Pesos dos tipos dos nós.
+            enemy_pools (list[tuple[float, list[list[str]]]]): Grupos de
+                inimigos por faixa de profundidade (ver `DEFAULT_ENEMY_POOLS`).
+            boss (list[str]): Os inimigos do boss.
+            origin (tuple[int, int]): Posição da raiz no mapa.
+            spacing (tuple[int, int]): Distância entre colunas e entre camadas.
+    """
+
+    def __init__(self, width: int = 4, depth: int = 5, seed=None, min_nodes: int = 2,
+                 type_weights: dict = None, enemy_pools: list = None, boss: list = None,
+                 origin: tuple = (220, 460), spacing: tuple = (80, 60)):
+        """ Construtor da classe. Gera um ValueError caso os parâmetros não
+            permitam montar um mapa.
+        """
+        if width < 1 or depth < 1 or not 1 <= min_nodes <= width:
+            raise ValueError(f"Dimensões inválidas: width={width}, depth={depth}, min_nodes={min_nodes}")
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.min_nodes = min_nodes
+        self.type_weights = type_weights if type_weights != None else DEFAULT_TYPE_WEIGHTS
+        self.enemy_pools = sorted(enemy_pools if enemy_pools != None else DEFAULT_ENEMY_POOLS, key=lambda pool: pool[0])
+        self.boss = boss if boss != None else DEFAULT_BOSS
+        self.origin = origin
+        self.spacing = spacing
+
+
+    def generate(self, screen_for: Callable = lambda type, encounter: None) -> MapNode:
+        """ Cria os nós do mapa e retorna a raiz.
+
+            Parâmetros:
+                screen_for (Callable): Recebe o tipo do nó e os inimigos do
+                    combate (ou `None`) e retorna a tela do nó, como em
+                    `build_default_map`.
+        """
+        rng = random.Random(self.seed)
+        types = list(self.type_weights)
+        cumulative_weights = []
+        total = 0
+        for node_type in types:
+            total += self.type_weights[node_type]
+            cumulative_weights.append(total)
+        pool_starts = [start for start, _ in self.enemy_pools]
+
+        def node(column: float, layer: int, type: MapNodeType, encounter: list = None) -> MapNode:
+            x = self.origin[0] + (column - (self.width - 1) / 2) * self.spacing[0]
+            y = self.origin[1] - layer * self.spacing[1]
+            return MapNode((x, y), type, screen_for(type, encounter), encounter)
+
+        root = node((self.width - 1) / 2, 0, MapNodeType.STORY)
+        parents = [root]
+        parent_columns = [(self.width - 1) / 2]
+        parent_types = [MapNodeType.STORY]
+
+        for layer in range(1, self.depth + 1):
+            count = rng.randint(self.min_nodes, self.width)
+            columns = sorted(rng.sample(range(self.width), count))
+            edges = self._edges(rng, parent_columns, columns) if layer > 1 else [(0, j) for j in range(count)]
+
+            # Cada filho conhece os tipos dos pais, para evitar duas fogueiras
+            # seguidas
+            after_fireplace = [False] * count
+            for i, j in edges:
+                if parent_types[i] == MapNodeType.FIREPLACE:
+                    after_fireplace[j] = True
+
+            pool = self.enemy_pools[bisect_right(pool_starts, (layer - 1) / self.depth) - 1][1]
+            layer_nodes = []
+            layer_types = []
+            for j, column in enumerate(columns):
+                if layer == 1:
+                    node_type = MapNodeType.BATTLE
+                elif layer == self.depth:
+                    node_type = MapNodeType.FIREPLACE
+                else:
+                    node_type = types[bisect_right(cumulative_weights, rng.random() * total)]
+                    if node_type == MapNodeType.FIREPLACE and (after_fireplace[j] or layer == self.depth - 1):
+                        node_type = MapNodeType.BATTLE
+                encounter = list(rng.choice(pool)) if node_type == MapNodeType.BATTLE else None
+                layer_nodes.append(node(column + rng.uniform(-.25, .25), layer, node_type, encounter))
+                layer_types.append(node_type)
+
+            for i, j in edges:
+                parents[i].add_children(layer_nodes[j])
+            parents, parent_columns, parent_types = layer_nodes, columns, layer_types
+
+        boss = node((self.width - 1) / 2, self.depth + 1, MapNodeType.BOSS, list(self.boss))
+        for parent in parents:
+            parent.add_children(boss)
+        return root
+
+
+    @staticmethod
+    def _edges(rng: random.Random, upper: list, lower: list) -> list:
+        """ Liga duas camadas vizinhas, dadas as colunas ordenadas dos seus
+            nós, e retorna as arestas como pares de índices (pai, filho).
+
+            As arestas formam uma escada do primeiro par ao último: a cada
+            passo avança o pai, o filho ou os dois. Assim as arestas ficam
+            ordenadas pelas duas pontas ao mesmo tempo (nenhuma cruza outra),
+            nenhum par se repete e todo nó recebe ao menos uma aresta. O lado
+            que ficou mais à esquerda avança primeiro, para que as arestas
+            liguem colunas próximas.
+        """
+        i = j = 0
+        edges = [(0, 0)]
+        last_i, last_j = len(upper) - 1, len(lower) - 1
+        while i < last_i or j < last_j:
+            if i == last_i:
+                j += 1
+            elif j == last_j:
+                i += 1
+            elif upper[i + 1] < lower[j]:
+                i += 1
+            elif lower[j + 1] < upper[i]:
+                j += 1
+            elif rng.random() < BRANCH_CHANCE:
+                if upper[i + 1] <= lower[j + 1]:
+                    i += 1
+                else:
+                    j += 1
+            else:
+                i += 1
+                j += 1
+            edges.append((i, j))
+        return edges
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m map_generator", description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=180)
+    parser.add_argument("--depth", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    root = MapGenerator(args.width, args.depth, args.seed).generate()
+    elapsed = perf_counter() - start
+
+    graph = MapGraph(root)
+    print(f"{len(graph)} nós e {graph.edge_count} arestas em {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+""" Estrutura do grafo do mapa, calculada uma única vez por mapa.
+
+    `MapGraph` percorre os nós a partir da raiz em largura, visitando cada nó
+    uma única vez, e calcula sob demanda (e guarda) a ordem topológica, os
+    pais de cada nó e os conjuntos de nós alcançáveis, usados pela tela do
+    mapa e pelas análises de rotas.
+"""
+
+
+from functools import cached_property
+from map_node import MapNode
+
+
+class MapGraph:
+    """ Os nós alcançáveis a partir de uma raiz e as arestas entre eles.
+
+        Atributos:
+            root (MapNode): A raiz do mapa.
+            nodes (list[MapNode]): Os nós alcançáveis a partir da raiz, em
+                ordem de visita da busca em largura.
+            depth (dict[MapNode, int]): Quantidade mínima de passos da raiz
+                até cada nó.
+            edge_count (int): Quantidade de arestas.
+    """
+
+    def __init__(self, root: MapNode):
+        """ Construtor da classe. Percorre o mapa sem recursão, então o custo
+            é linear no número de arestas mesmo quando muitos caminhos
+            convergem para os mesmos nós.
+        """
+        self.root = root
+        self.nodes = [root]
+        self.depth = {root: 0}
+        self.edge_count = 0
+
+        # `nodes` cresce durante o laço e serve de fila
+        for node in self.nodes:
+            next_depth = self.depth[node] + 1
+            self.edge_count += len(node.children)
+            for child in node.children:
+                if child not in self.depth:
+                    self.depth[child] = next_depth
+                    self.nodes.append(child)
+
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+    @cached_property
+    def parents(self) -> dict:
+        """ Os nós que levam a cada nó (dict[MapNode, list[MapNode]]). """
+        parents = {node: [] for node in self.nodes}
+        for node in self.nodes:
+            for child in node.children:
+                parents[child].append(node)
+        return parents
+
+
+    @cached_property
+    def topological_order(self) -> list:
+        """ Os nós em uma ordem na qual cada nó aparece antes dos seus filhos.
+            Gera um ValueError caso o mapa tenha um ciclo.
+        """
+        pending_parents = {node: len(parents) for node, parents in self.parents.items()}
+        order = [node for node in self.nodes if pending_parents[node] == 0]
+        for node in order:
+            for child in node.children:
+                pending_parents[child] -= 1
+                if pending_parents[child] == 0:
+                    order.append(child)
+        if len(order) != len(self.nodes):
+            raise ValueError("O mapa tem um ciclo")
+        return order
+
+
+    @cached_property
+    def index(self) -> dict:
+        """ A posição de cada nó em `topological_order`. """
+        return {node: i for i, node in enumerate(self.topological_order)}
+
+
+    @cached_property
+    def reachable_masks(self) -> dict:
+        """ Os nós alcançáveis a partir de cada nó (incluindo ele mesmo), como
+            inteiros em que o bit `index[n]` indica o nó `n`. Calculado de trás
+            para frente na ordem topológica, com um "ou" por aresta.
+        """
+        index = self.index
+        masks = {}
+        for node in reversed(self.topological_order):
+            mask = 1 << index[node]
+            for child in node.children:
+                mask |= masks[child]
+            masks[node] = mask
+        return masks
+
+
+    def reachable(self, node: MapNode) -> set:
+        """ Os nós alcançáveis a partir de `node`, incluindo ele mesmo. """
+        mask = self.reachable_masks[node]
+        order = self.topological_order
+        found = set()
+        while mask:
+            low_bit = mask & -mask
+            found.add(order[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return found
+
+
+    def can_reach(self, origin: MapNode, target: MapNode) -> bool:
+        """ Indica se existe um caminho de `origin` até `target`. """
+        return bool(self.reachable_masks[origin] >> self.index[target] & 1)
@@ -27,17 +27,20 @@ class MapNode:
                 considerar os caminhos que chegam nele.
             screen (Screen): A tela que o jogo deve exibir quando o nó atual
                 for selecionado pelo jogador.
+            encounter (list[str]): Os inimigos do combate do nó, nos nós de
+                batalha e de boss. Usado pelas simulações, que não criam telas.
             was_visited (bool): Indica se o jogador já passou pelo nó.
             is_active (bool): Indica se o jogador está no nó atual.
     """
 
 
-    def __init__(self, pos: Point, type: MapNodeType, screen: Screen):
+    def __init__(self, pos: Point, type: MapNodeType, screen: Screen, encounter: list = None):
         """ Construtor da classe. """
         self.pos = math.Vector2(pos)
         self.children = []
         self.type = type
         self.screen = screen
+        self.encounter = encounter
         self.was_visited = False
         self.is_navigable = False
         self.is_active = False
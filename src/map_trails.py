@@ -0,0 +1,243 @@
+""" Desenho das trilhas entre os nós sobre o fundo do mapa.
+
+    As trilhas são marcas de 16 pixels ao longo de cada aresta, com uma de 12
+    direções, uma de 4 variações e a cor de caminho percorrido ou não. As 96
+    marcas possíveis são recortadas e rotacionadas uma única vez, em
+    `TrailBaker.__init__`.
+
+    O mapa é dividido em blocos de `TILE_SIZE` pixels, e cada bloco sabe quais
+    arestas passam por ele. Quando uma aresta muda de cor, apenas os blocos
+    que ela toca são redesenhados: o fundo original do bloco é restaurado e
+    as arestas dele são desenhadas de novo. O mapa completo pode ser guardado
+    em disco (`cache_dir`), com o nome dado por um hash do mapa, para que
+    reabrir o mesmo mapa não precise desenhar nenhuma trilha.
+"""
+
+
+from hashlib import sha1
+from pathlib import Path
+from typing import Callable
+import math
+import pygame
+from pygame import Rect, Surface
+from pygame.math import Vector2
+from map_graph import MapGraph
+
+
+TILE_SIZE = 128
+MARK_SIZE = 16
+
+# Distância entre as marcas de uma trilha
+MARK_SPACING = 16
+
+# Muda sempre que o desenho das trilhas mudar, invalidando os mapas em disco
+BAKE_VERSION = 1
+
+
+class TrailBaker:
+    """ Desenha e mantém as trilhas de um mapa sobre uma cópia do fundo.
+
+        Atributos:
+            surface (Surface): O fundo com as trilhas desenhadas.
+            tile_size (int): O lado dos blocos redesenhados.
+    """
+
+    def __init__(self, background: Surface, marks_sheet: Surface, tile_size: int = TILE_SIZE):
+        """ Construtor da classe.
+
+            Parâmetros:
+                background (Surface): O fundo do mapa, que não é alterado.
+                marks_sheet (Surface): A folha com as marcas: 4 variações de
+                    cada cor nas colunas e 6 direções nas linhas; as outras 6
+                    direções são as mesmas rotacionadas em 90 graus.
+        """
+        self.background = background
+        self.surface = background.copy()
+        self.tile_size = tile_size
+        self._bounds = self.surface.get_rect()
+        self._columns = math.ceil(self._bounds.width / tile_size)
+
+        # `_marks[cor][direção][variação]`
+        self._marks = []
+        for color in range(2):
+            directions = []
+            for direction in range(12):
+                variations = []
+                for variation in range(4):
+                    x = variation + 4 * color
+                    sprite = marks_sheet.subsurface((x * MARK_SIZE, (direction % 6) * MARK_SIZE, MARK_SIZE, MARK_SIZE))
+                    if direction >= 6:
+                        sprite = pygame.transform.rotate(sprite, 90)
+                    variations.append(sprite)
+                directions.append(variations)
+            self._marks.append(directions)
+
+        self._edges = []
+        self._edge_marks = {}
+        self._tiles = {}
+        self._edges_into = {}
+        self._dirty = set()
+
+
+    def load(self, graph: MapGraph, node_radius: Callable):
+        """ Registra as arestas de `graph` e marca todo o mapa para ser
+            redesenhado. As marcas de cada aresta só são calculadas quando um
+            bloco dela é desenhado.
+
+            Parâmetros:
+                node_radius (Callable): Retorna o raio de um nó; as trilhas
+                    começam e terminam na borda dele.
+        """
+        self._graph = graph
+        self._node_radius = node_radius
+        self._edges = []
+        self._edge_marks = {}
+        self._tiles = {}
+        self._edges_into = {}
+
+        for origin in graph.nodes:
+            for child in origin.children:
+                edge = len(self._edges)
+                self._edges.append((origin, child))
+                self._edges_into.setdefault(child, []).append(edge)
+
+                # Blocos tocados pelo retângulo que contém a aresta; as arestas
+                # fora do fundo não são desenhadas
+                for tile in self._tiles_in(*self._edge_bounds(origin, child)):
+                    self._tiles.setdefault(tile, []).append(edge)
+
+        self._dirty = set(self._all_tiles())
+
+
+    def cache_key(self, extra: str = "") -> str:
+        """ Hash do mapa carregado: posições, tipos, arestas e nós visitados,
+            mais `extra` (a identificação das imagens usadas, por exemplo).
+        """
+        index = {node: i for i, node in enumerate(self._graph.nodes)}
+        digest = sha1(f"{BAKE_VERSION}|{self.tile_size}|{self._bounds.size}|{extra}".encode())
+        for node in self._graph.nodes:
+            children = ",".join(str(index[child]) for child in node.children)
+            digest.update(f"{node.pos.x:.2f},{node.pos.y:.2f},{node.type.value},{node.was_visited}:{children};".encode())
+        return digest.hexdigest()
+
+
+    def bake_all(self, cache_dir: Path = None, extra: str = "", save: Callable = pygame.image.save):
+        """ Desenha o mapa inteiro, ou o lê de `cache_dir` caso o mesmo mapa
+            já tenha sido desenhado antes. Sem `cache_dir`, apenas desenha.
+
+            Parâmetros:
+                save (Callable): Grava a superfície no arquivo; pode ser
+                    trocada para gravar em outra thread.
+        """
+        if cache_dir is None:
+            self.bake()
+            return
+
+        path = Path(cache_dir) / f"map_{self.cache_key(extra)}.png"
+        try:
+            cached = pygame.image.load(path)
+        except (OSError, pygame.error):
+            cached = None
+        if cached is not None and cached.get_size() == self._bounds.size:
+            if pygame.display.get_surface() is not None:
+                # Mantém a transparência do mapa desenhado
+                cached = cached.convert_alpha() if self.surface.get_flags() & pygame.SRCALPHA else cached.convert()
+            self.surface.blit(cached, (0, 0))
+            self._dirty.clear()
+            return
+
+        self.bake()
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        save(self.surface.copy(), path)
+
+
+    def invalidate_node(self, node):
+        """ Marca para redesenho os blocos das arestas que chegam em `node`,
+            cuja cor depende de `node` ter sido visitado.
+        """
+        for edge in self._edges_into.get(node, ()):
+            origin, child = self._edges[edge]
+            for tile in self._tiles_in(*self._edge_bounds(origin, child)):
+                self._dirty.add(tile)
+
+
+    def bake(self) -> list:
+        """ Redesenha os blocos marcados e retorna os retângulos deles. """
+        rects = []
+        for tile in sorted(self._dirty):
+            rects.append(self._bake_tile(tile))
+        self._dirty.clear()
+        return rects
+
+
+    def _bake_tile(self, tile: tuple) -> Rect:
+        rect = Rect(tile[0] * self.tile_size, tile[1] * self.tile_size,
+                    self.tile_size, self.tile_size).clip(self._bounds)
+        previous_clip = self.surface.get_clip()
+        self.surface.set_clip(rect)
+        self.surface.blit(self.background, rect.topleft, rect)
+        for edge in self._tiles.get(tile, ()):
+            origin, child = self._edges[edge]
+            # Uma aresta é percorrida quando as duas pontas foram visitadas
+            marks = self._marks[origin.was_visited and child.was_visited]
+            for direction, variation, pos in self._marks_of(edge):
+                self.surface.blit(marks[direction][variation], pos)
+        self.surface.set_clip(previous_clip)
+        return rect
+
+
+    def _marks_of(self, edge: int) -> list:
+        # Direção, variação e posição de cada marca da aresta, calculadas na
+        # primeira vez que ela é desenhada
+        marks = self._edge_marks.get(edge)
+        if marks is not None:
+            return marks
+
+        origin, child = self._edges[edge]
+        start, end = self._edge_ends(origin, child)
+        diff = end - start
+        distance = diff.length()
+        direction = math.floor(.5 - math.atan2(diff.y, diff.x) * 12 / math.pi) % 12
+
+        num_marks = math.floor(distance / MARK_SPACING)
+        inc = diff / num_marks if num_marks != 0 else Vector2(0, 0)
+
+        marks = []
+        half_mark = Vector2(MARK_SIZE, MARK_SIZE) / 2
+        for i in range(num_marks + 1):
+            variation = (int(origin.pos.x) + i) % 4
+            p = start + inc * i if num_marks > 0 else (start + end) / 2
+            marks.append((direction, variation, p - half_mark))
+        self._edge_marks[edge] = marks
+        return marks
+
+
+    def _edge_ends(self, origin, child) -> tuple:
+        diff_normal = (child.pos - origin.pos).normalize()
+        start = origin.pos + diff_normal * self._node_radius(origin)
+        end = child.pos - diff_normal * self._node_radius(child)
+        return start, end
+
+
+    def _edge_bounds(self, origin, child) -> tuple:
+        half_mark = MARK_SIZE / 2
+        return (min(origin.pos.x, child.pos.x) - half_mark, min(origin.pos.y, child.pos.y) - half_mark,
+                max(origin.pos.x, child.pos.x) + half_mark, max(origin.pos.y, child.pos.y) + half_mark)
+
+
+    def _tiles_in(self, left: float, top: float, right: float, bottom: float):
+        # Blocos dentro do fundo que tocam o retângulo dado
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right, self._bounds.width - 1), min(bottom, self._bounds.height - 1)
+        if left > right or top > bottom:
+            return
+        for x in range(int(left) // self.tile_size, int(right) // self.tile_size + 1):
+            for y in range(int(top) // self.tile_size, int(bottom) // self.tile_size + 1):
+                yield (x, y)
+
+
+    def _all_tiles(self):
+        rows = math.ceil(self._bounds.height / self.tile_size)
+        for x in range(self._columns):
+            for y in range(rows):
+                yield (x, y)
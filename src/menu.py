@@ -3,6 +3,7 @@
 
 import pygame
 import sys
+import assets
 from menu_button import Button
 from screen import Screen
 
@@ -17,7 +18,7 @@ class MenuScreen(Screen):
         self.buttons = []
         self.pressed_play = False
         self.surface = surface
-        self.title_surface = pygame.font.Font("assets/title-font.ttf", 39).render("Slay the Odyssey", True, "#ffffff")
+        self.title_surface = assets.text(assets.font("title-font", 39), "Slay the Odyssey", "#ffffff")
         self.title_pos = ((self.surface.get_width() - self.title_surface.get_width()) >> 1, 30)
 
         self.buttons.append(Button(
@@ -47,7 +48,10 @@ class MenuScreen(Screen):
                 sys.exit()
         elif ev.type == pygame.MOUSEMOTION:
             for button in self.buttons:
+                was_hovering = button.is_hovering
                 button.on_mouse_motion(ev.dict["pos"])
+                if button.is_hovering != was_hovering:
+                    self.invalidate(pygame.Rect(button.pos, button.size))
 
     def update(self):
         if self.pressed_play:
@@ -56,7 +60,10 @@ class MenuScreen(Screen):
     def onenter(self):
         pass
 
-    def draw(self):
+    def dirty_rects(self):
+        return self._take_dirty_rects()
+
+    def draw(self, alpha: float = 1.0):
         self.surface.fill((0,0,0))
         self.surface.blit(self.menu_sprite, self.pos)
         self.surface.blit(self.title_surface, self.title_pos)
@@ -65,5 +72,5 @@ class MenuScreen(Screen):
             button.draw(self.surface)
             
     def _load_sprites(self):
-        self.menu_sprite = pygame.image.load("assets/menu_bg.png")
-        self.font = pygame.font.Font("assets/pixel_font.ttf", 18)
+        self.menu_sprite = assets.image("menu_bg")
+        self.font = assets.font("pixel_font", 18)
@@ -0,0 +1,287 @@
+""" Cache persistente dos resultados de combates simulados.
+
+    As varreduras de `balance`, a análise de rotas e a busca de recompensas
+    de `deck_optimizer` simulam muitas vezes as mesmas combinações de
+    baralho, inimigos e vida inicial. `OutcomeCache` guarda em um banco
+    SQLite (`cache/outcomes.sqlite`) as estatísticas de cada combinação
+    (`balance.BalanceStats`, com as distribuições de vida e os intervalos de
+    confiança) e, a cada consulta, simula só os combates que faltam para
+    chegar à quantidade pedida.
+
+    A chave de cada combinação é um hash do baralho canônico (o multiconjunto
+    das cartas, ver `deck_key`), da lista de inimigos na ordem de
+    `staged_enemies`, da faixa de vida inicial (ver `bucket_hp`), do jogador,
+    de `ENGINE_VERSION` e dos dados de `cards.json` e `entities.json` usados
+    no combate; mudar uma carta invalida apenas os combates em que ela
+    aparece. Uso (a partir de `src/`):
+
+        python -m outcome_cache
+        python -m outcome_cache --prune
+"""
+
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha1
+from pathlib import Path
+import json
+import sqlite3
+import sys
+import combat_core as core
+from balance import DEFAULT_CHUNK_SIZE, BalanceStats, _chunks, run_chunk
+
+
+game_dir = Path(__file__).parent.parent
+CACHE_PATH = game_dir / "cache" / "outcomes.sqlite"
+
+# Muda sempre que as regras do combate mudarem, invalidando os resultados
+# guardados
+ENGINE_VERSION = 1
+
+# Largura das faixas de vida inicial que compartilham as simulações
+HP_BUCKET = 8
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outcomes (
+        key TEXT PRIMARY KEY,
+        engine INTEGER NOT NULL,
+        player TEXT NOT NULL,
+        deck TEXT NOT NULL,
+        lineup TEXT NOT NULL,
+        start_hp INTEGER NOT NULL,
+        fights INTEGER NOT NULL,
+        stats TEXT NOT NULL
+    )
+"""
+
+
+def deck_key(deck_ids) -> tuple:
+    """ Forma canônica de um baralho: o multiconjunto das cartas, ordenado.
+        Gera um KeyError caso alguma carta não exista.
+    """
+    return tuple(sorted(core.card_def(card_id).name for card_id in deck_ids))
+
+
+def bucket_hp(hp: int, max_hp: int) -> int:
+    """ A vida que representa a faixa de `hp` nas simulações: o meio da
+        faixa, ou a vida máxima na faixa que a contém, para que os combates
+        com a vida cheia sejam simulados sem aproximação.
+    """
+    bucket = (hp - 1) // HP_BUCKET
+    if bucket >= (max_hp - 1) // HP_BUCKET:
+        return max_hp
+    return bucket * HP_BUCKET + HP_BUCKET // 2
+
+
+def _data_fingerprint(deck: tuple, lineup: tuple, player_name: str) -> str:
+    # Os dados de tudo o que participa do combate, incluindo as cartas dos
+    # inimigos
+    entities = core.default_entity_configurations['entities']
+    cards = core.default_card_configurations['cards']
+    names = sorted(set(lineup) | {player_name})
+    card_ids = sorted(set(deck).union(*(entities[name]['draw_pile'] for name in lineup)))
+    data = {"entities": {name: entities[name] for name in names}, "cards": {card_id: cards[card_id] for card_id in card_ids}}
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+def outcome_key(deck: tuple, lineup: tuple, start_hp: int, player_name: str = "Ulisses") -> str:
+    """ A chave no cache de um combate, com `deck` já canônico e `start_hp`
+        já na faixa.
+    """
+    parts = [ENGINE_VERSION, player_name, list(deck), list(lineup), start_hp,
+             _data_fingerprint(deck, lineup, player_name)]
+    return sha1(json.dumps(parts).encode()).hexdigest()
+
+
+def _stats_to_json(stats: BalanceStats) -> str:
+    return json.dumps({
+        "fights": stats.fights,
+        "wins": stats.wins,
+        "turns_to_kill": stats.turns_to_kill,
+        "hp_remaining": stats.hp_remaining,
+        "won_hp": stats.won_hp,
+        "card_usage": stats.card_usage,
+    })
+
+
+def _stats_from_json(text: str) -> BalanceStats:
+    data = json.loads(text)
+    stats = BalanceStats()
+    stats.fights = data["fights"]
+    stats.wins = data["wins"]
+    # O JSON guarda as chaves dos histogramas como texto
+    for name in ("turns_to_kill", "hp_remaining", "won_hp"):
+        getattr(stats, name).update({int(value): count for value, count in data[name].items()})
+    stats.card_usage.update(data["card_usage"])
+    return stats
+
+
+class OutcomeCache:
+    """ Estatísticas de combates guardadas em um banco SQLite.
+
+        Atributos:
+            path (Path): O arquivo do banco.
+            seed (int): Semente base das simulações novas.
+            simulated (int): Quantos combates esta instância simulou, isto é,
+                quantos não vieram do cache.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """ Construtor da classe. Cria o arquivo e a pasta caso não existam.
+
+            Parâmetros:
+                chunk_size (int): Combates por lote enviado a um processo.
+        """
+        self.path = Path(path)
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.simulated = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+
+
+    def __enter__(self) -> "OutcomeCache":
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def close(self):
+        self._connection.close()
+
+
+    def get(self, deck: list, lineup: list, hp: int = None, fights: int = 1000,
+            player_name: str = "Ulisses") -> BalanceStats:
+        """ As estatísticas de pelo menos `fights` combates de `deck` contra
+            `lineup`, começando com `hp` de vida (por padrão, a máxima).
+        """
+        return self.get_many([(deck, lineup, hp)], fights, player_name, workers=1)[0]
+
+
+    def get_many(self, requests: list, fights: int, player_name: str = "Ulisses",
+                 workers: int = None, pool=None) -> list:
+        """ As estatísticas de cada combate de `requests`, com pelo menos
+            `fights` combates cada. As combinações que já têm combates
+            suficientes vêm do cache; as demais simulam só os que faltam,
+            divididos em lotes entre os processos, e são gravadas.
+
+            Parâmetros:
+                requests (list[tuple]): Trios (baralho, inimigos, vida
+                    inicial); com a vida `None`, a máxima.
+                workers (int): Quantidade de processos; com 1, roda no
+                    processo atual. Por padrão, um por núcleo.
+                pool: Um `Executor` já aberto, usado no lugar de um novo.
+
+            Retorna:
+                list[BalanceStats]: Uma entrada por pedido, na mesma ordem.
+        """
+        max_hp = core.default_entity_configurations['entities'][player_name]['max_hp']
+        keys, combats = [], {}
+        for deck, lineup, hp in requests:
+            deck, lineup = deck_key(deck), tuple(lineup)
+            start_hp = bucket_hp(hp if hp != None else max_hp, max_hp)
+            key = outcome_key(deck, lineup, start_hp, player_name)
+            keys.append(key)
+            combats[key] = (deck, lineup, start_hp)
+
+        stored = self._load(list(combats))
+        jobs = []
+        for key, (deck, lineup, start_hp) in combats.items():
+            stats = stored.setdefault(key, BalanceStats())
+            # A semente de cada lote novo depende de quantos combates já
+            # estavam guardados, para não repetir os anteriores
+            for chunk_idx, chunk in enumerate(_chunks(max(fights - stats.fights, 0), self.chunk_size)):
+                chunk_seed = f"{self.seed}:{key}:{stats.fights}:{chunk_idx}"
+                jobs.append((key, (list(deck), list(lineup), chunk_seed, chunk, start_hp, player_name)))
+
+        if jobs:
+            updated = {key for key, _ in jobs}
+            self._run(jobs, stored, workers, pool)
+            self._store({key: stored[key] for key in updated}, combats, player_name)
+        return [stored[key] for key in keys]
+
+
+    def _run(self, jobs: list, stored: dict, workers: int, pool):
+        if pool == None and workers == 1:
+            for key, args in jobs:
+                stored[key].merge(run_chunk(*args))
+                self.simulated += args[3]
+            return
+        executor = pool if pool != None else ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [(key, args[3], executor.submit(run_chunk, *args)) for key, args in jobs]
+            for key, chunk, future in futures:
+                stored[key].merge(future.result())
+                self.simulated += chunk
+        finally:
+            if pool == None:
+                executor.shutdown()
+
+
+    def _load(self, keys: list) -> dict:
+        stored = {}
+        # Em blocos, abaixo do limite de parâmetros do SQLite
+        for start in range(0, len(keys), 500):
+            block = keys[start:start + 500]
+            rows = self._connection.execute(
+                f"SELECT key, stats FROM outcomes WHERE key IN ({','.join('?' * len(block))})", block)
+            stored.update((key, _stats_from_json(stats)) for key, stats in rows)
+        return stored
+
+
+    def _store(self, stats: dict, combats: dict, player_name: str):
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(key, ENGINE_VERSION, player_name, ",".join(combats[key][0]), ",".join(combats[key][1]),
+                  combats[key][2], value.fights, _stats_to_json(value)) for key, value in stats.items()])
+
+
+    def entries(self) -> list:
+        """ Os combates guardados, como tuplas (versão, jogador, baralho,
+            inimigos, vida inicial, estatísticas).
+        """
+        rows = self._connection.execute(
+            "SELECT engine, player, deck, lineup, start_hp, stats FROM outcomes ORDER BY lineup, start_hp, deck")
+        return [(engine, player, deck.split(","), lineup.split(","), start_hp, _stats_from_json(stats))
+                for engine, player, deck, lineup, start_hp, stats in rows]
+
+
+    def prune(self, all_entries: bool = False) -> int:
+        """ Remove os combates de outras versões de `ENGINE_VERSION` (ou
+            todos, com `all_entries`) e retorna quantos foram removidos.
+        """
+        with self._connection:
+            if all_entries:
+                cursor = self._connection.execute("DELETE FROM outcomes")
+            else:
+                cursor = self._connection.execute("DELETE FROM outcomes WHERE engine != ?", (ENGINE_VERSION,))
+        return cursor.rowcount
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m outcome_cache", description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default=CACHE_PATH,
+                        help=f"arquivo do cache (padrão: {CACHE_PATH.relative_to(game_dir)})")
+    parser.add_argument("--prune", action="store_true", help="remove os combates de outras versões do motor")
+    parser.add_argument("--clear", action="store_true", help="remove todos os combates")
+    args = parser.parse_args(argv)
+
+    with OutcomeCache(args.path) as cache:
+        if args.prune or args.clear:
+            print(f"{cache.prune(all_entries=args.clear)} combate(s) removido(s)")
+            return
+        for engine, player, deck, lineup, start_hp, stats in cache.entries():
+            low, high = stats.win_rate_interval()
+            stale = "" if engine == ENGINE_VERSION else f" (versão {engine})"
+            sys.stdout.write(f"{'+'.join(lineup)} com {start_hp} de vida, {len(deck)} cartas{stale}: "
+                             f"{stats.fights} combates, vitória {stats.win_rate:.3f} [{low:.3f}, {high:.3f}], "
+                             f"vida média {stats.mean_hp_remaining:.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+""" Módulo responsável pela medição do tempo gasto em cada fase dos frames.
+
+    O loop principal marca o início de cada fase (eventos, `update`, `draw`,
+    transição e ampliação da tela) com `FrameProfiler.mark`. As medições dos
+    últimos frames ficam disponíveis como percentis, podem ser exibidas sobre o
+    jogo (tecla F3) e exportadas em CSV ou no formato de trace do Chrome
+    (`chrome://tracing`, Perfetto) ao sair, usando a variável de ambiente
+    `ODYSSEY_PROFILE`:
+
+        ODYSSEY_PROFILE=frames.json python src/main.py
+"""
+
+
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+import csv
+import json
+import pygame
+import assets
+
+
+PHASES = ("events", "update", "draw", "transition", "scale", "overlay")
+
+# Quantidade de frames usados nos percentis
+WINDOW = 240
+
+# O texto do overlay é renderizado novamente a cada `OVERLAY_INTERVAL` frames
+OVERLAY_INTERVAL = 15
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """ Retorna o percentil `p` (entre 0 e 100) de uma lista ordenada, usando o
+        método do vizinho mais próximo.
+    """
+    if not sorted_values:
+        return 0.0
+    index = round(p / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """ Mede o tempo de cada fase dos frames do loop principal.
+
+        Atributos:
+            frame (int): O número do frame atual.
+            window (dict[str, deque]): Para cada fase (e para o frame inteiro,
+                em "frame"), a duração em segundos nos últimos frames.
+            records (list): Todas as fases medidas, como tuplas
+                (frame, tela, fase, início, duração). Só é preenchida quando
+                `record` é verdadeiro, pois cresce durante o jogo inteiro.
+    """
+
+
+    def __init__(self, record: bool = False, window: int = WINDOW):
+        """ Construtor da classe. """
+        self.frame = 0
+        self.window = {phase: deque(maxlen=window) for phase in PHASES + ("frame",)}
+        self.records = [] if record else None
+
+        self._origin = perf_counter()
+        self._frame_start = 0
+        self._screen = None
+        self._phase = None
+        self._phase_start = 0
+        self._totals = {}
+        self._overlay = None
+
+
+    def begin_frame(self, screen_name: str):
+        """ Inicia a medição de um frame da tela `screen_name`. """
+        self._frame_start = perf_counter()
+        self._screen = screen_name
+        self._phase = None
+        self._totals = {}
+
+
+    def mark(self, phase: str):
+        """ Encerra a fase atual e inicia `phase`. Com `None`, apenas encerra a
+            fase atual.
+        """
+        now = perf_counter()
+        if self._phase != None:
+            duration = now - self._phase_start
+            self._totals[self._phase] = self._totals.get(self._phase, 0) + duration
+            if self.records != None:
+                self.records.append((self.frame, self._screen, self._phase,
+                                     self._phase_start - self._origin, duration))
+        self._phase = phase
+        self._phase_start = now
+
+
+    def end_frame(self):
+        """ Encerra a medição do frame atual. """
+        self.mark(None)
+        for phase, duration in self._totals.items():
+            self.window[phase].append(duration)
+        self.window["frame"].append(perf_counter() - self._frame_start)
+        self.frame += 1
+
+
+    def percentiles(self, phase: str) -> tuple[float, float, float]:
+        """ Retorna p50, p95 e p99, em milissegundos, da fase `phase` nos
+            últimos frames.
+        """
+        values = sorted(self.window[phase])
+        return tuple(percentile(values, p) * 1000 for p in (50, 95, 99))
+
+
+    def summary(self) -> dict[str, tuple[float, float, float]]:
+        """ Retorna os percentis de todas as fases que já foram medidas. """
+        return {phase: self.percentiles(phase)
+                for phase in ("frame",) + PHASES if self.window[phase]}
+
+
+    def draw_overlay(self, surface: pygame.Surface):
+        """ Desenha os percentis de cada fase no canto superior esquerdo de
+            `surface`.
+        """
+        if self._overlay == None or self.frame % OVERLAY_INTERVAL == 0:
+            self._overlay = self._render_overlay()
+        surface.blit(self._overlay, (4, 4))
+
+
+    def _render_overlay(self) -> pygame.Surface:
+        # O texto muda a cada atualização, então não passa pelo cache de
+        # textos de `assets`; apenas a fonte é compartilhada
+        font = assets.font("pixel_font", 9)
+        lines = ["fase        p50    p95    p99 (ms)"]
+        for phase, (p50, p95, p99) in self.summary().items():
+            lines.append(f"{phase:<10}{p50:6.2f} {p95:6.2f} {p99:6.2f}")
+
+        rendered = [font.render(line, False, (255, 255, 255)) for line in lines]
+        width = max(line.get_width() for line in rendered) + 8
+        height = sum(line.get_height() for line in rendered) + 8
+
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        y = 4
+        for line in rendered:
+            overlay.blit(line, (4, y))
+            y += line.get_height()
+        return overlay
+
+
+    def export(self, path: str):
+        """ Salva as medições em `path`: no formato de trace do Chrome caso a
+            extensão seja `.json` e em CSV caso contrário.
+        """
+        path = Path(path)
+        records = self.records or []
+
+        if path.suffix == ".json":
+            events = [{
+                "name": phase,
+                "cat": screen,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": 1,
+                "tid": 1,
+                "args": {"frame": frame},
+            } for frame, screen, phase, start, duration in records]
+            with open(path, "w") as file:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        else:
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["frame", "screen", "phase", "start_ms", "duration_ms"])
+                for frame, screen, phase, start, duration in records:
+                    writer.writerow([frame, screen, phase,
+                                     f"{start * 1000:.4f}", f"{duration * 1000:.4f}"])
@@ -0,0 +1,270 @@
+""" Sementes das partidas e gravação de replays.
+
+    Toda a aleatoriedade de uma partida vem de `GameRun`, que deriva da semente
+    da partida uma sequência própria para cada uso (embaralhamentos,
+    recompensas). Assim, sortear uma recompensa não altera os embaralhamentos
+    seguintes, e a mesma semente com as mesmas ações reproduz a partida.
+
+    As ações do jogador (escolhas no mapa, cartas jogadas e seus alvos, fim de
+    turno) são gravadas em um formato binário compacto, de 3 bytes por ação, e
+    podem ser reexecutadas sem telas com `HeadlessRun`, milhares de vezes mais
+    rápido que o jogo. A partir de `src/`:
+
+        ODYSSEY_SEED=42 ODYSSEY_REPLAY=partida.odr python main.py
+        python -m replay partida.odr
+"""
+
+
+from argparse import ArgumentParser
+from enum import IntEnum
+from time import perf_counter
+import random
+import struct
+from combat_core import Combatant, Encounter, card_def, default_card_configurations
+from default_map import FIREPLACE_HP, build_default_map
+from map_node import MapNode, MapNodeType
+
+
+MAGIC = b"ODRP"
+VERSION = 1
+
+# Cabeçalho: identificador, versão e semente; cada ação: tipo e dois argumentos
+_HEADER = struct.Struct("<4sBQ")
+_ACTION = struct.Struct("<BBB")
+
+
+class Action(IntEnum):
+    """ Ações gravadas no replay e o significado dos argumentos `a` e `b`. """
+    MAP_CHOICE = 0 # a: índice do nó escolhido entre os filhos do nó atual
+    PLAY_CARD = 1  # a: índice da carta na mão; b: alvo (0 é o jogador, 1 em diante os inimigos)
+    END_TURN = 2
+    CONTINUE = 3   # saída da tela de recompensa
+
+
+def new_seed() -> int:
+    """ Sorteia a semente de uma partida nova. """
+    return random.SystemRandom().getrandbits(64)
+
+
+class ReplayLog:
+    """ As ações de uma partida, na ordem em que aconteceram.
+
+        Atributos:
+            seed (int): A semente da partida.
+            actions (list[tuple[Action, int, int]]): As ações gravadas.
+    """
+
+    def __init__(self, seed: int, actions: list = None):
+        """ Construtor da classe. """
+        self.seed = seed
+        self.actions = actions if actions != None else []
+
+
+    def __len__(self):
+        return len(self.actions)
+
+
+    def record(self, action: Action, a: int = 0, b: int = 0):
+        self.actions.append((action, a, b))
+
+
+    def to_bytes(self) -> bytes:
+        data = bytearray(_HEADER.pack(MAGIC, VERSION, self.seed))
+        for action, a, b in self.actions:
+            data += _ACTION.pack(action, a, b)
+        return bytes(data)
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ReplayLog":
+        """ Lê um replay gerado por `to_bytes`. Gera um ValueError caso os
+            dados não sejam de um replay desta versão.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Replay incompleto")
+        magic, version, seed = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("O arquivo não é um replay")
+        if version != VERSION:
+            raise ValueError(f"Versão de replay não suportada: {version}")
+        if (len(data) - _HEADER.size) % _ACTION.size != 0:
+            raise ValueError("Replay incompleto")
+
+        actions = [(Action(action), a, b)
+                   for action, a, b in _ACTION.iter_unpack(data[_HEADER.size:])]
+        return cls(seed, actions)
+
+
+    def save(self, path: str):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayLog":
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class GameRun:
+    """ Estado compartilhado pelas telas de uma partida: as fontes de
+        aleatoriedade e o replay sendo gravado.
+
+        Atributos:
+            seed (int): A semente da partida.
+            shuffle_rng (random.Random): Usada nos embaralhamentos dos baralhos.
+            reward_rng (random.Random): Usada no sorteio das recompensas.
+            log (ReplayLog): As ações gravadas; `None` quando a partida não é
+                gravada.
+    """
+
+    def __init__(self, seed: int = None, record: bool = True):
+        """ Construtor da classe. Sem `seed`, sorteia uma semente nova. """
+        self.seed = new_seed() if seed == None else seed
+        self.shuffle_rng = self.stream("shuffle")
+        self.reward_rng = self.stream("reward")
+        self.log = ReplayLog(self.seed) if record else None
+
+
+    def stream(self, name: str) -> random.Random:
+        """ Cria a sequência aleatória `name` da partida, que depende apenas da
+            semente e do nome.
+        """
+        return random.Random(f"{self.seed}:{name}")
+
+
+    def record(self, action: Action, a: int = 0, b: int = 0):
+        if self.log != None:
+            self.log.record(action, a, b)
+
+
+def reward_card_ids() -> list:
+    """ As cartas que podem ser sorteadas como recompensa. """
+    return list(default_card_configurations['cards'].keys())
+
+
+class HeadlessRun:
+    """ Reexecuta as ações de uma partida com as regras de `combat_core`, sem
+        telas, sons ou animações.
+
+        Os combates com os mesmos inimigos compartilham as entidades, como as
+        telas de `main.init`; assim o estado do jogo acompanha o da partida
+        gravada.
+
+        Atributos:
+            run (GameRun): As fontes de aleatoriedade da partida.
+            player (Combatant): Ulisses.
+            current_node (MapNode): O nó em que o jogador está.
+            encounter (Encounter): O combate atual, ou `None` fora de combate.
+            fights (int): Quantidade de combates iniciados.
+            wins (int): Quantidade de combates vencidos.
+            rewards (list[str]): As cartas recebidas como recompensa.
+    """
+
+    def __init__(self, seed: int, root: MapNode = None):
+        """ Construtor da classe. Por padrão, usa o mapa de `default_map`. """
+        self.run = GameRun(seed, record=False)
+        self.player = Combatant.from_config("Ulisses")
+        self.current_node = root if root != None else build_default_map()
+        self.current_node.activate()
+        self.encounter = None
+        self.fights = 0
+        self.wins = 0
+        self.rewards = []
+        self._enemies = {}
+
+
+    def apply(self, action: Action, a: int = 0, b: int = 0):
+        """ Executa uma ação do replay. Gera um ValueError caso ela não seja
+            possível no estado atual, o que indica que o replay divergiu.
+        """
+        if action == Action.MAP_CHOICE:
+            if self.encounter != None or a >= len(self.current_node.children):
+                raise ValueError(f"Escolha de mapa inválida: {a}")
+            self._enter(self.current_node.children[a])
+
+        elif action == Action.PLAY_CARD:
+            encounter = self._current_encounter()
+            hand = self.player.deck.hand
+            if a >= len(hand) or b > len(encounter.enemies):
+                raise ValueError(f"Carta ou alvo inválido: {a}, {b}")
+            target = self.player if b == 0 else encounter.enemies[b - 1]
+            if not encounter.play_at(a, target):
+                raise ValueError(f"A carta {hand[a].name} não pôde ser jogada")
+            if encounter.check_win():
+                self._reward()
+
+        elif action == Action.END_TURN:
+            encounter = self._current_encounter()
+            encounter.end_player_turn()
+            if encounter.check_win():
+                self._reward()
+            else:
+                encounter.run_enemy_turn()
+
+        # `Action.CONTINUE` apenas troca de tela, sem alterar o estado
+
+
+    def replay(self, log: ReplayLog) -> "HeadlessRun":
+        for action, a, b in log.actions:
+            self.apply(action, a, b)
+        return self
+
+
+    def _current_encounter(self) -> Encounter:
+        if self.encounter == None:
+            raise ValueError("Ação de combate fora de um combate")
+        return self.encounter
+
+
+    def _enter(self, node: MapNode):
+        self.current_node.navigate_to(node)
+        self.current_node = node
+
+        if node.type == MapNodeType.FIREPLACE:
+            self.player.current_life = min(self.player.current_life + FIREPLACE_HP, self.player.max_hp)
+        elif node.encounter:
+            key = tuple(node.encounter)
+            if key not in self._enemies:
+                self._enemies[key] = [Combatant.from_config(name) for name in node.encounter]
+            self.encounter = Encounter(self.player, self._enemies[key], self.run.shuffle_rng)
+            self.encounter.begin()
+            self.fights += 1
+
+
+    def _reward(self):
+        card_id = self.run.reward_rng.choice(reward_card_ids())
+        self.player.deck.add_card(card_def(card_id))
+        self.rewards.append(card_id)
+        self.wins += 1
+        self.encounter = None
+
+
+def replay(log: ReplayLog) -> HeadlessRun:
+    """ Reexecuta `log` sem telas e retorna o estado final da partida. """
+    return HeadlessRun(log.seed).replay(log)
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m replay", description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="arquivo gravado com ODYSSEY_REPLAY")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="quantidade de reexecuções, para medir a velocidade")
+    args = parser.parse_args(argv)
+
+    log = ReplayLog.load(args.path)
+    start = perf_counter()
+    for _ in range(args.repeat):
+        run = replay(log)
+    elapsed = perf_counter() - start
+
+    print(f"semente: {log.seed}")
+    print(f"ações: {len(log)}")
+    print(f"combates: {run.wins}/{run.fights} vencidos")
+    print(f"vida final: {run.player.current_life}/{run.player.max_hp}")
+    print(f"recompensas: {', '.join(run.rewards) or '-'}")
+    print(f"tempo: {elapsed / args.repeat * 1000:.3f} ms por reexecução")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+""" Análise das rotas do mapa: caminhos até o boss, fogueiras e risco.
+
+    Todas as rotas começam na raiz e terminam em um nó de boss. Como o mapa é
+    um grafo acíclico, as medidas sobre as rotas são calculadas por
+    programação dinâmica na ordem topológica de `MapGraph`, com uma operação
+    por aresta, sem enumerar as rotas (que crescem exponencialmente):
+
+    - a quantidade de rotas até cada nó;
+    - o mínimo, o máximo e a média, entre todas as rotas, de fogueiras
+      visitadas e da vida perdida esperada;
+    - a rota mais segura (menor perda esperada; em caso de empate, a com mais
+      fogueiras) a partir de qualquer nó.
+
+    A perda esperada de cada combate vem das simulações de `balance`: a vida
+    máxima de Ulisses menos a vida média restante, com o baralho inicial e a
+    vida cheia. Uso (a partir de `src/`):
+
+        python -m route_analysis --fights 500
+        python -m route_analysis --width 100 --depth 120 --seed 7 --format json
+        python -m route_analysis --cache
+"""
+
+
+from argparse import ArgumentParser
+from time import perf_counter
+import json
+import sys
+import combat_core as core
+from balance import run_sweep
+from default_map import build_default_map
+from map_generator import MapGenerator
+from map_graph import MapGraph
+from map_node import MapNode, MapNodeType
+from outcome_cache import CACHE_PATH, OutcomeCache
+
+
+DEFAULT_FIGHTS = 500
+
+
+def encounter_hp_loss(encounters, deck: list = None, fights: int = DEFAULT_FIGHTS, seed: int = 0,
+                      workers: int = None, player_name: str = "Ulisses", cache: OutcomeCache = None) -> dict:
+    """ Simula cada grupo de inimigos e retorna a vida perdida esperada em
+        cada um (dict[tuple[str, ...], float]).
+
+        Parâmetros:
+            encounters: Os grupos de inimigos, como listas de nomes.
+            deck (list[str]): O baralho do jogador; por padrão, o inicial.
+            workers (int): Processos usados pelas simulações (ver
+                `balance.run_sweep`).
+            cache (OutcomeCache): Cache dos combates (ver `balance.run_sweep`).
+    """
+    player = core.default_entity_configurations['entities'][player_name]
+    deck = deck if deck != None else player['draw_pile']
+    lineups = sorted({tuple(encounter) for encounter in encounters})
+    report = run_sweep([deck], [list(lineup) for lineup in lineups], fights, seed, workers, cache=cache)
+    return {tuple(lineup): player['max_hp'] - stats.mean_hp_remaining for _, lineup, stats in report}
+
+
+class RouteAnalysis:
+    """ Medidas das rotas de um mapa até os nós de boss.
+
+        Atributos:
+            graph (MapGraph): O mapa analisado.
+            node_loss (dict[MapNode, float]): Vida perdida esperada em cada nó.
+            paths (dict[MapNode, int]): Quantidade de rotas da raiz até cada nó.
+            fireplaces (dict[MapNode, tuple[int, int, float]]): Mínimo, máximo
+                e média de fogueiras nas rotas da raiz até cada nó (incluindo
+                ele).
+            hp_loss (dict[MapNode, tuple[float, float, float]]): O mesmo para a
+                vida perdida esperada.
+            safest_loss (dict[MapNode, float]): A menor perda esperada de cada
+                nó (excluindo ele) até um boss; infinita se nenhum boss é
+                alcançável.
+            bosses (list[MapNode]): Os nós de boss alcançáveis.
+    """
+
+    def __init__(self, graph: MapGraph, encounter_loss: dict):
+        """ Construtor da classe.
+
+            Parâmetros:
+                encounter_loss (dict[tuple[str, ...], float]): A vida perdida
+                    esperada em cada grupo de inimigos (ver
+                    `encounter_hp_loss`). Grupos ausentes contam como zero.
+        """
+        self.graph = graph
+        self.node_loss = {node: encounter_loss.get(tuple(node.encounter), 0.0) if node.encounter else 0.0
+                          for node in graph.nodes}
+        self.bosses = [node for node in graph.nodes if node.type == MapNodeType.BOSS]
+
+        order = graph.topological_order
+        parents = graph.parents
+
+        # Da raiz para frente: quantidade de rotas e, para cada medida, o
+        # mínimo, o máximo e a média entre as rotas que chegam no nó
+        self.paths = {}
+        self.fireplaces = {}
+        self.hp_loss = {}
+        for node in order:
+            node_parents = parents[node]
+            fireplace = int(node.type == MapNodeType.FIREPLACE)
+            loss = self.node_loss[node]
+            if not node_parents:
+                paths = 1
+                fire = (fireplace, fireplace, fireplace)
+                risk = (loss, loss, loss)
+            else:
+                paths = sum(self.paths[parent] for parent in node_parents)
+                fire = _combine([self.fireplaces[parent] for parent in node_parents],
+                                [self.paths[parent] for parent in node_parents], fireplace, paths)
+                risk = _combine([self.hp_loss[parent] for parent in node_parents],
+                                [self.paths[parent] for parent in node_parents], loss, paths)
+            self.paths[node] = paths
+            self.fireplaces[node] = fire
+            self.hp_loss[node] = risk
+
+        # Dos bosses para trás: a rota mais segura a partir de cada nó
+        self.safest_loss = {}
+        self._safest_fireplaces = {}
+        self._next = {}
+        for node in reversed(order):
+            if node.type == MapNodeType.BOSS:
+                self.safest_loss[node] = 0.0
+                self._safest_fireplaces[node] = 0
+                continue
+            best = None
+            for child in node.children:
+                key = (self.safest_loss[child] + self.node_loss[child],
+                       -(self._safest_fireplaces[child] + (child.type == MapNodeType.FIREPLACE)))
+                if best == None or key < best[0]:
+                    best = (key, child)
+            if best == None or best[0][0] == float("inf"):
+                self.safest_loss[node] = float("inf")
+                self._safest_fireplaces[node] = 0
+            else:
+                self.safest_loss[node] = best[0][0]
+                self._safest_fireplaces[node] = -best[0][1]
+                self._next[node] = best[1]
+
+
+    @property
+    def route_count(self) -> int:
+        """ Quantidade de rotas distintas da raiz até um boss. """
+        return sum(self.paths[boss] for boss in self.bosses)
+
+
+    def safest_route(self, start: MapNode = None) -> list:
+        """ A rota de menor perda esperada de `start` (por padrão, a raiz) até
+            um boss, incluindo os dois. Vazia se nenhum boss é alcançável.
+        """
+        node = start if start != None else self.graph.root
+        if self.safest_loss[node] == float("inf"):
+            return []
+        route = [node]
+        while node in self._next:
+            node = self._next[node]
+            route.append(node)
+        return route
+
+
+    def summary(self) -> dict:
+        """ As medidas das rotas até os bosses, como dados simples. """
+        routes = self.route_count
+        fire = _merge_bosses([self.fireplaces[boss] for boss in self.bosses], [self.paths[boss] for boss in self.bosses])
+        risk = _merge_bosses([self.hp_loss[boss] for boss in self.bosses], [self.paths[boss] for boss in self.bosses])
+        safest = self.safest_route()
+        return {
+            "nodes": len(self.graph),
+            "edges": self.graph.edge_count,
+            "routes": routes,
+            "fireplaces": {"min": fire[0], "max": fire[1], "mean": fire[2]},
+            "hp_loss": {"min": risk[0], "max": risk[1], "mean": risk[2]},
+            "safest_route": {
+                "hp_loss": sum(self.node_loss[node] for node in safest),
+                "fireplaces": sum(node.type == MapNodeType.FIREPLACE for node in safest),
+                "nodes": [[node.type.name, node.encounter] for node in safest],
+            },
+        }
+
+
+def _combine(measures: list, paths: list, value: float, total_paths: int) -> tuple:
+    # Junta (mínimo, máximo, média) dos pais, ponderando a média pela fração
+    # das rotas que vem de cada um, e soma o valor do nó. A divisão vem antes
+    # da multiplicação porque as contagens passam facilmente do maior float
+    low = min(measure[0] for measure in measures) + value
+    high = max(measure[1] for measure in measures) + value
+    mean = sum(measure[2] * (count / total_paths) for measure, count in zip(measures, paths)) + value
+    return low, high, mean
+
+
+def _merge_bosses(measures: list, paths: list) -> tuple:
+    if not measures:
+        return 0, 0, 0.0
+    return _combine(measures, paths, 0, sum(paths))
+
+
+def write_text(summary: dict, file):
+    file.write(f"{summary['nodes']} nós, {summary['edges']} arestas, {summary['routes']} rotas até o boss\n")
+    for name, label in (("fireplaces", "Fogueiras"), ("hp_loss", "Vida perdida esperada")):
+        measure = summary[name]
+        file.write(f"{label}: mínimo {measure['min']:.4g}, média {measure['mean']:.4g}, máximo {measure['max']:.4g}\n")
+    safest = summary["safest_route"]
+    file.write(f"Rota mais segura: {safest['hp_loss']:.1f} de vida, {safest['fireplaces']} fogueira(s)\n")
+    for node_type, encounter in safest["nodes"]:
+        file.write(f"  {node_type}{' ' + ', '.join(encounter) if encounter else ''}\n")
+
+
+def main(argv: list = None):
+    parser = ArgumentParser(prog="python -m route_analysis", description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--fights", type=int, default=DEFAULT_FIGHTS,
+                        help="combates simulados por grupo de inimigos")
+    parser.add_argument("--width", type=int, help="gera um mapa com esta largura em vez do mapa padrão")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="quantidade de processos (padrão: um por núcleo)")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    parser.add_argument("--cache", nargs="?", const=CACHE_PATH,
+                        help="guarda os combates simulados neste arquivo e reaproveita os já guardados "
+                             "(sem o arquivo: o cache de `outcome_cache`)")
+    args = parser.parse_args(argv)
+
+    root = build_default_map() if args.width == None else MapGenerator(args.width, args.depth, args.seed).generate()
+    graph = MapGraph(root)
+    cache = OutcomeCache(args.cache, args.seed) if args.cache != None else None
+    loss = encounter_hp_loss([node.encounter for node in graph.nodes if node.encounter],
+                             fights=args.fights, seed=args.seed, workers=args.workers, cache=cache)
+    if cache != None:
+        cache.close()
+
+    start = perf_counter()
+    summary = RouteAnalysis(graph, loss).summary()
+    elapsed = perf_counter() - start
+
+    if args.format == "json":
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        write_text(summary, sys.stdout)
+        print(f"Análise em {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
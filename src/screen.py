@@ -1,8 +1,15 @@
 from abc import abstractmethod, ABC
 from typing import Self, Optional
+from pygame import Rect
 from pygame.event import Event
 
 
+# O loop principal chama `Screen.update` a uma taxa fixa, independente da taxa
+# de quadros; cada chamada representa `TIMESTEP` segundos de jogo
+UPDATE_RATE = 60
+TIMESTEP = 1 / UPDATE_RATE
+
+
 class Screen(ABC):
     """ Representa uma tela do jogo, como um menu principal ou uma tela de
         combate. Durante o jogo, apenas uma tela será exibida de cada vez e
@@ -23,9 +30,11 @@ class Screen(ABC):
 
     @abstractmethod
     def update(self) -> Optional[Self]:
-        """ Método chamado uma vez a cada frame (enquanto a tela estiver
-            visível e não esteja ocorrendo uma transição) e responsável pelas
-            atualizações gerais da tela, não incluindo renderização.
+        """ Método chamado `UPDATE_RATE` vezes por segundo (enquanto a tela
+            estiver visível e não esteja ocorrendo uma transição), independente
+            da taxa de quadros, e responsável pelas atualizações gerais da
+            tela, não incluindo renderização. Cada chamada avança o jogo em
+            `TIMESTEP` segundos.
             Implementações deste método devem retornar dele a próxima tela a
             ser exibida ou `None` caso não seja o momento de trocar de tela; o
             loop principal do jogo lida com a transição e faz essa troca
@@ -35,10 +44,16 @@ class Screen(ABC):
 
 
     @abstractmethod
-    def draw(self):
+    def draw(self, alpha: float = 1.0):
         """ Método chamado uma vez a cada frame (enquanto a tela estiver
             visível, incluindo durante as transições) e responsável pela
             renderização da tela.
+
+            Parâmetros:
+                alpha (float): Fração de `TIMESTEP` decorrida desde a última
+                    chamada de `update`, entre 0 e 1. Telas com movimento podem
+                    usá-la para interpolar as posições entre o passo anterior e
+                    o atual.
         """
         ...
 
@@ -49,3 +64,46 @@ class Screen(ABC):
             totalmente preta.
         """
         pass
+
+
+    def prefetch(self):
+        """ Método chamado quando a tela pode ser a próxima a ser exibida (o
+            mapa o chama para as telas dos nós alcançáveis). Telas que leem
+            arquivos ao serem exibidas devem pedi-los aqui com
+            `assets.prefetch_*`, para que sejam lidos em segundo plano e
+            `onenter` não espere pelo disco.
+        """
+        pass
+
+
+    def dirty_rects(self) -> Optional[list[Rect]]:
+        """ Método chamado pelo loop principal, no modo de renderização por
+            regiões, uma vez a cada frame depois de `update` e antes de
+            `draw`. Deve retornar as regiões da tela que mudaram desde o último
+            frame: `None` indica a tela inteira e uma lista vazia indica que
+            nada mudou, caso em que `draw` nem é chamado.
+
+            Por padrão a tela inteira é redesenhada em todo frame. Telas que
+            suportam o modo marcam as regiões alteradas com `invalidate` e
+            sobrescrevem este método retornando `self._take_dirty_rects()`.
+        """
+        return None
+
+
+    def invalidate(self, rect: Optional[Rect] = None):
+        """ Marca `rect` (ou a tela inteira, caso seja `None`) para ser
+            redesenhada no próximo frame.
+        """
+        dirty = getattr(self, "_dirty", [])
+        if rect is None or dirty is None:
+            self._dirty = None
+        else:
+            dirty.append(Rect(rect))
+            self._dirty = dirty
+
+
+    def _take_dirty_rects(self) -> Optional[list[Rect]]:
+        # Retorna as regiões marcadas por `invalidate` e esvazia a lista
+        dirty = getattr(self, "_dirty", None)
+        self._dirty = []
+        return dirty
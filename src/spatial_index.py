@@ -0,0 +1,87 @@
+""" Índice espacial para os nós do mapa.
+
+    `SpatialGrid` divide o plano em células quadradas e guarda em cada uma os
+    nós cuja posição cai nela. Consultas por raio (hover do mouse) e por
+    retângulo (nós visíveis na tela) só olham as células que tocam a região
+    consultada, então o custo depende do tamanho da região e não da
+    quantidade de nós do mapa.
+"""
+
+
+from math import floor
+
+
+# Lado padrão das células, próximo ao tamanho dos sprites dos nós
+CELL_SIZE = 64
+
+
+class SpatialGrid:
+    """ Grade uniforme sobre a posição (`pos`) de um conjunto de itens, como
+        os `MapNode`. As posições são lidas na construção; se mudarem, o
+        índice precisa ser recriado.
+
+        Atributos:
+            cell_size (float): O lado de cada célula.
+    """
+
+    def __init__(self, items, cell_size: float = CELL_SIZE):
+        """ Construtor da classe. """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._count = 0
+        for item in items:
+            self._cells.setdefault(self._cell(item.pos[0], item.pos[1]), []).append(item)
+            self._count += 1
+
+
+    def __len__(self):
+        return self._count
+
+
+    def query_radius(self, center, radius: float) -> list:
+        """ Retorna os itens a uma distância menor que `radius` de `center`,
+            do mais próximo ao mais distante.
+        """
+        cx, cy = center[0], center[1]
+        squared_radius = radius * radius
+        found = []
+        for item in self._candidates(cx - radius, cy - radius, cx + radius, cy + radius):
+            dx = item.pos[0] - cx
+            dy = item.pos[1] - cy
+            squared_distance = dx * dx + dy * dy
+            if squared_distance < squared_radius:
+                found.append((squared_distance, item))
+        found.sort(key=lambda pair: pair[0])
+        return [item for _, item in found]
+
+
+    def query_rect(self, rect) -> list:
+        """ Retorna os itens cuja posição está dentro de `rect`, um
+            `pygame.Rect` ou uma tupla (x, y, largura, altura).
+        """
+        left, top, width, height = rect
+        right, bottom = left + width, top + height
+        return [item for item in self._candidates(left, top, right, bottom)
+                if left <= item.pos[0] < right and top <= item.pos[1] < bottom]
+
+
+    def _candidates(self, left: float, top: float, right: float, bottom: float):
+        # Itens das células que tocam o retângulo dado
+        first_x, first_y = self._cell(left, top)
+        last_x, last_y = self._cell(right, bottom)
+        cells = self._cells
+        if (last_x - first_x + 1) * (last_y - first_y + 1) > len(cells):
+            # Região maior que o mapa: mais barato percorrer as células ocupadas
+            for (x, y), items in cells.items():
+                if first_x <= x <= last_x and first_y <= y <= last_y:
+                    yield from items
+            return
+        for x in range(first_x, last_x + 1):
+            for y in range(first_y, last_y + 1):
+                items = cells.get((x, y))
+                if items:
+                    yield from items
+
+
+    def _cell(self, x: float, y: float) -> tuple:
+        return floor(x / self.cell_size), floor(y / self.cell_size)
@@ -1,5 +1,25 @@
-from abc import ABC,abstractmethod
+""" Efeitos de status (veneno, regeneração, força e fraqueza) e a tabela que
+    guarda os efeitos ativos de uma entidade.
+
+    Cada efeito tem um tipo, uma duração em turnos e uma intensidade (o dano
+    do veneno, a cura da regeneração, a porcentagem da força ou da
+    fraqueza). As regras de cada tipo ficam em `EFFECT_RULES`: o parâmetro de
+    `cards.json` que dá a intensidade, quanto ela diminui a cada turno e como
+    uma nova aplicação se junta às que já estão ativas (`STACKING_RULES`).
+
+    `EffectTable` guarda os efeitos em colunas por tipo (arrays de números, e
+    não um objeto por efeito). Um turno aplica cada tipo uma única vez, com a
+    soma das intensidades, e a duração e o decaimento vêm de um relógio por
+    tipo, sem percorrer os efeitos; os expirados são removidos de uma vez,
+    compactando as colunas. Assim o custo de um turno quase não muda com
+    dezenas de venenos acumulados.
+"""
+
+
+from array import array
 from enum import Enum
+from typing import NamedTuple
+
 
 class EffectTypes(Enum):
     POISON = 0
@@ -8,68 +28,196 @@ class EffectTypes(Enum):
     STRENGTH = 3
     WEAKNESS = 4
 
-class StatusEffect(ABC):
-    """_summary_
 
-    Args
-    ----
-        ABC (_type_): _description_
+# Como uma nova aplicação de um efeito se junta às do mesmo tipo no alvo:
+# "independent" acrescenta um efeito separado; "intensity" soma a intensidade
+# ao efeito existente, que fica com a maior duração; "duration" soma a
+# duração, e o efeito fica com a maior intensidade
+STACKING_RULES = ("independent", "intensity", "duration")
+
+
+class EffectRule(NamedTuple):
+    """ Regras de um tipo de efeito.
+
+        Atributos:
+            parameter (str): O parâmetro de "status_effect_info" com a
+                intensidade.
+            decay (float): Quanto a intensidade diminui a cada turno.
+            stacking (str): A regra de acúmulo padrão (ver `STACKING_RULES`);
+                cada carta pode escolher outra em "status_effect_info".
+    """
+    parameter: str
+    decay: float = 0
+    stacking: str = "independent"
+
+
+# Os efeitos implementados, na ordem em que são aplicados a cada turno
+EFFECT_RULES = {
+    EffectTypes.POISON: EffectRule("damage", decay=1),
+    EffectTypes.REGEN: EffectRule("heal"),
+    EffectTypes.STRENGTH: EffectRule("damage_percent_buff"),
+    EffectTypes.WEAKNESS: EffectRule("damage_percent_debuff"),
+}
+
+
+class StatusEffect:
+    """ Um efeito a ser aplicado por uma carta, já com os parâmetros dela.
 
-    Atributos
-    ---------
-        type (EffectTypes): enumerador que indica tipo 
+        Atributos:
+            type (EffectTypes): O tipo do efeito.
+            duration (int): Quantidade de turnos, contando a aplicação.
+            magnitude (float): A intensidade (ver `EffectRule.parameter`).
+            stacking (str): A regra de acúmulo (ver `STACKING_RULES`).
     """
-    def __init__(self,duration:int):
+    __slots__ = ("type", "duration", "magnitude", "stacking")
+
+    def __init__(self, type: EffectTypes, duration: int, magnitude: float, stacking: str = None):
+        self.type = type
         self.duration = duration
+        self.magnitude = magnitude
+        self.stacking = stacking if stacking != None else EFFECT_RULES[type].stacking
 
-    @abstractmethod
-    def apply_effect(self):
-        self.duration -= 1
+    @classmethod
+    def from_info(cls, effect_type: EffectTypes, info) -> "StatusEffect":
+        """ Cria o efeito a partir de "status_effect_info" de `cards.json`.
+            Gera um KeyError caso falte algum parâmetro.
+        """
+        rule = EFFECT_RULES[effect_type]
+        return cls(effect_type, info['duration'], info[rule.parameter], info.get('stacking'))
 
-class Poison(StatusEffect):
-    def __init__(self, duration:int, damage:int):
-        super().__init__(duration)
-        self.damage = damage
-    def apply_effect(self,affected):
-        if affected.check_is_alive():
-            affected.engage_hit()
-            new_health = affected.current_life - self.damage
-            if new_health <= 0:
-                affected.current_life = 0
-            else:
-                affected.current_life = new_health
-            self.damage -= 1
-            super().apply_effect()
-
-class Regen(StatusEffect):
-    def __init__(self, duration:int, heal:int):
-        super().__init__(duration)
-        self.heal = heal
-    def apply_effect(self,affected):
-        if affected.check_is_alive():
-            new_health = affected.current_life + self.heal
-            if new_health >= affected.max_hp:
-                affected.current_life = affected.max_hp
+
+class ActiveEffect(NamedTuple):
+    """ Um efeito ativo em uma entidade, como lido de `EffectTable`. """
+    type: EffectTypes
+    duration: int
+    magnitude: float
+
+
+def apply_batch(effect_type: EffectTypes, affected, total: float):
+    """ Aplica em `affected`, de uma vez, a soma das intensidades de todos os
+        efeitos de um tipo.
+    """
+    if effect_type == EffectTypes.POISON:
+        affected.engage_hit()
+        affected.current_life = max(affected.current_life - int(total), 0)
+    elif effect_type == EffectTypes.REGEN:
+        affected.current_life = min(affected.current_life + int(total), affected.max_hp)
+    elif effect_type == EffectTypes.STRENGTH:
+        affected.damage_multiplier += total
+    elif effect_type == EffectTypes.WEAKNESS:
+        affected.damage_multiplier -= total
+
+
+class _EffectColumn:
+    """ Os efeitos ativos de um tipo. Cada efeito guarda o turno em que expira
+        e a intensidade que teria no turno zero; com o relógio (`clock`), a
+        duração restante e a intensidade atual saem sem atualizar os arrays.
+    """
+    __slots__ = ("decay", "clock", "expires", "bases")
+
+    def __init__(self, decay: float):
+        self.decay = decay
+        self.clock = 0
+        self.expires = array("l")
+        self.bases = array("d")
+
+    def __len__(self):
+        return len(self.expires)
+
+    def copy(self) -> "_EffectColumn":
+        other = _EffectColumn(self.decay)
+        other.clock = self.clock
+        other.expires = array("l", self.expires)
+        other.bases = array("d", self.bases)
+        return other
+
+    def total(self) -> float:
+        # Soma das intensidades atuais, calculada em C sobre o array
+        return sum(self.bases) - self.decay * self.clock * len(self.bases)
+
+    def add(self, duration: int, magnitude: float, stacking: str):
+        if stacking != "independent" and len(self.expires) > 0:
+            # Junta ao primeiro efeito do tipo
+            current = self.bases[0] - self.decay * self.clock
+            if stacking == "intensity":
+                self.bases[0] += magnitude
+                self.expires[0] = max(self.expires[0], self.clock + duration)
             else:
-                affected.current_life = new_health
-            super().apply_effect()
+                self.bases[0] += max(current, magnitude) - current
+                self.expires[0] += duration
+            return
+        self.expires.append(self.clock + duration)
+        self.bases.append(magnitude + self.decay * self.clock)
 
-class Strength(StatusEffect):
-    def __init__(self, duration:int,damage_percent_buff:float):
-        super().__init__(duration)
-        self.damage_percent_buff = damage_percent_buff
+    def advance(self):
+        # Passa um turno e remove, compactando os arrays, os efeitos expirados
+        self.clock += 1
+        if len(self.expires) > 0 and min(self.expires) <= self.clock:
+            clock = self.clock
+            keep = [i for i, expires in enumerate(self.expires) if expires > clock]
+            self.expires = array("l", [self.expires[i] for i in keep])
+            self.bases = array("d", [self.bases[i] for i in keep])
 
-    def apply_effect(self,affected):
-        if affected.check_is_alive():
-            affected.damage_multiplier += self.damage_percent_buff
-            super().apply_effect()
 
-class Weakness(StatusEffect):
-    def __init__(self, duration:int, damage_percent_debuff:float):
-        super().__init__(duration)
-        self.damage_percent_debuff = damage_percent_debuff
+class EffectTable:
+    """ Os efeitos ativos em uma entidade, em uma coluna por tipo.
 
-    def apply_effect(self, affected):        
+        Pode ser percorrida e indexada como uma lista de `ActiveEffect`, na
+        ordem dos tipos em `EFFECT_RULES` e, dentro de cada tipo, na ordem de
+        aplicação.
+    """
+    __slots__ = ("_columns",)
+
+    def __init__(self):
+        self._columns = {}
+
+    def __len__(self):
+        return sum(len(column) for column in self._columns.values())
+
+    def __iter__(self):
+        for effect_type in EFFECT_RULES:
+            column = self._columns.get(effect_type)
+            if column == None:
+                continue
+            for expires, base in zip(column.expires, column.bases):
+                yield ActiveEffect(effect_type, expires - column.clock, base - column.decay * column.clock)
+
+    def __getitem__(self, index: int) -> ActiveEffect:
+        return list(self)[index]
+
+    def copy(self) -> "EffectTable":
+        other = EffectTable()
+        other._columns = {effect_type: column.copy() for effect_type, column in self._columns.items()}
+        return other
+
+    def apply(self, effect: StatusEffect, affected):
+        """ Aplica `effect` em `affected` imediatamente, como o primeiro turno
+            do efeito, e guarda o restante dele de acordo com a regra de
+            acúmulo. Sobre uma entidade morta, nada é aplicado e o efeito é
+            guardado inteiro.
+        """
+        rule = EFFECT_RULES[effect.type]
+        duration, magnitude = effect.duration, effect.magnitude
         if affected.check_is_alive():
-            affected.damage_multiplier -= self.damage_percent_debuff
-            super().apply_effect()
\ No newline at end of file
+            apply_batch(effect.type, affected, magnitude)
+            duration -= 1
+            magnitude -= rule.decay
+        if duration <= 0:
+            return
+
+        column = self._columns.get(effect.type)
+        if column == None:
+            column = self._columns[effect.type] = _EffectColumn(rule.decay)
+        column.add(duration, magnitude, effect.stacking)
+
+    def tick(self, affected):
+        """ Passa um turno: aplica em `affected` cada tipo de efeito uma única
+            vez, com a soma das intensidades, e remove os efeitos expirados.
+            Enquanto a entidade está morta, os efeitos ficam parados.
+        """
+        for effect_type in EFFECT_RULES:
+            column = self._columns.get(effect_type)
+            if column == None or len(column) == 0 or not affected.check_is_alive():
+                continue
+            apply_batch(effect_type, affected, column.total())
+            column.advance()
@@ -1,17 +1,16 @@
-from pathlib import Path
 import pygame
-from entities import Enemy,Ulisses,AnimationState
+import assets
+from concurrent.futures import ThreadPoolExecutor
+from cards import CARD_SPRITE_SIZE
+from entities import COMBAT_SPRITE_SIZE, Enemy, Ulisses, AnimationState, SpriteState, prefetch_entity
+from combat_core import Encounter
 import random
+from replay import Action, GameRun, reward_card_ids
 from screen import Screen
-import json
-import pygame.mixer as pm
 
-game_dir = Path(__file__).parent.parent
-cards_json_path = game_dir / "assets" / "cards.json"
-
-# Carregando json de configuracoes para construir cartas
-with open(file=cards_json_path,mode='r') as card_config:
-    default_card_configurations = json.load(card_config)
+# As buscas das políticas de inimigo (ver `enemy_ai`) rodam fora do loop
+# principal, enquanto a animação da carta anterior é exibida
+enemy_ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="enemy-ai")
 
 class CombatLevel(Screen):
     """
@@ -26,45 +25,90 @@ class CombatLevel(Screen):
         stages (tuple): Conjunto de estágios contendo os nomes dos inimigos para cada estágio
         staged_enemies (list): Lista de nomes de inimigos para o estágio atual
         instantiated_enemies (list): Lista de instâncias de inimigos criados para o estágio atual
+        encounter (Encounter): Regras e ordem dos turnos do combate, conduzidas pela tela
+        run (GameRun): Partida atual, que fornece os embaralhamentos e grava as jogadas
+        enemy_decision (Future): Escolha de carta do próximo inimigo sendo calculada em
+            `enemy_ai_executor`, ou None
+        static_layer (pygame.Surface): Fundo e partes fixas da interface, compostos uma
+            única vez em `onenter` no formato da tela, ou None antes disso
+        static_layer_pos (tuple): Posição de `static_layer` na tela
+        was_busy (bool): Se o último frame era do turno dos inimigos ou tinha animações
     """
-    def __init__(self,screen:pygame.display,background_name:str,staged_enemies:list, ulisses:Ulisses, next_screen: Screen):
+    def __init__(self,screen:pygame.display,background_name:str,staged_enemies:list, ulisses:Ulisses, next_screen: Screen, run: GameRun = None):
         """Método inicializa objetos da classe CombatLevel
 
         Parâmetros:
             screen (pygame.display): Tela onde o nível será desenhado
             background_name (str): Nome da imagem de fundo que esta armazenado em assets
             stages (tuple): tupla de listas contendo os tipos de inimigo do estágio (ex:stages=(['Fairy','Fairy']) -- estágio com duas fadas inimigas)
+            run (GameRun): Partida atual; sem ela, usa o módulo `random` e nada é gravado
         """
         try:
-            game_dir = Path(__file__).parent.parent
-            background_img_path = game_dir / "assets" / f"{background_name}.png"
-            self.background_img = pygame.image.load(background_img_path)
+            self.background_img = assets.image(background_name)
             
             self.ulisses = ulisses
             self.game_state = 0
             self.screen = screen
             self.staged_enemies = staged_enemies
             self.instantiated_enemies = []
-            self.is_player_turn = True
+            self.run = run
+            self.enemy_decision = None
+            self.static_layer = None
+            self.was_busy = True
+            # O encontro compartilha a lista de inimigos, que é preenchida em `instantiate_enemies`
+            self.encounter = Encounter(ulisses, self.instantiated_enemies,
+                                       run.shuffle_rng if run else random)
             self.next_screen = next_screen
         except FileNotFoundError as error:
             print(f"{error}: background asset not found in 'assets")
 
-    def draw(self):
-        """Método responsável por desenhar todo cenario e inimigos do estágio
+    @property
+    def is_player_turn(self) -> bool:
+        return self.encounter.is_player_turn
+
+    def draw(self, alpha: float = 1.0):
+        """Método responsável por desenhar todo cenario e inimigos do estágio. O fundo
+        e as partes fixas vêm de `static_layer`; apenas as entidades, as barras e a mão
+        são desenhadas a cada frame
         """
-        self.screen.blit(self.background_img,((self.screen.get_width() - self.background_img.get_width()) >> 1,-40))
+        if self.static_layer == None:
+            self.compose_static_layer()
+        self.screen.blit(self.static_layer,self.static_layer_pos)
         self.instantiate_enemies()
-        self.draw_enemies()
-        self.ulisses.draw_entity(self.screen)
+        self.draw_enemies(alpha)
+        self.ulisses.draw_entity(self.screen, alpha)
         if self.is_player_turn:
             self.ulisses.deck.draw_hand_on_screen(self.screen)
 
-    def draw_enemies(self):
+    def compose_static_layer(self):
+        """Desenha o fundo e as partes da interface que não mudam durante o combate
+        (ver `Entity.draw_static`) em uma única superfície, que cobre o fundo e a tela.
+        Convertida para o formato da tela e sem transparência, ela é copiada a cada
+        frame sem conversão de pixels nem mistura de alfa
+        """
+        screen_rect = self.screen.get_rect()
+        background_rect = self.background_img.get_rect(
+            topleft=((screen_rect.width - self.background_img.get_width()) >> 1,-40))
+        layer_rect = screen_rect.union(background_rect)
+
+        layer = pygame.Surface(layer_rect.size)
+        if pygame.display.get_surface() != None:
+            layer = layer.convert()
+        layer.blit(self.background_img,background_rect.move(-layer_rect.x,-layer_rect.y))
+
+        # As entidades desenham em coordenadas da tela
+        chrome = layer.subsurface(screen_rect.move(-layer_rect.x,-layer_rect.y))
+        self.instantiate_enemies()
+        for entity in [self.ulisses] + self.instantiated_enemies:
+            entity.draw_static(chrome)
+        self.static_layer = layer
+        self.static_layer_pos = layer_rect.topleft
+
+    def draw_enemies(self, alpha: float = 1.0):
         """Método responsável por desenhar inimigos na tela do jogador 
         """
         for instantiated_enemy in self.instantiated_enemies:
-            instantiated_enemy.draw_entity(screen=self.screen)
+            instantiated_enemy.draw_entity(screen=self.screen, alpha=alpha)
 
     def instantiate_enemies(self):
         """Método responsável por instanciar todos inimigos do estágio caso não existam
@@ -77,38 +121,43 @@ class CombatLevel(Screen):
                 self.instantiated_enemies[enemy_index].x_pos -= 75 * enemy_index
                 self.instantiated_enemies[enemy_index].origin_x -= 75 * enemy_index
     
+    def plan_enemy_action(self):
+        """Inicia em outra thread, sobre uma cópia do encontro, a escolha da próxima
+        carta de inimigo quando a política dele faz uma busca demorada
+        """
+        if self.enemy_decision != None:
+            return
+        enemy = self.encounter.acting_enemy()
+        if enemy == None:
+            return
+        policy = self.encounter.enemy_policy(enemy)
+        if policy.background:
+            snapshot = self.encounter.clone()
+            enemy_index = self.instantiated_enemies.index(enemy)
+            self.enemy_decision = enemy_ai_executor.submit(policy.choose, snapshot, snapshot.enemies[enemy_index])
+
     def execute_enemy_combat_loop(self,):
-        for each_enemy in self.instantiated_enemies:
-            has_played = self.execute_enemy_turn(each_enemy)
-            if has_played:
-                break
-            else:
-                self.end_enemies_turn()
-
-    def execute_enemy_turn(self,enemy:Enemy) -> bool:
-        target = self.ulisses
-        enemy_turn_played = False
-        if enemy.check_is_alive() and enemy.current_energy > 0 and len(enemy.deck.hand) > 0:
-            #Selecionamos smepre a primeira carta do baralho
-            enemy.deck.selected_card = enemy.deck.hand[0]
-            if enemy.deck.selected_card._type == 'attack': enemy.deck.selected_card.apply_card(enemy,target)
-            elif enemy.deck.selected_card._type == 'defense':
-                enemy.deck.selected_card.apply_card(enemy,enemy)
-            # Caso o inimgo nao tenha energia para jogar a carta atual ainda queremos 
-            # olhar proximas cartas, assim descartamos a carta atual e prosseguimos
-            if enemy.deck.selected_card in enemy.deck.hand:
-                enemy.deck.discard_card(enemy.deck.selected_card)
-            enemy_turn_played = True
-        return enemy_turn_played
+        """Joga uma carta de inimigo por frame, para que as animações de ataque
+        apareçam uma de cada vez; o turno acaba quando nenhum inimigo pode agir.
+        Caso a escolha esteja sendo calculada em outra thread, espera o resultado
+        nos próximos frames
+        """
+        if self.enemy_decision == None:
+            self.encounter.step_enemy_turn()
+        elif self.enemy_decision.done():
+            hand_index = self.enemy_decision.result()
+            self.enemy_decision = None
+            self.encounter.step_enemy_turn(hand_index)
 
     def player_combat_loop(self,mouse_pos:tuple):
         if self.ulisses.check_is_alive():
-            if self.ulisses.deck.selected_card:
+            selected_card = self.ulisses.deck.selected_card
+            if selected_card:
                 if self.ulisses.rect.collidepoint(mouse_pos):
-                    self.ulisses.deck.selected_card.apply_card(self.ulisses,self.ulisses)
-                for enemy in self.instantiated_enemies:
+                    self.play_card(selected_card,0)
+                for enemy_index,enemy in enumerate(self.instantiated_enemies):
                     if enemy.rect.collidepoint(mouse_pos) and enemy.check_is_alive():
-                        self.ulisses.deck.selected_card.apply_card(self.ulisses,enemy) 
+                        self.play_card(selected_card,enemy_index + 1)
             for each_card in self.ulisses.deck.hand:
                 if each_card.rect.collidepoint(mouse_pos):
                     if each_card == self.ulisses.deck.selected_card:
@@ -116,25 +165,35 @@ class CombatLevel(Screen):
                     else:
                         self.ulisses.deck.selected_card = each_card  
 
-    def end_player_turn(self,):
-        for each_enemy in self.instantiated_enemies:
-            each_enemy.current_defense = 0
-            each_enemy.deck.shuffle_and_allocate()
-            each_enemy.apply_offensive_effects()
-            each_enemy.apply_defensive_effects()
-        self.ulisses.current_energy = self.ulisses.max_energy
-        self.ulisses.deck.shuffle_and_allocate()
-        self.ulisses.clear_multipliers()
-        self.is_player_turn = False
+    def play_card(self,card,target_index:int):
+        """Joga `card` no alvo `target_index` (0 é Ulisses, os seguintes são os
+        inimigos) e grava a jogada caso a carta tenha sido aplicada
+        """
+        hand_index = self.ulisses.deck.hand.index(card)
+        target = self.ulisses if target_index == 0 else self.instantiated_enemies[target_index - 1]
+        if self.encounter.play_at(hand_index,target) and self.run:
+            self.run.record(Action.PLAY_CARD,hand_index,target_index)
 
+    def end_player_turn(self,):
+        if self.run:
+            self.run.record(Action.END_TURN)
+        self.encounter.end_player_turn()
 
     def end_enemies_turn(self,):
-        self.ulisses.current_defense = 0 
-        self.ulisses.apply_offensive_effects()
-        self.ulisses.apply_defensive_effects()
-        for each_enemy in self.instantiated_enemies:
-            each_enemy.current_energy = each_enemy.max_energy
-        self.is_player_turn = True  
+        self.encounter.end_enemies_turn()
+
+    def dirty_rects(self):
+        # Durante animações e no turno dos inimigos a tela muda a todo frame;
+        # no turno do jogador ela só muda com os eventos do mouse e teclado.
+        # O frame em que as animações ou o turno dos inimigos terminam também é
+        # redesenhado inteiro, com a nova mão e os sprites em repouso
+        pending = self._take_dirty_rects()
+        busy = not self.is_player_turn or self.check_enemy_animating() \
+            or self.ulisses.animation_state != AnimationState.REST
+        was_busy, self.was_busy = self.was_busy, busy
+        if busy or was_busy:
+            return None
+        return pending
 
     def check_enemy_animating(self) -> bool:
         for each_enemy in self.instantiated_enemies:
@@ -143,72 +202,81 @@ class CombatLevel(Screen):
         return False
     
     def handle_event(self,event:pygame.event.Event,):
+        if event.type == pygame.MOUSEBUTTONDOWN or event.type == pygame.KEYDOWN:
+            self.invalidate()
         if event.type == pygame.MOUSEBUTTONDOWN:
             current_mouse_pos = event.dict["pos"]
             if self.is_player_turn:
                 self.player_combat_loop(current_mouse_pos)
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_e:
+            # Durante o turno dos inimigos a tecla não tem efeito
+            if event.key == pygame.K_e and self.is_player_turn:
                 self.end_player_turn()
             elif event.key == pygame.K_a:
                 self.ulisses.attack_animate()
 
     def run_animations(self,):
-        if self.ulisses.animation_state == AnimationState.ATTACK or self.ulisses.animation_state == AnimationState.RETREAT:
-            self.ulisses.attack_animate(invert_direction=False)
-        elif self.ulisses.animation_state == AnimationState.SHAKE:
-            self.ulisses.hit_animate()
+        self.ulisses.animate(invert_direction=False)
         for each_enemy in self.instantiated_enemies:
-            if each_enemy.animation_state == AnimationState.ATTACK or each_enemy.animation_state == AnimationState.RETREAT:
-                each_enemy.attack_animate(invert_direction=True)
-            elif each_enemy.animation_state == AnimationState.SHAKE:
-                each_enemy.hit_animate()
+            each_enemy.animate(invert_direction=True)
 
     def check_win(self):
-        enemy_is_dead = []
-        for each_enemy in self.instantiated_enemies:
-            enemy_is_dead.append(not each_enemy.check_is_alive())
-        return all(enemy_is_dead)
-    
+        return self.encounter.check_win()
+
+    def prefetch(self):
+        for staged_enemy in self.staged_enemies:
+            prefetch_entity(staged_enemy)
+        self.next_screen.prefetch()
+
     def onenter(self):
-        self.ulisses.deck.shuffle_and_allocate()
-        self.ulisses.damage_multiplier = 1
-        self.ulisses.absorption_multiplier = 1
-        self.ulisses.current_defense = 0
-        self.ulisses.current_energy = self.ulisses.max_energy
+        self.encounter.begin()
+        # Os inimigos voltam com a vida cheia (ver `Encounter.begin`); os sprites de cada
+        # tamanho já foram montados na primeira entrada
         for enemy in self.instantiated_enemies:
-            enemy.current_life = enemy.max_hp
-            img_path = game_dir / "assets" / f"{enemy.name}.png"
-            img = pygame.image.load(img_path)
-            enemy.sprite = pygame.transform.scale(img,(150 * .7,150 * .7))
+            enemy.use_sprite_size(COMBAT_SPRITE_SIZE)
+            enemy.set_sprite_state(SpriteState.ALIVE)
+        self.ulisses.deck.load_sprites()
+        self.compose_static_layer()
         
     def update(self):
         all_entities = [self.ulisses] + self.instantiated_enemies
         for each_entity in all_entities:
-            if not each_entity.check_is_alive():
+            # A troca para o sprite de morte acontece uma única vez
+            if not each_entity.check_is_alive() and each_entity.sprite_state != SpriteState.DEAD:
                 each_entity.death_animate()
-        if not self.is_player_turn and not self.check_enemy_animating():
-            self.execute_enemy_combat_loop()
+        if not self.is_player_turn:
+            self.plan_enemy_action()
+            if not self.check_enemy_animating():
+                self.execute_enemy_combat_loop()
         self.run_animations()
         if self.check_win():
             return self.next_screen
 
 class RewardScreen(Screen):
-    def __init__(self,surface:pygame.surface,ulisses:Ulisses,next_screen:Screen):
+    def __init__(self,surface:pygame.surface,ulisses:Ulisses,next_screen:Screen,run:GameRun=None):
         self.ulisses = ulisses 
+        self.run = run
         self.next_screen = next_screen
         self.surface = surface
         self.reward_name = "---DEFAULT----"
         self.reward = None
         self.screen_ended = False
+        self.font = pygame.font.SysFont("Times New Roman", 16)
 
 
     def randomize_reward(self):
-        reward_cards = list(default_card_configurations['cards'].keys())
-        reward_id = random.choice(reward_cards)
+        reward_cards = reward_card_ids()
+        rng = self.run.reward_rng if self.run else random
+        reward_id = rng.choice(reward_cards)
         self.reward_name = reward_id.replace("_"," ")
         return reward_id
-    
+
+    def prefetch(self):
+        # A recompensa só é sorteada ao entrar na tela, então todas as cartas
+        # possíveis são pedidas
+        for card_id in reward_card_ids():
+            assets.prefetch_image(card_id, CARD_SPRITE_SIZE)
+
     def onenter(self):
         try:
             self.reward = self.ulisses.deck.add_single_card(self.randomize_reward())
@@ -217,19 +285,24 @@ class RewardScreen(Screen):
         finally:
             self.screen_ended = False
             surface_size = pygame.Vector2(self.surface.get_size())
-            font = pygame.font.SysFont("Times New Roman", 16)
-            self.text_surface = font.render(f"""Você Ganhou {self.reward_name} -- 'E' para voltar ao mapa""", False, (255,255,255))
+            self.text_surface = self.font.render(f"""Você Ganhou {self.reward_name} -- 'E' para voltar ao mapa""", False, (255,255,255))
             self.text_pos = (surface_size + (-self.text_surface.get_width(), 100)) / 2
 
-    def draw(self):
+    def draw(self, alpha: float = 1.0):
         if self.reward:
             self.reward.rect.center = self.surface.get_rect().center
             self.surface.blit(self.reward.sprite,self.reward.rect)
             self.surface.blit(self.text_surface, dest=self.text_pos)
 
     def handle_event(self, event):
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_e and not self.screen_ended:
             self.screen_ended = True
+            if self.run:
+                self.run.record(Action.CONTINUE)
+
+    def dirty_rects(self):
+        # A recompensa é estática depois de desenhada
+        return self._take_dirty_rects()
 
     def update(self):
         if self.screen_ended:
@@ -0,0 +1,143 @@
+import os
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import pygame
+from assets import AssetRegistry
+
+
+class TestAssetRegistry(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.registry = AssetRegistry()
+
+    def test_first_request_should_be_a_miss(self):
+        self.registry.image("Ogre")
+
+        self.assertEqual(self.registry.misses, 1)
+        self.assertEqual(self.registry.hits, 0)
+
+    def test_repeated_requests_should_share_the_surface(self):
+        first = self.registry.image("Ogre")
+        second = self.registry.image("Ogre")
+
+        self.assertIs(first, second)
+        self.assertEqual(self.registry.hits, 1)
+
+    def test_scaled_variants_should_be_keyed_by_size(self):
+        small = self.registry.scaled("Ogre", (70, 70))
+        same = self.registry.scaled("Ogre", (70.0, 70.0))
+        big = self.registry.scaled("Ogre", (105, 105))
+
+        self.assertIs(small, same)
+        self.assertIsNot(small, big)
+        self.assertEqual(small.get_size(), (70, 70))
+        self.assertEqual(big.get_size(), (105, 105))
+        self.assertEqual(self.registry.stats()["images"], 1)
+        self.assertEqual(self.registry.stats()["scaled"], 2)
+
+    def test_missing_asset_should_raise_FileNotFoundError(self):
+        with self.assertRaises(FileNotFoundError):
+            self.registry.image("does_not_exist")
+
+    def test_fonts_should_be_loaded_once_per_size(self):
+        small = self.registry.font("pixel_font", 9)
+
+        self.assertIs(self.registry.font("pixel_font", 9), small)
+        self.assertIsNot(self.registry.font("pixel_font", 18), small)
+        self.assertEqual(self.registry.stats()["fonts"], 2)
+
+    def test_same_text_should_not_be_rendered_again(self):
+        font = self.registry.font("pixel_font", 9)
+        first = self.registry.text(font, "80/80", "white")
+
+        self.assertIs(self.registry.text(font, "80/80", "white"), first)
+        self.assertIsNot(self.registry.text(font, "80/80", "red"), first)
+
+    def test_text_cache_should_evict_least_recently_used(self):
+        registry = AssetRegistry(max_texts=2)
+        font = registry.font("pixel_font", 9)
+        first = registry.text(font, "1", "white")
+        registry.text(font, "2", "white")
+        registry.text(font, "1", "white") # "2" passa a ser o menos usado
+        registry.text(font, "3", "white")
+
+        self.assertEqual(registry.stats()["texts"], 2)
+        self.assertIs(registry.text(font, "1", "white"), first)
+        misses = registry.misses
+        registry.text(font, "2", "white")
+        self.assertEqual(registry.misses, misses + 1)
+
+    def test_clear_should_reset_counters(self):
+        self.registry.image("Ogre")
+        self.registry.image("Ogre")
+        self.registry.clear()
+
+        self.assertEqual(self.registry.stats()["hits"], 0)
+        self.assertEqual(self.registry.stats()["misses"], 0)
+        self.assertEqual(self.registry.stats()["images"], 0)
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        pygame.mixer.init()
+        self.registry = AssetRegistry()
+
+    def test_prefetched_image_should_not_be_read_again(self):
+        self.registry.prefetch_image("Ogre").result()
+
+        with mock.patch("pygame.image.load", side_effect=AssertionError("leitura do disco")):
+            surface = self.registry.image("Ogre")
+        self.assertEqual(surface.get_size(), (300, 311))
+
+    def test_prefetch_with_size_should_keep_only_the_scaled_image(self):
+        # Sem o atlas, a imagem vem do arquivo original
+        self.registry._atlas = {"pages": [], "sprites": {}}
+        self.assertEqual(self.registry.prefetch_image("Ogre", (70, 70)).result().get_size(), (70, 70))
+
+        with mock.patch("pygame.image.load", side_effect=AssertionError("leitura do disco")):
+            surface = self.registry.scaled("Ogre", (70, 70))
+        self.assertEqual(surface.get_size(), (70, 70))
+        self.assertEqual(self.registry.stats()["images"], 0)
+        self.assertEqual(self.registry._pending, {})
+
+    def test_prefetched_sound_should_not_be_read_again(self):
+        self.registry.prefetch_sound("hit_sound").result()
+
+        with mock.patch("pygame.mixer.Sound", side_effect=AssertionError("leitura do disco")):
+            sound = self.registry.sound("hit_sound")
+        self.assertIs(self.registry.sound("hit_sound"), sound)
+
+    def test_prefetched_font_should_be_usable(self):
+        self.registry.prefetch_font("pixel_font").result()
+
+        with mock.patch("pathlib.Path.read_bytes", side_effect=AssertionError("leitura do disco")):
+            font = self.registry.font("pixel_font", 9)
+        self.assertGreater(font.get_height(), 0)
+
+    def test_repeated_prefetch_should_share_the_future(self):
+        first = self.registry.prefetch_image("King")
+
+        self.assertIs(self.registry.prefetch_image("King"), first)
+        first.result()
+        self.registry.image("King")
+        self.assertTrue(self.registry.prefetch_image("King").done())
+
+    def test_prefetch_errors_should_be_raised_on_use(self):
+        self.registry.prefetch_image("does_not_exist")
+
+        with self.assertRaises(FileNotFoundError):
+            self.registry.image("does_not_exist")
+
+
+if __name__ == "__main__":
+    unittest.main()
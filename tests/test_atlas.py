@@ -0,0 +1,88 @@
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import pygame
+from assets import AssetRegistry
+from atlas import build, fit, pack
+
+
+class TestPack(unittest.TestCase):
+    def test_rects_should_not_overlap_or_leave_the_page(self):
+        sizes = {f"sprite{i}": (30 + 7 * i % 50, 20 + 11 * i % 60) for i in range(40)}
+        positions = pack(sizes, page_size=128, padding=1)
+
+        rects = {name: (page, pygame.Rect(x, y, *sizes[name])) for name, (page, x, y) in positions.items()}
+        for name, (page, rect) in rects.items():
+            self.assertTrue(pygame.Rect(0, 0, 128, 128).contains(rect))
+            for other, (other_page, other_rect) in rects.items():
+                if other != name and other_page == page:
+                    self.assertFalse(rect.colliderect(other_rect), (name, other))
+
+    def test_sprite_larger_than_a_page_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            pack({"big": (200, 10)}, page_size=128)
+
+    def test_fit_should_keep_the_aspect_ratio(self):
+        self.assertEqual(fit((2000, 3000), 300), (200, 300))
+        self.assertEqual(fit((64, 96), 300), (64, 96))
+
+
+class TestAtlasRegistry(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+        (self.root / "effects").mkdir()
+        self.save("small", (40, 30), "red")
+        self.save("effects/big", (600, 900), "blue")
+        self.save("menu_bg", (64, 64), "green")
+        self.manifest = build(self.root, page_size=512, max_sprite_size=300)
+        self.registry = AssetRegistry(self.root)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def save(self, name: str, size: tuple, color: str):
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(color)
+        pygame.image.save(surface, self.root / f"{name}.png")
+
+    def test_images_should_be_subsurfaces_of_a_shared_page(self):
+        small = self.registry.image("small")
+        big = self.registry.scaled("effects/big", (75, 75))
+
+        self.assertEqual(small.get_size(), (40, 30))
+        self.assertEqual(small.get_at((0, 0)), pygame.Color("red"))
+        self.assertIsNotNone(small.get_parent())
+        self.assertGreater(big.get_at((37, 37)).b, 240) # reduzida com filtragem
+        self.assertEqual(big.get_at((37, 37)).r, 0)
+        self.assertEqual(self.registry.stats()["atlas_pages"], 1)
+
+    def test_backgrounds_should_not_be_packed(self):
+        self.assertNotIn("menu_bg", self.manifest["sprites"])
+        self.assertIsNone(self.registry.image("menu_bg").get_parent())
+
+    def test_reduced_sprites_should_only_be_used_for_smaller_sizes(self):
+        self.assertEqual(self.manifest["sprites"]["effects/big"]["rect"][2:], [200, 300])
+
+        self.assertEqual(self.registry.image("effects/big").get_size(), (600, 900))
+        self.assertEqual(self.registry.scaled("effects/big", (400, 400)).get_at((0, 0)), pygame.Color("blue"))
+
+    def test_changed_files_should_be_read_from_disk(self):
+        self.save("small", (41, 30), "yellow")
+
+        self.assertEqual(self.registry.image("small").get_at((0, 0)), pygame.Color("yellow"))
+        self.assertIsNone(self.registry.image("small").get_parent())
+
+
+if __name__ == "__main__":
+    unittest.main()
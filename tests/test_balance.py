@@ -0,0 +1,75 @@
+import io
+import json
+import unittest
+import sys
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from balance import BalanceStats, run_chunk, run_sweep, write_csv, write_json
+
+
+DECK = ["Facada_lvl_1", "Escudo_lvl_1", "Tapa_lvl_1", "Tapa_lvl_1", "Cabecada_lvl_1"]
+
+
+class TestBalance(unittest.TestCase):
+    def test_same_seed_should_give_same_stats(self):
+        first = run_chunk(DECK, ["cyclop", "water_horse"], "seed", 50)
+        second = run_chunk(DECK, ["cyclop", "water_horse"], "seed", 50)
+
+        self.assertEqual(first.to_dict(), second.to_dict())
+
+    def test_merge_should_sum_the_chunks(self):
+        first = run_chunk(DECK, ["poseidon"], "a", 30)
+        second = run_chunk(DECK, ["poseidon"], "b", 20)
+        merged = BalanceStats()
+        merged.merge(first)
+        merged.merge(second)
+
+        self.assertEqual(merged.fights, 50)
+        self.assertEqual(merged.wins, first.wins + second.wins)
+        self.assertEqual(sum(merged.hp_remaining.values()), 50)
+
+    def test_worker_count_should_not_change_results(self):
+        lineups = [["cyclop"], ["poseidon"]]
+        inline = run_sweep([DECK], lineups, 40, seed=3, workers=1, chunk_size=15)
+        pooled = run_sweep([DECK], lineups, 40, seed=3, workers=2, chunk_size=15)
+
+        self.assertEqual([stats.to_dict() for *_, stats in pooled], [stats.to_dict() for *_, stats in inline])
+        self.assertEqual([stats.fights for *_, stats in inline], [40, 40])
+
+    def test_chunk_size_should_not_change_fight_counts(self):
+        # Os lotes têm sementes próprias, então só as contagens se mantêm
+        for chunk_size in (7, 15, 40, 100):
+            report = run_sweep([DECK], [["cyclop", "water_horse"]], 40, seed=3, workers=1, chunk_size=chunk_size)
+            stats = report[0][2]
+            self.assertEqual(stats.fights, 40)
+            self.assertEqual(sum(stats.hp_remaining.values()), 40)
+
+    def test_reports_should_have_one_row_per_pair(self):
+        report = run_sweep([DECK], [["cyclop"], ["water_horse"]], 10, workers=1)
+
+        json_out = io.StringIO()
+        write_json(report, json_out)
+        self.assertEqual(len(json.loads(json_out.getvalue())), 2)
+
+        csv_out = io.StringIO()
+        write_csv(report, csv_out)
+        self.assertEqual(len(csv_out.getvalue().strip().splitlines()), 3)
+
+    def test_intervals_should_narrow_with_more_fights(self):
+        few = run_chunk(DECK, ["cyclop", "water_horse"], "a", 20)
+        many = run_chunk(DECK, ["cyclop", "water_horse"], "a", 200)
+
+        for stats in (few, many):
+            low, high = stats.win_rate_interval()
+            self.assertLessEqual(low, stats.win_rate)
+            self.assertGreaterEqual(high, stats.win_rate)
+        self.assertLess(many.hp_remaining_interval()[1] - many.hp_remaining_interval()[0],
+                        few.hp_remaining_interval()[1] - few.hp_remaining_interval()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import batch_combat
+import combat_core as core
+from balance import run_chunk
+from batch_combat import PythonShuffles, apply_overrides, np, simulate_batch
+from status_effects import EffectTypes, StatusEffect
+
+
+EFFECT_DECK = ["Veneno_lvl_1", "Veneno_lvl_1", "Forca_lvl_1", "Fraqueza_lvl_1", "Cura_lvl_1",
+               "Facada_lvl_1", "Tapa_lvl_1"]
+DECKS = [None, EFFECT_DECK, ["Pedra_lvl_1", "Tapa_lvl_1", "Escudo_lvl_1"]]
+LINEUPS = [["cyclop"], ["cyclop", "water_horse"], ["poseidon"]]
+
+
+def effect_card(effect_type: EffectTypes, parameter: str, magnitude: float, duration: int, stacking: str) -> dict:
+    return {"cost": 0, "type": "offensive_effect", "status_effect_type": effect_type,
+            "status_effect_info": {parameter: magnitude, "duration": duration, "stacking": stacking}}
+
+
+def fight_tuple(result: core.FightResult) -> tuple:
+    return result.won, result.turns, result.player_hp, result.enemy_hp, dict(result.cards_played)
+
+
+@unittest.skipIf(np is None, "NumPy não está instalado")
+class TestBatchCombat(unittest.TestCase):
+    def assertMatchesScalar(self, lineup: list, deck: list, fights: int = 60):
+        scalar = [core.simulate_fight(lineup, deck, random.Random(f"luta{i}")) for i in range(fights)]
+        batch = simulate_batch(lineup, deck, fights,
+                               shuffles=PythonShuffles([random.Random(f"luta{i}") for i in range(fights)]))
+        for index, expected in enumerate(scalar):
+            self.assertEqual(fight_tuple(batch.fight_result(index)), fight_tuple(expected), (lineup, deck, index))
+
+    def test_seeded_batch_should_match_scalar_engine(self):
+        for deck in DECKS:
+            for lineup in LINEUPS:
+                self.assertMatchesScalar(lineup, deck)
+
+    def test_compacted_effect_columns_should_match_scalar_engine(self):
+        # Colunas apertadas obrigam a compactação a cada poucos turnos
+        deck = ["Veneno_lvl_1", "Forca_lvl_1", "Tapa_lvl_1", "Tapa_lvl_1", "Escudo_lvl_1", "Cabecada_lvl_1"]
+        tight = lambda cards, deck, kind: {effect: 5 for effect in range(len(batch_combat.EFFECT_TYPES))}
+        with mock.patch("batch_combat._effect_capacity", tight), \
+             mock.patch.object(batch_combat._EffectSlots, "_compact", autospec=True,
+                               side_effect=batch_combat._EffectSlots._compact) as compact:
+            self.assertMatchesScalar(["poseidon"], deck)
+        self.assertGreater(compact.call_count, 0)
+
+    def test_numpy_shuffles_should_match_scalar_statistics(self):
+        for lineup in (["cyclop", "water_horse"], ["poseidon"]):
+            stats = simulate_batch(lineup, EFFECT_DECK, 4000, seed=5).stats()
+            expected = run_chunk(EFFECT_DECK, lineup, "estatisticas", 1000)
+
+            self.assertEqual(stats.fights, 4000)
+            self.assertEqual(sum(stats.hp_remaining.values()), 4000)
+            self.assertAlmostEqual(stats.win_rate, expected.win_rate, delta=0.03)
+            self.assertAlmostEqual(stats.mean_hp_remaining, expected.mean_hp_remaining, delta=2)
+
+    def test_overrides_should_not_change_game_data(self):
+        cards, entities = apply_overrides({"poseidon.max_hp": 1, "Tapa_lvl_1.damage": 50})
+
+        self.assertEqual(entities["entities"]["poseidon"]["max_hp"], 1)
+        self.assertEqual(core.default_entity_configurations["entities"]["poseidon"]["max_hp"], 100)
+        result = simulate_batch(["poseidon"], fights=100, seed=0, card_configurations=cards, entity_configurations=entities)
+        self.assertTrue(result.won.all())
+        self.assertEqual(result.fight_turns, 100)
+
+    def test_unknown_override_should_raise_KeyError(self):
+        with self.assertRaises(KeyError):
+            apply_overrides({"Pedra.damage": 10})
+        with self.assertRaises(KeyError):
+            apply_overrides({"Pedra_lvl_1.type": 10})
+
+    def test_effect_columns_should_match_EffectTable(self):
+        cards = {"cards": {}}
+        for stacking in ("independent", "intensity", "duration"):
+            cards["cards"][f"veneno_{stacking}"] = effect_card(EffectTypes.POISON, "damage", 5, 4, stacking)
+            cards["cards"][f"cura_{stacking}"] = effect_card(EffectTypes.REGEN, "heal", 3, 3, stacking)
+            cards["cards"][f"fraqueza_{stacking}"] = effect_card(EffectTypes.WEAKNESS, "damage_percent_debuff", 0.3, 2, stacking)
+        table = batch_combat._CardTable(cards)
+        rows = 40
+        capacity = {effect: 64 for effect in range(len(batch_combat.EFFECT_TYPES))}
+        fighter = batch_combat._Fighter(rows, {"max_hp": 400, "max_energy": 3}, np.zeros(1, dtype=int), capacity, {})
+        scalar = [core.Combatant("cyclop", 400, 3, core.CombatDeck()) for _ in range(rows)]
+
+        rng = random.Random(7)
+        for step in range(60):
+            chosen = np.array([rng.randrange(-2, len(table.names)) for _ in range(rows)])
+            fighter.offensive.apply(chosen >= 0, fighter, table, np.maximum(chosen, 0))
+            for combatant, card in zip(scalar, chosen.tolist()):
+                if card >= 0:
+                    info = cards["cards"][table.names[card]]
+                    effect = StatusEffect.from_info(info["status_effect_type"], info["status_effect_info"])
+                    combatant.applied_offensive_effects.apply(effect, combatant)
+            if step % 2:
+                fighter.offensive.tick(fighter)
+                for combatant in scalar:
+                    combatant.apply_offensive_effects()
+
+            self.assertEqual(fighter.life.tolist(), [combatant.current_life for combatant in scalar])
+            self.assertEqual(fighter.multiplier.tolist(), [combatant.damage_multiplier for combatant in scalar])
@@ -0,0 +1,177 @@
+import unittest
+import random
+import sys
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from combat_core import (CardDef, Combatant, CombatDeck, Encounter, EnemyPolicy, FirstCardPolicy, card_def,
+                         create_enemy_policy, simulate_fight)
+from game_data import DataError
+from status_effects import EffectTypes
+
+
+class TestCardRules(unittest.TestCase):
+    def setUp(self):
+        self.player = Combatant("Ulisses", 80, 3, CombatDeck.from_ids(["Facada_lvl_1", "Escudo_lvl_1", "Veneno_lvl_1"]))
+        self.enemy = Combatant("cyclop", 20, 2, CombatDeck())
+        self.player.deck.hand = list(self.player.deck.draw_pile)
+
+    def test_attack_should_consume_defense_before_life(self):
+        self.enemy.current_defense = 3
+        card_def("Facada_lvl_1").apply_card(self.player, self.enemy)
+
+        self.assertEqual(self.enemy.current_life, 15)
+        self.assertEqual(self.enemy.current_defense, 0)
+
+    def test_playing_a_card_should_charge_energy_and_discard(self):
+        card = card_def("Facada_lvl_1")
+        self.assertTrue(card.apply_card(self.player, self.enemy))
+
+        self.assertEqual(self.player.current_energy, 2)
+        self.assertNotIn(card, self.player.deck.hand)
+        self.assertIn(card, self.player.deck.discard_pile)
+
+    def test_wrong_target_should_not_play_the_card(self):
+        self.assertFalse(card_def("Escudo_lvl_1").apply_card(self.player, self.enemy))
+        self.assertFalse(card_def("Facada_lvl_1").apply_card(self.player, self.player))
+        self.assertEqual(self.player.current_energy, 3)
+
+    def test_insufficient_energy_should_not_play_the_card(self):
+        self.player.current_energy = 0
+
+        self.assertFalse(card_def("Facada_lvl_1").apply_card(self.player, self.enemy))
+        self.assertEqual(self.enemy.current_life, 20)
+
+    def test_defense_should_be_capped(self):
+        self.player.current_defense = 48
+        card_def("Escudo_lvl_1").apply_card(self.player, self.player)
+
+        self.assertEqual(self.player.current_defense, self.player.max_defense)
+
+    def test_poison_should_tick_on_application(self):
+        card_def("Veneno_lvl_1").apply_card(self.player, self.enemy)
+
+        self.assertEqual(self.enemy.current_life, 15)
+        self.assertEqual(len(self.enemy.applied_offensive_effects), 1)
+
+    def test_missing_effect_parameter_should_raise_DataError(self):
+        info = {"cost": 1, "type": "offensive_effect", "status_effect_id": 0,
+                "status_effect_type": EffectTypes.POISON, "status_effect_info": {"duration": 3}}
+        with self.assertRaises(DataError) as context:
+            CardDef(0, "Veneno_quebrado", info)
+        self.assertTrue(context.exception.errors[0].startswith("cards.Veneno_quebrado.status_effect_info"))
+
+
+class TestEncounter(unittest.TestCase):
+    def test_enemy_turn_should_end_with_player_turn(self):
+        player = Combatant.from_config("Ulisses")
+        enemy = Combatant.from_config("cyclop")
+        encounter = Encounter(player, [enemy], random.Random(0))
+        encounter.begin()
+        encounter.end_player_turn()
+
+        self.assertFalse(encounter.is_player_turn)
+        encounter.run_enemy_turn()
+        self.assertTrue(encounter.is_player_turn)
+        self.assertEqual(enemy.current_energy, enemy.max_energy)
+
+    def test_enemy_should_play_the_chosen_card(self):
+        player = Combatant.from_config("Ulisses")
+        enemy = Combatant("cyclop", 20, 2, CombatDeck.from_ids(["Escudo_lvl_1", "Facada_lvl_1"]))
+        enemy.deck.hand = list(enemy.deck.draw_pile)
+        encounter = Encounter(player, [enemy], random.Random(0))
+        encounter.is_player_turn = False
+
+        self.assertTrue(encounter.step_enemy_turn(1))
+        self.assertEqual(player.current_life, 72)
+        self.assertEqual(enemy.current_defense, 0)
+
+    def test_clone_should_not_share_state(self):
+        player = Combatant("Ulisses", 80, 3, CombatDeck.from_ids(["Veneno_lvl_1", "Facada_lvl_1"]))
+        player.deck.hand = list(player.deck.draw_pile)
+        encounter = Encounter(player, [Combatant.from_config("cyclop")], random.Random(0))
+        card_def("Veneno_lvl_1").apply_card(player, encounter.enemies[0])
+        clone = encounter.clone()
+
+        clone.enemies[0].apply_offensive_effects()
+        clone.player.deck.hand = []
+
+        self.assertEqual(encounter.enemies[0].current_life, 15)
+        self.assertEqual(encounter.enemies[0].applied_offensive_effects[0].duration, 4)
+        self.assertEqual(len(player.deck.hand), 1)
+        self.assertEqual(clone.enemies[0].current_life, 11)
+
+    def test_enemy_policy_should_come_from_the_configuration(self):
+        self.assertIsNone(create_enemy_policy(None))
+        self.assertIsInstance(create_enemy_policy("first_card"), FirstCardPolicy)
+        with self.assertRaises(ValueError):
+            create_enemy_policy({"name": "does_not_exist"})
+
+    def test_enemy_policy_without_choose_should_not_be_created(self):
+        class IncompletePolicy(EnemyPolicy):
+            background = True
+
+        with self.assertRaises(TypeError):
+            IncompletePolicy()
+
+    def test_same_seed_should_give_same_result(self):
+        first = simulate_fight(["cyclop", "water_horse"], rng=random.Random(42))
+        second = simulate_fight(["cyclop", "water_horse"], rng=random.Random(42))
+
+        self.assertEqual(first.won, second.won)
+        self.assertEqual(first.turns, second.turns)
+        self.assertEqual(first.player_hp, second.player_hp)
+        self.assertEqual(first.cards_played, second.cards_played)
+
+    def test_fight_should_end_with_a_winner(self):
+        result = simulate_fight(["poseidon"], rng=random.Random(7))
+
+        self.assertTrue(result.won or result.player_hp == 0 or result.turns == 100)
+        if result.won:
+            self.assertEqual(result.enemy_hp, 0)
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.player = Combatant("Ulisses", 80, 3, CombatDeck.from_ids(["Veneno_lvl_1", "Facada_lvl_1", "Escudo_lvl_1"]))
+        self.player.deck.hand = list(self.player.deck.draw_pile)
+        self.player.deck.draw_pile = []
+        self.enemy = Combatant.from_config("cyclop")
+        self.encounter = Encounter(self.player, [self.enemy], random.Random(0))
+
+    def test_restore_should_undo_played_cards(self):
+        snapshot = self.encounter.snapshot()
+        self.encounter.play_card(card_def("Veneno_lvl_1"), self.enemy)
+        self.enemy.apply_offensive_effects()
+        self.encounter.restore(snapshot)
+
+        self.assertEqual(self.enemy.current_life, 20)
+        self.assertEqual(len(self.enemy.applied_offensive_effects), 0)
+        self.assertEqual(self.player.current_energy, 3)
+        self.assertEqual([card.name for card in self.player.deck.hand], ["Veneno_lvl_1", "Facada_lvl_1", "Escudo_lvl_1"])
+        self.assertEqual(self.encounter.cards_played, {})
+
+    def test_snapshot_should_survive_many_restores(self):
+        self.encounter.play_card(card_def("Veneno_lvl_1"), self.enemy)
+        snapshot = self.encounter.snapshot()
+        for _ in range(3):
+            self.encounter.restore(snapshot)
+            self.encounter.end_player_turn() # O veneno age no fim do turno
+
+            self.assertEqual(self.enemy.current_life, 11)
+
+    def test_unchanged_piles_should_be_shared(self):
+        first = self.player.snapshot()
+        second = self.player.snapshot()
+
+        self.assertIs(first.deck.hand, second.deck.hand)
+        self.player.deck.discard_card(card_def("Escudo_lvl_1"))
+        self.assertIsNot(self.player.snapshot().deck.hand, first.deck.hand)
+        self.assertEqual(len(first.deck.hand), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
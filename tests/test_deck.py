@@ -0,0 +1,64 @@
+import os
+import unittest
+import random
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import pygame
+from combat_core import CARD_DEFS, Combatant, card_def
+from deck import Deck
+
+
+class TestCardDef(unittest.TestCase):
+    def test_definitions_should_be_interned_and_immutable(self):
+        card = card_def("Facada_lvl_1")
+
+        self.assertIs(card_def("Facada_lvl_1"), card)
+        self.assertIs(CARD_DEFS[card.id], card)
+        with self.assertRaises(AttributeError):
+            card.damage = 100
+
+
+class TestDeck(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.deck = Deck(["Tapa_lvl_1", "Facada_lvl_1", "Tapa_lvl_1"])
+        self.owner = Combatant("Ulisses", 80, 3, self.deck)
+        self.deck.shuffle_and_allocate(random.Random(0))
+
+    def test_piles_should_store_card_ids(self):
+        self.assertEqual(self.deck.hand_ids.typecode, "H")
+        self.assertEqual(sorted(card.name for card in self.deck.hand),
+                         ["Facada_lvl_1", "Tapa_lvl_1", "Tapa_lvl_1"])
+        self.assertEqual([card.id for card in self.deck.hand], list(self.deck.hand_ids))
+
+    def test_hand_cards_should_keep_their_position(self):
+        hand = self.deck.hand
+
+        self.assertIs(self.deck.hand, hand)
+        self.assertEqual([card.x_pos for card in hand], [100, 175, 250])
+
+    def test_playing_a_copy_should_discard_that_copy(self):
+        copies = [card for card in self.deck.hand if card.name == "Tapa_lvl_1"]
+        enemy = Combatant.from_config("cyclop")
+
+        self.assertTrue(copies[1].apply_card(self.owner, enemy))
+        self.assertIn(copies[0], self.deck.hand)
+        self.assertNotIn(copies[1], self.deck.hand)
+        self.assertEqual(len(self.deck.hand_ids), 2)
+        self.assertEqual([card.name for card in self.deck.discard_pile], ["Tapa_lvl_1"])
+
+    def test_reward_should_go_to_the_draw_pile(self):
+        card = self.deck.add_single_card("Escudo_lvl_1")
+
+        self.assertEqual(card.name, "Escudo_lvl_1")
+        self.assertEqual(self.deck.draw_pile, (card_def("Escudo_lvl_1"),))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+from itertools import product
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from deck_optimizer import (FIREPLACE, Candidate, DeckOptimizer, OptimizerResult, bucket_hp, deck_key,
+                            route_from_choices, route_stages, simulate_run)
+from outcome_cache import HP_BUCKET
+from default_map import build_default_map
+
+
+REWARDS = ["Pedra_lvl_1", "Cura_lvl_1"]
+STAGES = [("water_horse",), ("cyclop", "water_horse"), FIREPLACE, ("poseidon",)]
+
+
+class TestDeckOptimizer(unittest.TestCase):
+    def test_deck_key_should_ignore_order(self):
+        self.assertEqual(deck_key(["Tapa_lvl_1", "Facada_lvl_1", "Tapa_lvl_1"]),
+                         deck_key(["Tapa_lvl_1", "Tapa_lvl_1", "Facada_lvl_1"]))
+
+    def test_bucket_should_group_hp(self):
+        self.assertEqual(bucket_hp(1, 80), bucket_hp(HP_BUCKET, 80))
+        self.assertNotEqual(bucket_hp(HP_BUCKET, 80), bucket_hp(HP_BUCKET + 1, 80))
+        self.assertLessEqual(bucket_hp(80, 80), 80)
+
+    def test_route_stages_should_skip_root(self):
+        route = route_from_choices(build_default_map(), [1, 0, 0, 1, 0, 0])
+        self.assertEqual(route_stages(route), [("water_horse",), ("cyclop",), ("cyclop", "water_horse"),
+                                               ("cyclop",), FIREPLACE, ("poseidon",)])
+
+    def test_survival_ties_should_be_broken_by_hp(self):
+        # Somas que passam de 1 por arredondamento não decidem a escolha
+        low_hp = Candidate(("Cabecada_lvl_1",), (), {60: 0.5, 70: 0.5000000000000007})
+        high_hp = Candidate(("Fraqueza_lvl_1",), (), {80: 0.4000000000000004, 79: 0.6})
+        self.assertGreater(sum(low_hp.hp.values()), sum(high_hp.hp.values()))
+
+        self.assertIs(max([low_hp, high_hp], key=Candidate.score), high_hp)
+        self.assertLessEqual(OptimizerResult(low_hp, [], 0).win_rate, 1.0)
+
+    def test_wide_beam_should_find_best_sequence(self):
+        optimizer = DeckOptimizer(STAGES, REWARDS, fights=20, beam_width=4, workers=1)
+        result = optimizer.search()
+
+        best = max((optimizer.evaluate(picks) for picks in product(REWARDS, repeat=2)), key=lambda c: c.score())
+        self.assertEqual(len(result.picks), 1 + 0 + 1)
+        self.assertEqual((result.win_rate, result.mean_hp), (best.survival, best.mean_hp))
+        self.assertEqual(set(result.pick_scores[0]), set(REWARDS))
+
+    def test_outcomes_should_be_memoized(self):
+        optimizer = DeckOptimizer(STAGES, REWARDS, fights=10, beam_width=2, workers=1)
+        optimizer.search()
+        simulated = dict(optimizer.outcomes)
+        result = optimizer.search()
+
+        self.assertEqual(optimizer.outcomes, simulated)
+        self.assertEqual(result.simulations, len(simulated))
+        self.assertTrue(all(sum(outcome.values()) == 10 for outcome in simulated.values()))
+
+    def test_model_should_agree_with_full_runs(self):
+        stages = [("poseidon",), ("poseidon",), ("poseidon",)]
+        optimizer = DeckOptimizer(stages, REWARDS, fights=150, workers=1)
+        modeled = optimizer.evaluate(["Cura_lvl_1", "Cura_lvl_1"]).survival
+
+        self.assertAlmostEqual(simulate_run(stages, ["Cura_lvl_1", "Cura_lvl_1"], 400), modeled, delta=0.1)
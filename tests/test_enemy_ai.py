@@ -0,0 +1,80 @@
+import unittest
+import random
+import sys
+from time import perf_counter
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from combat_core import HAND_SIZE, Combatant, CombatDeck, Encounter, create_enemy_policy
+from enemy_ai import MonteCarloPolicy
+
+
+def enemy_turn(hand_ids: list, player_life: int = 80) -> Encounter:
+    player = Combatant.from_config("Ulisses")
+    player.current_life = player_life
+    enemy = Combatant("cyclop", 20, 2, CombatDeck.from_ids(hand_ids))
+    enemy.deck.hand = list(enemy.deck.draw_pile)
+    enemy.deck.draw_pile = []
+    encounter = Encounter(player, [enemy], random.Random(0))
+    encounter.is_player_turn = False
+    return encounter
+
+
+class TestMonteCarloPolicy(unittest.TestCase):
+    def test_policy_should_be_available_by_name(self):
+        policy = create_enemy_policy({"name": "mcts", "turn_budget_ms": 5})
+
+        self.assertIsInstance(policy, MonteCarloPolicy)
+        self.assertEqual(policy.turn_budget_ms, 5)
+
+    def test_search_should_find_the_lethal_attack(self):
+        encounter = enemy_turn(["Escudo_lvl_1", "Facada_lvl_1"], player_life=8)
+        encounter.enemies[0].current_energy = 1 # Apenas uma carta pode ser jogada
+        policy = MonteCarloPolicy(iterations=30, seed=1)
+
+        self.assertEqual(policy.choose(encounter, encounter.enemies[0]), 1)
+
+    def test_search_should_not_change_the_encounter(self):
+        encounter = enemy_turn(["Escudo_lvl_1", "Facada_lvl_1"])
+        enemy = encounter.enemies[0]
+        MonteCarloPolicy(iterations=20, seed=1).choose(encounter, enemy)
+
+        self.assertEqual(encounter.player.current_life, 80)
+        self.assertEqual([card.name for card in enemy.deck.hand], ["Escudo_lvl_1", "Facada_lvl_1"])
+        self.assertEqual(enemy.current_energy, 2)
+
+    def test_same_seed_should_give_same_choice(self):
+        first = enemy_turn(["Escudo_lvl_1", "Tapa_lvl_1", "Facada_lvl_1"])
+        second = enemy_turn(["Escudo_lvl_1", "Tapa_lvl_1", "Facada_lvl_1"])
+
+        self.assertEqual(MonteCarloPolicy(iterations=25, seed=3).choose(first, first.enemies[0]),
+                         MonteCarloPolicy(iterations=25, seed=3).choose(second, second.enemies[0]))
+
+    def test_search_should_respect_the_time_budget(self):
+        encounter = enemy_turn(["Escudo_lvl_1", "Tapa_lvl_1", "Facada_lvl_1"])
+        policy = MonteCarloPolicy(turn_budget_ms=50)
+        enemy = encounter.enemies[0]
+
+        rollouts = []
+        for seed in range(10):
+            sim = encounter.clone(random.Random(seed))
+            start = perf_counter()
+            policy.rollout(sim, 0, 0)
+            rollouts.append(perf_counter() - start)
+
+        choices = []
+        for _ in range(5):
+            start = perf_counter()
+            policy.choose(encounter, enemy)
+            choices.append(perf_counter() - start)
+
+        # A escolha usa no máximo 1/HAND_SIZE do orçamento, mais a simulação
+        # que já tinha começado; o menor tempo descarta as pausas do sistema
+        self.assertLess(min(choices), policy.turn_budget_ms / 1000 / HAND_SIZE + max(rollouts))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import json
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from game_data import BUNDLE_VERSION, DataError, build, compile_data, load
+from status_effects import EffectTypes
+
+
+def valid_data() -> tuple:
+    cards = {"cards": {
+        "Facada": {"name": "Facada", "cost": 1, "damage": 8, "type": "attack"},
+        "Veneno": {"name": "Veneno", "cost": 1, "type": "offensive_effect", "status_effect_id": 0,
+                   "status_effect_info": {"damage": 5, "duration": 5}},
+    }}
+    entities = {"entities": {
+        "cyclop": {"max_hp": 20, "max_energy": 2, "draw_pile": ["Facada", "Veneno"]},
+    }}
+    return cards, entities
+
+
+class TestCompileData(unittest.TestCase):
+    def assertDataError(self, cards, entities, field):
+        with self.assertRaises(DataError) as context:
+            compile_data(cards, entities)
+        self.assertTrue(any(error.startswith(field) for error in context.exception.errors),
+                        context.exception.errors)
+
+    def test_effect_ids_should_be_resolved_to_EffectTypes(self):
+        data = compile_data(*valid_data())
+
+        self.assertEqual(data["cards"]["Veneno"]["status_effect_type"], EffectTypes.POISON)
+        self.assertEqual(data["entities"]["cyclop"]["draw_pile"], ["Facada", "Veneno"])
+
+    def test_unknown_card_in_draw_pile_should_raise_DataError(self):
+        cards, entities = valid_data()
+        entities["entities"]["cyclop"]["draw_pile"].append("Facadaa")
+
+        self.assertDataError(cards, entities, "entities.cyclop.draw_pile[2]")
+
+    def test_misspelled_field_should_raise_DataError(self):
+        cards, entities = valid_data()
+        cards["cards"]["Facada"]["damge"] = cards["cards"]["Facada"].pop("damage")
+
+        self.assertDataError(cards, entities, "cards.Facada.damge")
+
+    def test_missing_effect_parameter_should_raise_DataError(self):
+        cards, entities = valid_data()
+        del cards["cards"]["Veneno"]["status_effect_info"]["damage"]
+
+        self.assertDataError(cards, entities, "cards.Veneno.status_effect_info.damage")
+
+    def test_unimplemented_effect_should_raise_DataError(self):
+        cards, entities = valid_data()
+        cards["cards"]["Veneno"]["status_effect_id"] = EffectTypes.ABSORPTION.value
+
+        self.assertDataError(cards, entities, "cards.Veneno.status_effect_id")
+
+    def test_unknown_stacking_rule_should_raise_DataError(self):
+        cards, entities = valid_data()
+        cards["cards"]["Veneno"]["status_effect_info"]["stacking"] = "forever"
+
+        self.assertDataError(cards, entities, "cards.Veneno.status_effect_info.stacking")
+
+    def test_game_data_should_be_valid(self):
+        with open(game_dir / "assets" / "cards.json") as cards, open(game_dir / "assets" / "entities.json") as entities:
+            compile_data(json.load(cards), json.load(entities))
+
+
+class TestBundle(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        root = Path(self.dir.name)
+        self.cards_path = root / "cards.json"
+        self.entities_path = root / "entities.json"
+        self.bundle_path = root / "game_data.pickle"
+        cards, entities = valid_data()
+        self.cards_path.write_text(json.dumps(cards))
+        self.entities_path.write_text(json.dumps(entities))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def load(self) -> dict:
+        return load(self.bundle_path, self.cards_path, self.entities_path)
+
+    def test_bundle_should_be_loaded_when_up_to_date(self):
+        build(self.bundle_path, self.cards_path, self.entities_path)
+        with open(self.bundle_path, "rb") as file:
+            bundle = pickle.load(file)
+        bundle["marker"] = True
+        with open(self.bundle_path, "wb") as file:
+            pickle.dump(bundle, file)
+
+        self.assertEqual(self.load()["version"], BUNDLE_VERSION)
+        self.assertTrue(self.load().get("marker"))
+
+    def test_changed_sources_should_be_recompiled(self):
+        build(self.bundle_path, self.cards_path, self.entities_path)
+        cards, entities = valid_data()
+        cards["cards"]["Facada"]["damage"] = 9
+        self.cards_path.write_text(json.dumps(cards, indent=2))
+
+        self.assertEqual(self.load()["cards"]["Facada"]["damage"], 9)
+
+    def test_invalid_data_should_not_be_built(self):
+        cards, entities = valid_data()
+        entities["entities"]["cyclop"]["policy"] = "unknown"
+        self.entities_path.write_text(json.dumps(entities))
+
+        with self.assertRaises(DataError):
+            build(self.bundle_path, self.cards_path, self.entities_path)
+        self.assertFalse(self.bundle_path.exists())
+
+    def test_command_should_report_invalid_data(self):
+        # O comando roda sobre uma cópia do jogo com um erro de digitação nos dados
+        root = Path(self.dir.name) / "game"
+        (root / "assets").mkdir(parents=True)
+        shutil.copytree(game_dir / "src", root / "src", ignore=shutil.ignore_patterns("__pycache__"))
+        cards, entities = valid_data()
+        cards["cards"]["Facada"]["dammage"] = cards["cards"]["Facada"].pop("damage")
+        (root / "assets" / "cards.json").write_text(json.dumps(cards))
+        (root / "assets" / "entities.json").write_text(json.dumps(entities))
+
+        result = subprocess.run([sys.executable, "-m", "game_data", "-o", str(self.bundle_path)],
+                                cwd=root / "src", capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("cards.Facada.dammage", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+        self.assertFalse(self.bundle_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import threading
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import pygame
+from default_map import build_default_map
+from map import ROUTES_KEY, MapScreen
+from route_analysis import RouteAnalysis
+
+
+class TestMapScreen(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((500, 350))
+        self.screen = MapScreen(pygame.Surface((500, 350)))
+        self.screen.load(build_default_map())
+
+    def test_routes_should_be_analyzed_in_background(self):
+        release = threading.Event()
+        def slow_analysis(graph):
+            release.wait(5)
+            return RouteAnalysis(graph, {})
+
+        with mock.patch("map.analyze_routes", slow_analysis):
+            self.screen.handle_event(pygame.event.Event(pygame.KEYDOWN, key=ROUTES_KEY))
+            # O evento volta antes da análise, e a tela continua sendo desenhada
+            self.assertIsNone(self.screen.routes)
+            self.screen.update()
+            self.screen.draw()
+
+            release.set()
+            self.screen.routes_future.result(timeout=5)
+            self.screen.dirty_rects()
+            self.screen.update()
+
+        self.assertIsNotNone(self.screen.routes)
+        self.assertIsNone(self.screen.dirty_rects())
+        self.screen.draw()
+
+
+if __name__ == "__main__":
+    unittest.main()
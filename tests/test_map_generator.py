@@ -0,0 +1,106 @@
+import unittest
+import sys
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from map_generator import MapGenerator
+from map_node import MapNodeType
+
+
+def collect(root) -> tuple:
+    """ Retorna os nós alcançáveis a partir de `root` e as arestas do mapa. """
+    nodes = [root]
+    seen = {root}
+    edges = []
+    for node in nodes:
+        for child in node.children:
+            edges.append((node, child))
+            if child not in seen:
+                seen.add(child)
+                nodes.append(child)
+    return nodes, edges
+
+
+def describe(root) -> list:
+    nodes, _ = collect(root)
+    index = {node: i for i, node in enumerate(nodes)}
+    return [(tuple(node.pos), node.type, node.encounter, [index[c] for c in node.children]) for node in nodes]
+
+
+class TestMapGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = MapGenerator(width=6, depth=12, seed=5)
+        self.root = self.generator.generate()
+        self.nodes, self.edges = collect(self.root)
+
+    def test_same_seed_should_generate_the_same_map(self):
+        self.assertEqual(describe(self.root), describe(MapGenerator(width=6, depth=12, seed=5).generate()))
+        self.assertNotEqual(describe(self.root), describe(MapGenerator(width=6, depth=12, seed=6).generate()))
+
+    def test_edges_should_not_cross(self):
+        # As arestas ligam camadas vizinhas; duas delas se cruzam quando a
+        # ordem horizontal dos pais é oposta à dos filhos
+        by_layer = defaultdict(list)
+        for parent, child in self.edges:
+            self.assertLess(child.pos.y, parent.pos.y)
+            by_layer[parent.pos.y].append((parent.pos.x, child.pos.x))
+        for edges in by_layer.values():
+            for parent_x, child_x in edges:
+                for other_parent_x, other_child_x in edges:
+                    self.assertFalse(parent_x < other_parent_x and child_x > other_child_x)
+
+    def test_every_path_should_lead_to_the_boss(self):
+        parents = defaultdict(int)
+        for parent, child in self.edges:
+            parents[child] += 1
+        bosses = [node for node in self.nodes if node.type == MapNodeType.BOSS]
+
+        self.assertEqual(len(bosses), 1)
+        self.assertEqual(bosses[0].encounter, ['poseidon'])
+        for node in self.nodes:
+            self.assertEqual(len(set(node.children)), len(node.children))
+            if node is not bosses[0]:
+                self.assertTrue(node.children)
+            if node is not self.root:
+                self.assertGreater(parents[node], 0)
+
+    def test_node_types_should_follow_the_layer_rules(self):
+        for node in self.root.children:
+            self.assertEqual(node.type, MapNodeType.BATTLE)
+        for parent, child in self.edges:
+            if child.type == MapNodeType.BOSS:
+                self.assertEqual(parent.type, MapNodeType.FIREPLACE)
+            elif parent.type == MapNodeType.FIREPLACE:
+                self.assertNotEqual(child.type, MapNodeType.FIREPLACE)
+        for node in self.nodes:
+            self.assertEqual(node.encounter != None, node.type in (MapNodeType.BATTLE, MapNodeType.BOSS))
+
+    def test_screens_should_come_from_screen_for(self):
+        root = MapGenerator(seed=1).generate(lambda type, encounter: (type, encounter))
+        nodes, _ = collect(root)
+
+        for node in nodes:
+            self.assertEqual(node.screen, (node.type, node.encounter))
+
+    def test_large_maps_should_be_generated_quickly(self):
+        start = perf_counter()
+        root = MapGenerator(width=100, depth=200, seed=0).generate()
+        elapsed = perf_counter() - start
+
+        self.assertGreater(len(collect(root)[0]), 10000)
+        self.assertLess(elapsed, 1.0)
+
+    def test_invalid_dimensions_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            MapGenerator(width=0)
+        with self.assertRaises(ValueError):
+            MapGenerator(width=3, min_nodes=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import sys
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from default_map import build_default_map
+from map_generator import MapGenerator
+from map_graph import MapGraph
+from map_node import MapNode, MapNodeType
+
+
+def ladder(layers: int) -> MapNode:
+    """ Mapa com dois nós por camada, cada um ligado aos dois da camada
+        seguinte: 2 ** layers caminhos até o fim.
+    """
+    root = MapNode((0, 0), MapNodeType.STORY, None)
+    previous = [root]
+    for layer in range(layers):
+        current = [MapNode((x, layer), MapNodeType.BATTLE, None) for x in range(2)]
+        for node in previous:
+            node.add_children(*current)
+        previous = current
+    return root
+
+
+class TestMapGraph(unittest.TestCase):
+    def setUp(self):
+        self.root = build_default_map()
+        self.graph = MapGraph(self.root)
+
+    def test_each_node_should_be_visited_once(self):
+        self.assertEqual(len(self.graph), 17)
+        self.assertEqual(len(set(self.graph.nodes)), 17)
+        self.assertEqual(self.graph.edge_count, 21)
+
+    def test_topological_order_should_put_parents_first(self):
+        index = self.graph.index
+        self.assertEqual(self.graph.topological_order[0], self.root)
+        self.assertEqual(self.graph.topological_order[-1].type, MapNodeType.BOSS)
+        for node in self.graph.nodes:
+            for child in node.children:
+                self.assertLess(index[node], index[child])
+
+    def test_depth_should_be_the_shortest_distance(self):
+        boss = self.graph.topological_order[-1]
+
+        self.assertEqual(self.graph.depth[self.root], 0)
+        self.assertEqual(self.graph.depth[boss], 5)
+        for node in self.root.children:
+            self.assertEqual(self.graph.depth[node], 1)
+
+    def test_reachable_sets_should_match_a_search(self):
+        def search(node):
+            found = {node}
+            for child in node.children:
+                found |= search(child)
+            return found
+
+        for node in self.graph.nodes:
+            self.assertEqual(self.graph.reachable(node), search(node))
+        boss = self.graph.topological_order[-1]
+        self.assertTrue(self.graph.can_reach(self.root, boss))
+        self.assertFalse(self.graph.can_reach(boss, self.root))
+        self.assertEqual(self.graph.parents[self.root], [])
+
+    def test_converging_paths_should_not_be_revisited(self):
+        graph = MapGraph(ladder(60)) # 2 ** 60 caminhos
+
+        self.assertEqual(len(graph), 121)
+        self.assertEqual(len(graph.reachable(graph.root)), 121)
+
+    def test_long_maps_should_not_hit_the_recursion_limit(self):
+        root = MapNode((0, 0), MapNodeType.STORY, None)
+        node = root
+        for i in range(sys.getrecursionlimit() * 2):
+            child = MapNode((0, i), MapNodeType.BATTLE, None)
+            node.add_children(child)
+            node = child
+
+        graph = MapGraph(root)
+        self.assertEqual(graph.depth[node], sys.getrecursionlimit() * 2)
+        self.assertEqual(graph.topological_order[-1], node)
+
+    def test_cycles_should_raise_ValueError(self):
+        a = MapNode((0, 0), MapNodeType.STORY, None)
+        b = MapNode((0, 1), MapNodeType.BATTLE, None)
+        c = MapNode((0, 2), MapNodeType.BATTLE, None)
+        a.add_children(b)
+        b.add_children(c)
+        c.add_children(b)
+
+        graph = MapGraph(a)
+        self.assertEqual(len(graph), 3)
+        with self.assertRaises(ValueError):
+            graph.topological_order
+
+    def test_generated_maps_should_be_fully_loaded(self):
+        graph = MapGraph(MapGenerator(width=100, depth=150, seed=2).generate())
+
+        self.assertGreater(len(graph), 7000)
+        self.assertEqual(graph.reachable_masks[graph.root].bit_count(), len(graph))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import assets
+from default_map import build_default_map
+from map import NODE_RADIUS, BOSS_NODE_RADIUS
+from map_graph import MapGraph
+from map_node import MapNodeType
+from map_trails import TrailBaker
+
+
+def node_radius(node) -> int:
+    return BOSS_NODE_RADIUS if node.type == MapNodeType.BOSS else NODE_RADIUS
+
+
+class TestTrailBaker(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.background = assets.image("map_bg")
+        self.marks = assets.image("map_trail_marks")
+        self.root = build_default_map()
+        self.graph = MapGraph(self.root)
+
+    def baker(self) -> TrailBaker:
+        baker = TrailBaker(self.background, self.marks)
+        baker.load(self.graph, node_radius)
+        return baker
+
+    def test_marks_should_be_precomputed(self):
+        baker = self.baker()
+        self.assertEqual(len(baker._marks), 2)
+        self.assertTrue(all(len(directions) == 12 for directions in baker._marks))
+        self.assertTrue(all(len(variations) == 4 for directions in baker._marks for variations in directions))
+
+    def test_bake_should_change_background_copy_only(self):
+        baker = self.baker()
+        before = pygame.image.tobytes(self.background, "RGBA")
+        baker.bake()
+        self.assertEqual(pygame.image.tobytes(self.background, "RGBA"), before)
+        self.assertNotEqual(pygame.image.tobytes(baker.surface, "RGBA"), before)
+
+    def test_incremental_bake_should_match_full_bake(self):
+        baker = self.baker()
+        baker.bake()
+
+        child = self.root.children[0]
+        self.root.navigate_to(child)
+        baker.invalidate_node(child)
+        rects = baker.bake()
+        self.assertGreater(len(rects), 0)
+        self.assertLess(len(rects), len(list(baker._all_tiles())))
+
+        full = self.baker()
+        full.bake()
+        self.assertEqual(pygame.image.tobytes(baker.surface, "RGBA"), pygame.image.tobytes(full.surface, "RGBA"))
+
+    def test_cached_map_should_be_loaded(self):
+        # Com uma janela aberta, o mapa lido é convertido para o formato dela
+        pygame.display.set_mode((100, 100))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = self.baker()
+            first.bake_all(cache_dir)
+            self.assertEqual(len(list(Path(cache_dir).glob("map_*.png"))), 1)
+
+            second = self.baker()
+            second.bake = lambda: self.fail("O mapa deveria ter sido lido do disco")
+            second.bake_all(cache_dir)
+            self.assertEqual(pygame.image.tobytes(second.surface, "RGBA"), pygame.image.tobytes(first.surface, "RGBA"))
+
+    def test_cache_key_should_depend_on_visited_nodes(self):
+        baker = self.baker()
+        key = baker.cache_key()
+        self.assertEqual(self.baker().cache_key(), key)
+        self.root.navigate_to(self.root.children[0])
+        self.assertNotEqual(baker.cache_key(), key)
+        self.assertNotEqual(baker.cache_key("outra imagem"), baker.cache_key())
@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import combat_core as core
+from balance import run_sweep
+from deck_optimizer import DeckOptimizer
+from outcome_cache import ENGINE_VERSION, HP_BUCKET, OutcomeCache, bucket_hp, deck_key, outcome_key
+
+
+DECK = ["Facada_lvl_1", "Escudo_lvl_1", "Tapa_lvl_1", "Tapa_lvl_1", "Cabecada_lvl_1"]
+
+
+class TestOutcomeCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.dir.name) / "cache" / "outcomes.sqlite"
+        self.cache = OutcomeCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.dir.cleanup()
+
+    def test_cached_outcome_should_not_be_simulated_again(self):
+        first = self.cache.get(DECK, ["poseidon"], fights=40)
+        self.assertEqual(self.cache.simulated, 40)
+
+        with OutcomeCache(self.path) as reopened:
+            second = reopened.get(list(reversed(DECK)), ["poseidon"], fights=30)
+            self.assertEqual(reopened.simulated, 0)
+        self.assertEqual(second.to_dict(), first.to_dict())
+
+    def test_missing_fights_should_be_added(self):
+        self.cache.get(DECK, ["cyclop", "water_horse"], fights=30)
+        stats = self.cache.get(DECK, ["cyclop", "water_horse"], fights=50)
+
+        self.assertEqual(self.cache.simulated, 50)
+        self.assertEqual(stats.fights, 50)
+        self.assertEqual(sum(stats.hp_remaining.values()), 50)
+        self.assertEqual(sum(stats.won_hp.values()), stats.wins)
+
+    def test_start_hp_should_share_buckets(self):
+        max_hp = core.default_entity_configurations['entities']['Ulisses']['max_hp']
+        self.assertEqual(bucket_hp(max_hp, max_hp), max_hp)
+        self.assertEqual(bucket_hp(1, max_hp), bucket_hp(HP_BUCKET, max_hp))
+
+        self.cache.get_many([(DECK, ["poseidon"], 33), (DECK, ["poseidon"], 34), (DECK, ["poseidon"], None)], 20)
+        self.assertEqual(self.cache.simulated, 40)
+        self.assertEqual(sorted(start_hp for *_, start_hp, stats in self.cache.entries()), [bucket_hp(33, max_hp), max_hp])
+
+    def test_key_should_change_with_game_data(self):
+        deck = deck_key(DECK)
+        key = outcome_key(deck, ("poseidon",), 80)
+
+        self.assertNotEqual(outcome_key(deck, ("cyclop", "water_horse"), 80), outcome_key(deck, ("water_horse", "cyclop"), 80))
+        with mock.patch.dict(core.default_card_configurations['cards']['Tapa_lvl_1'], {"damage": 99}):
+            self.assertNotEqual(outcome_key(deck, ("poseidon",), 80), key)
+        with mock.patch("outcome_cache.ENGINE_VERSION", ENGINE_VERSION + 1):
+            self.assertNotEqual(outcome_key(deck, ("poseidon",), 80), key)
+        self.assertEqual(outcome_key(deck, ("poseidon",), 80), key)
+
+    def test_unknown_card_should_raise_KeyError(self):
+        with self.assertRaises(KeyError):
+            self.cache.get(["Pedra"], ["poseidon"], fights=1)
+
+    def test_sweep_should_reuse_cached_pairs(self):
+        lineups = [["cyclop"], ["poseidon"]]
+        first = run_sweep([DECK], lineups, 30, workers=1, cache=self.cache)
+        second = run_sweep([DECK], lineups, 30, workers=1, cache=self.cache)
+
+        self.assertEqual(self.cache.simulated, 60)
+        self.assertEqual([stats.to_dict() for *_, stats in second], [stats.to_dict() for *_, stats in first])
+
+    def test_optimizer_should_reuse_cached_outcomes(self):
+        stages = [("water_horse",), ("poseidon",)]
+        rewards = ["Pedra_lvl_1", "Cura_lvl_1"]
+        first = DeckOptimizer(stages, rewards, fights=10, workers=1, cache=self.cache).search()
+        simulated = self.cache.simulated
+        second = DeckOptimizer(stages, rewards, fights=10, workers=1, cache=self.cache).search()
+
+        self.assertEqual(self.cache.simulated, simulated)
+        self.assertEqual((second.picks, second.win_rate, second.mean_hp), (first.picks, first.win_rate, first.mean_hp))
+
+    def test_prune_should_remove_other_engine_versions(self):
+        self.cache.get(DECK, ["cyclop"], fights=5)
+        with mock.patch("outcome_cache.ENGINE_VERSION", ENGINE_VERSION + 1):
+            self.cache.get(DECK, ["cyclop"], fights=5)
+            self.assertEqual(self.cache.prune(), 1)
+        self.assertEqual([engine for engine, *_ in self.cache.entries()], [ENGINE_VERSION + 1])
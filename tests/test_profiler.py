@@ -0,0 +1,81 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import pygame
+from profiler import FrameProfiler, percentile
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        self.profiler = FrameProfiler(record=True)
+        for _ in range(10):
+            self.profiler.begin_frame("MapScreen")
+            self.profiler.mark("events")
+            self.profiler.mark("update")
+            self.profiler.mark("draw")
+            self.profiler.end_frame()
+
+    def test_percentile_should_use_nearest_rank(self):
+        values = list(range(101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_only_measured_phases_should_be_summarized(self):
+        summary = self.profiler.summary()
+
+        self.assertEqual(set(summary), {"frame", "events", "update", "draw"})
+        p50, p95, p99 = summary["frame"]
+        self.assertLessEqual(p50, p95)
+        self.assertLessEqual(p95, p99)
+
+    def test_profiler_without_record_should_not_keep_records(self):
+        profiler = FrameProfiler()
+        profiler.begin_frame("MenuScreen")
+        profiler.mark("draw")
+        profiler.end_frame()
+
+        self.assertIsNone(profiler.records)
+        self.assertEqual(len(profiler.window["draw"]), 1)
+
+    def test_export_should_write_chrome_trace_and_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = Path(tmp) / "frames.json"
+            csv_path = Path(tmp) / "frames.csv"
+            self.profiler.export(trace_path)
+            self.profiler.export(csv_path)
+
+            events = json.loads(trace_path.read_text())["traceEvents"]
+            self.assertEqual(len(events), 30)
+            self.assertEqual(events[0]["ph"], "X")
+            self.assertEqual(events[0]["cat"], "MapScreen")
+
+            with open(csv_path) as file:
+                rows = list(csv.reader(file))
+            self.assertEqual(rows[0], ["frame", "screen", "phase", "start_ms", "duration_ms"])
+            self.assertEqual(len(rows), 31)
+
+    def test_overlay_should_draw_on_surface(self):
+        surface = pygame.Surface((300, 200))
+        surface.fill((255, 0, 0))
+        self.profiler.draw_overlay(surface)
+
+        # O fundo semitransparente escurece a região do overlay
+        self.assertLess(surface.get_at((5, 5)).r, 255)
+        self.assertEqual(surface.get_at((299, 199)).r, 255)
+
+
+if __name__ == "__main__":
+    unittest.main()
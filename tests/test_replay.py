@@ -0,0 +1,114 @@
+import unittest
+import sys
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from combat_core import card_def
+from replay import Action, GameRun, HeadlessRun, ReplayLog, replay
+
+
+def play(seed: int, choices: list) -> ReplayLog:
+    """ Joga uma partida sem telas, seguindo `choices` no mapa e jogando a
+        primeira carta possível da mão no primeiro inimigo vivo, e retorna as
+        ações gravadas.
+    """
+    log = ReplayLog(seed)
+    run = HeadlessRun(seed)
+
+    def apply(action, a=0, b=0):
+        run.apply(action, a, b)
+        log.record(action, a, b)
+
+    for choice in choices:
+        apply(Action.MAP_CHOICE, choice)
+        while run.encounter != None and run.player.check_is_alive():
+            played = False
+            for hand_index, card in enumerate(run.player.deck.hand):
+                if card.type in ('defense', 'defensive_effect'):
+                    target_index = 0
+                else:
+                    target_index = next(i + 1 for i, enemy in enumerate(run.encounter.enemies)
+                                        if enemy.check_is_alive())
+                target = run.player if target_index == 0 else run.encounter.enemies[target_index - 1]
+                if card.validate_application(run.player, target):
+                    apply(Action.PLAY_CARD, hand_index, target_index)
+                    played = True
+                    break
+            if not played:
+                apply(Action.END_TURN)
+        if run.encounter == None and run.wins:
+            apply(Action.CONTINUE)
+    return log
+
+
+class TestReplayLog(unittest.TestCase):
+    def test_log_should_survive_serialization(self):
+        log = ReplayLog(2**64 - 1, [(Action.MAP_CHOICE, 2, 0), (Action.PLAY_CARD, 4, 1), (Action.END_TURN, 0, 0)])
+        data = log.to_bytes()
+        loaded = ReplayLog.from_bytes(data)
+
+        self.assertEqual(len(data), 13 + 3 * 3)
+        self.assertEqual(loaded.seed, log.seed)
+        self.assertEqual(loaded.actions, log.actions)
+
+    def test_invalid_data_should_raise_ValueError(self):
+        data = ReplayLog(1, [(Action.END_TURN, 0, 0)]).to_bytes()
+
+        with self.assertRaises(ValueError):
+            ReplayLog.from_bytes(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            ReplayLog.from_bytes(data[:-1])
+
+
+class TestGameRun(unittest.TestCase):
+    def test_streams_should_depend_only_on_the_seed(self):
+        first, second = GameRun(3), GameRun(3)
+        first.reward_rng.random() # Não afeta os embaralhamentos
+
+        self.assertEqual(first.shuffle_rng.random(), second.shuffle_rng.random())
+        self.assertNotEqual(GameRun(3).shuffle_rng.random(), GameRun(4).shuffle_rng.random())
+
+    def test_actions_should_only_be_recorded_when_enabled(self):
+        run = GameRun(1, record=False)
+        run.record(Action.END_TURN)
+
+        self.assertIsNone(run.log)
+
+
+class TestHeadlessRun(unittest.TestCase):
+    def test_replay_should_reproduce_the_run(self):
+        log = play(seed=11, choices=[2, 0, 1])
+        first = replay(log)
+        second = replay(ReplayLog.from_bytes(log.to_bytes()))
+
+        self.assertGreater(first.fights, 0)
+        self.assertEqual(first.rewards, second.rewards)
+        self.assertEqual(first.player.current_life, second.player.current_life)
+        self.assertEqual([c.name for c in first.player.deck.draw_pile],
+                         [c.name for c in second.player.deck.draw_pile])
+
+    def test_played_copy_should_be_discarded(self):
+        # Regressão: com cópias não vizinhas na mão, a carta descartada é a da
+        # posição gravada, como no jogo, e não a primeira cópia
+        run = HeadlessRun(0)
+        run.apply(Action.MAP_CHOICE, 0)
+        run.player.deck.hand = [card_def(card_id) for card_id in ("Tapa_lvl_1", "Cabecada_lvl_1", "Tapa_lvl_1", "Facada_lvl_1")]
+        run.apply(Action.PLAY_CARD, 2, 1)
+
+        self.assertEqual([card.name for card in run.player.deck.hand], ["Tapa_lvl_1", "Cabecada_lvl_1", "Facada_lvl_1"])
+        self.assertEqual(run.player.deck.discard_pile[-1].name, "Tapa_lvl_1")
+
+    def test_invalid_action_should_raise_ValueError(self):
+        run = HeadlessRun(0)
+
+        with self.assertRaises(ValueError):
+            run.apply(Action.MAP_CHOICE, 9)
+        with self.assertRaises(ValueError):
+            run.apply(Action.END_TURN)
+
+
+if __name__ == "__main__":
+    unittest.main()
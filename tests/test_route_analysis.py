@@ -0,0 +1,69 @@
+import unittest
+import sys
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from default_map import build_default_map
+from map_generator import MapGenerator
+from map_graph import MapGraph
+from map_node import MapNode, MapNodeType
+from route_analysis import RouteAnalysis, encounter_hp_loss
+
+
+LOSS = {('cyclop',): 10.0, ('water_horse',): 4.0, ('cyclop', 'water_horse'): 18.0, ('poseidon',): 50.0}
+
+
+def all_routes(node: MapNode) -> list:
+    """ Enumera as rotas até os bosses; apenas para mapas pequenos. """
+    if node.type == MapNodeType.BOSS:
+        return [[node]]
+    return [[node] + route for child in node.children for route in all_routes(child)]
+
+
+class TestRouteAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.root = build_default_map()
+        self.analysis = RouteAnalysis(MapGraph(self.root), LOSS)
+        self.routes = all_routes(self.root)
+
+    def route_loss(self, route: list) -> float:
+        return sum(LOSS[tuple(node.encounter)] for node in route if node.encounter)
+
+    def test_route_count_should_match_enumeration(self):
+        self.assertEqual(self.analysis.route_count, len(self.routes))
+
+    def test_measures_should_match_enumeration(self):
+        summary = self.analysis.summary()
+        fireplaces = [sum(node.type == MapNodeType.FIREPLACE for node in route) for route in self.routes]
+        losses = [self.route_loss(route) for route in self.routes]
+
+        self.assertEqual(summary["fireplaces"]["min"], min(fireplaces))
+        self.assertEqual(summary["fireplaces"]["max"], max(fireplaces))
+        self.assertAlmostEqual(summary["fireplaces"]["mean"], sum(fireplaces) / len(fireplaces))
+        self.assertAlmostEqual(summary["hp_loss"]["min"], min(losses))
+        self.assertAlmostEqual(summary["hp_loss"]["max"], max(losses))
+        self.assertAlmostEqual(summary["hp_loss"]["mean"], sum(losses) / len(losses))
+
+    def test_safest_route_should_have_minimum_loss(self):
+        route = self.analysis.safest_route()
+        self.assertEqual(route[0], self.root)
+        self.assertEqual(route[-1].type, MapNodeType.BOSS)
+        self.assertAlmostEqual(self.route_loss(route), min(self.route_loss(r) for r in self.routes))
+
+        child = self.root.children[0]
+        self.assertEqual(self.analysis.safest_route(child)[0], child)
+
+    def test_generated_map_should_not_overflow(self):
+        graph = MapGraph(MapGenerator(width=6, depth=300, seed=2).generate())
+        summary = RouteAnalysis(graph, LOSS).summary()
+        self.assertGreater(summary["routes"], 2 ** 64)
+        self.assertLessEqual(summary["hp_loss"]["min"], summary["hp_loss"]["mean"])
+        self.assertLessEqual(summary["hp_loss"]["mean"], summary["hp_loss"]["max"])
+
+    def test_encounter_loss_should_come_from_simulations(self):
+        loss = encounter_hp_loss([['cyclop'], ['cyclop']], fights=20, workers=1)
+        self.assertEqual(list(loss), [('cyclop',)])
+        self.assertGreaterEqual(loss[('cyclop',)], 0)
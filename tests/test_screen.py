@@ -0,0 +1,54 @@
+import unittest
+import sys
+from pathlib import Path
+from pygame import Rect
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from screen import Screen
+
+
+class StaticScreen(Screen):
+    def handle_event(self, event): pass
+    def update(self): pass
+    def draw(self): pass
+    def dirty_rects(self):
+        return self._take_dirty_rects()
+
+
+class TestDirtyRects(unittest.TestCase):
+    def setUp(self):
+        self.screen = StaticScreen()
+        self.screen.dirty_rects() # Descarta o primeiro frame, sempre completo
+
+    def test_first_frame_should_redraw_everything(self):
+        self.assertIsNone(StaticScreen().dirty_rects())
+
+    def test_idle_screen_should_report_no_changes(self):
+        self.assertEqual(self.screen.dirty_rects(), [])
+
+    def test_invalidated_regions_should_be_reported_once(self):
+        self.screen.invalidate((0, 0, 10, 10))
+        self.screen.invalidate(Rect(20, 20, 5, 5))
+
+        self.assertEqual(self.screen.dirty_rects(), [Rect(0, 0, 10, 10), Rect(20, 20, 5, 5)])
+        self.assertEqual(self.screen.dirty_rects(), [])
+
+    def test_full_invalidation_should_take_precedence(self):
+        self.screen.invalidate((0, 0, 10, 10))
+        self.screen.invalidate()
+        self.screen.invalidate((20, 20, 5, 5))
+
+        self.assertIsNone(self.screen.dirty_rects())
+
+    def test_screens_should_redraw_everything_by_default(self):
+        class AnyScreen(StaticScreen):
+            dirty_rects = Screen.dirty_rects
+
+        self.assertIsNone(AnyScreen().dirty_rects())
+
+
+if __name__ == "__main__":
+    unittest.main()
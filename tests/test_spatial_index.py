@@ -0,0 +1,47 @@
+import unittest
+import random
+import sys
+from pathlib import Path
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from map_node import MapNode, MapNodeType
+from spatial_index import SpatialGrid
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.nodes = [MapNode((rng.uniform(-500, 500), rng.uniform(-500, 500)), MapNodeType.BATTLE, None)
+                      for _ in range(2000)]
+        self.grid = SpatialGrid(self.nodes, cell_size=40)
+
+    def test_radius_query_should_match_brute_force(self):
+        for center, radius in [((0, 0), 32), ((-480, 310), 75), ((123.5, -7.25), 5), ((900, 900), 20)]:
+            expected = {node for node in self.nodes if (node.pos - center).length() < radius}
+
+            found = self.grid.query_radius(center, radius)
+            self.assertEqual(set(found), expected)
+            distances = [(node.pos - center).length() for node in found]
+            self.assertEqual(distances, sorted(distances))
+
+    def test_rect_query_should_match_brute_force(self):
+        for rect in [(-100, -50, 250, 175), (-1000, -1000, 2000, 2000), (499, 499, 1, 1), (-33, 12, 0, 10)]:
+            x, y, w, h = rect
+            expected = {node for node in self.nodes if x <= node.pos.x < x + w and y <= node.pos.y < y + h}
+
+            self.assertEqual(set(self.grid.query_rect(rect)), expected)
+
+    def test_nodes_on_cell_borders_should_be_found(self):
+        node = MapNode((80, 40), MapNodeType.STORY, None)
+        grid = SpatialGrid([node], cell_size=40)
+
+        self.assertEqual(grid.query_radius((79, 39), 2), [node])
+        self.assertEqual(grid.query_rect((80, 40, 1, 1)), [node])
+        self.assertEqual(len(grid), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
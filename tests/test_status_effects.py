@@ -0,0 +1,88 @@
+import unittest
+import sys
+from pathlib import Path
+from time import perf_counter
+
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+from combat_core import Combatant, CombatDeck
+from status_effects import EffectTypes, StatusEffect
+
+
+def poison(duration: int, damage: int, stacking: str = None) -> StatusEffect:
+    return StatusEffect(EffectTypes.POISON, duration, damage, stacking)
+
+
+class TestEffectTable(unittest.TestCase):
+    def setUp(self):
+        self.target = Combatant("cyclop", 1000, 1, CombatDeck())
+        self.table = self.target.applied_offensive_effects
+
+    def test_effects_expiring_together_should_all_be_removed(self):
+        for _ in range(3):
+            self.table.apply(poison(2, 1), self.target)
+        self.assertEqual(len(self.table), 3)
+
+        self.target.apply_offensive_effects()
+        self.assertEqual(len(self.table), 0)
+        self.assertEqual(self.target.current_life, 1000 - 3)
+
+    def test_tick_should_apply_the_sum_of_each_type(self):
+        self.table.apply(poison(5, 5), self.target)
+        self.table.apply(poison(3, 2), self.target)
+        self.assertEqual(self.target.current_life, 1000 - 5 - 2)
+
+        self.target.apply_offensive_effects()
+        self.assertEqual(self.target.current_life, 993 - 4 - 1)
+        self.assertEqual([(effect.duration, effect.magnitude) for effect in self.table], [(3, 3), (1, 0)])
+
+    def test_multipliers_should_be_applied_per_type(self):
+        table = self.target.applied_defensive_effects
+        table.apply(StatusEffect(EffectTypes.STRENGTH, 3, 0.5), self.target)
+        table.apply(StatusEffect(EffectTypes.WEAKNESS, 3, 0.25), self.target)
+        self.target.clear_multipliers()
+
+        self.target.apply_defensive_effects()
+        self.assertAlmostEqual(self.target.damage_multiplier, 1.25)
+
+    def test_intensity_stacking_should_merge_magnitudes(self):
+        self.table.apply(poison(3, 4, "intensity"), self.target)
+        self.table.apply(poison(5, 4, "intensity"), self.target)
+
+        self.assertEqual(list(self.table), [(EffectTypes.POISON, 4, 6)])
+
+    def test_duration_stacking_should_extend_the_effect(self):
+        self.table.apply(poison(3, 4, "duration"), self.target)
+        self.table.apply(poison(3, 2, "duration"), self.target)
+
+        self.assertEqual(list(self.table), [(EffectTypes.POISON, 4, 3)])
+
+    def test_copy_should_not_share_columns(self):
+        self.table.apply(poison(3, 4), self.target)
+        copy = self.table.copy()
+        copy.tick(self.target)
+
+        self.assertEqual(self.table[0].duration, 2)
+        self.assertEqual(copy[0].duration, 1)
+
+    def test_dead_target_should_keep_effects(self):
+        self.table.apply(poison(3, 4), self.target)
+        self.target.current_life = 0
+        self.target.apply_offensive_effects()
+
+        self.assertEqual(self.table[0].duration, 2)
+
+    def test_tick_cost_should_not_grow_with_stacked_poisons(self):
+        def tick_time(stacks: int) -> float:
+            target = Combatant("cyclop", 10 ** 9, 1, CombatDeck())
+            for _ in range(stacks):
+                target.applied_offensive_effects.apply(poison(10 ** 6, 1), target)
+            start = perf_counter()
+            for _ in range(2000):
+                target.apply_offensive_effects()
+            return perf_counter() - start
+
+        few, many = tick_time(1), tick_time(64)
+        self.assertLess(many, few * 4)
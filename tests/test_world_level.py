@@ -0,0 +1,161 @@
+import os
+import unittest
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+game_dir = Path(__file__).parent.parent
+sys.path.append(f"{game_dir}/src")
+
+import pygame
+import assets
+from unittest import mock
+from entities import SpriteState, Ulisses
+from replay import GameRun
+from screen import Screen
+from world_level import CombatLevel
+
+
+class EmptyScreen(Screen):
+    def handle_event(self, event): pass
+    def update(self): pass
+    def draw(self, alpha: float = 1.0): pass
+
+
+class TestCombatLevel(unittest.TestCase):
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((500, 350))
+        self.surface = pygame.Surface((500, 350)).convert()
+        self.level = CombatLevel(self.surface, background_name="combat_bg", staged_enemies=["cyclop"],
+                                 ulisses=Ulisses(), next_screen=EmptyScreen(), run=GameRun(1))
+
+    def test_static_layer_should_be_composed_on_enter(self):
+        self.level.onenter()
+        layer = self.level.static_layer
+
+        x, y = self.level.static_layer_pos
+        self.assertTrue(layer.get_rect(topleft=(x, y)).contains(self.surface.get_rect()))
+        self.assertEqual(layer.get_bitsize(), pygame.display.get_surface().get_bitsize())
+        self.assertEqual(layer.get_flags() & pygame.SRCALPHA, 0)
+        # O círculo da energia faz parte da camada fixa
+        self.assertEqual(layer.get_at((35 - x, 250 - y)), pygame.Color('#3dad62'))
+
+        self.level.draw()
+        self.level.draw()
+        self.assertIs(self.level.static_layer, layer)
+
+    def test_draw_should_compose_layer_without_onenter(self):
+        self.level.draw()
+        self.assertIsNotNone(self.level.static_layer)
+        self.assertEqual(self.surface.get_at((35, 250)), pygame.Color('#3dad62'))
+
+    def test_bars_should_keep_background_beside_value(self):
+        self.level.onenter()
+        ulisses = self.level.ulisses
+        ulisses.current_life = ulisses.max_hp // 2
+        self.level.draw()
+
+        x, y = ulisses.rect.centerx - 62 + 25, ulisses.y_pos - 35 - 13
+        self.assertEqual(self.surface.get_at((x + 1, y + 8)), pygame.Color('red'))
+        self.assertEqual(self.surface.get_at((x + 63, y + 8)), pygame.Color('grey'))
+
+    def frames_until_rest(self) -> list:
+        # Roda frames até o jogador poder agir de novo, guardando as regiões de cada um
+        level, frames = self.level, []
+        for _ in range(500):
+            level.update()
+            frames.append(level.dirty_rects())
+            if not level.was_busy:
+                break
+        frames.append(level.dirty_rects())
+        return frames
+
+    def test_turn_handover_should_redraw_the_whole_screen(self):
+        self.level.onenter()
+        self.level.end_player_turn()
+        self.assertFalse(self.level.is_player_turn)
+
+        frames = self.frames_until_rest()
+        self.assertTrue(self.level.is_player_turn)
+        self.assertIsNone(frames[-2])
+        self.assertEqual(frames[-1], [])
+
+    def test_end_of_animation_should_redraw_the_whole_screen(self):
+        self.level.onenter()
+        self.frames_until_rest()
+        self.level.ulisses.engage_attack()
+        self.level.instantiated_enemies[0].engage_hit()
+        self.assertIsNone(self.level.dirty_rects())
+
+        frames = self.frames_until_rest()
+        self.assertIsNone(frames[-2])
+        self.assertEqual(frames[-1], [])
+
+
+class TestSteadyStateFrames(unittest.TestCase):
+    """ Regressão: depois do primeiro frame, um combate inteiro (golpes, mortes e
+        novas mãos) não lê nenhum arquivo.
+    """
+
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((500, 350))
+        self.surface = pygame.Surface((500, 350)).convert()
+        self.level = CombatLevel(self.surface, background_name="combat_bg", staged_enemies=["cyclop", "water_horse"],
+                                 ulisses=Ulisses(), next_screen=EmptyScreen(), run=GameRun(3))
+
+    def play_frame(self):
+        level = self.level
+        if level.is_player_turn and not level.check_enemy_animating():
+            # Joga a primeira carta possível no primeiro inimigo vivo ou em Ulisses
+            ulisses = level.ulisses
+            enemy_index = next(i for i, enemy in enumerate(level.instantiated_enemies) if enemy.check_is_alive())
+            targets = [(enemy_index + 1, level.instantiated_enemies[enemy_index]), (0, ulisses)]
+            plays = [(card, index) for card in ulisses.deck.hand for index, target in targets
+                     if card.check_energy(ulisses) and card.check_target(ulisses, target)]
+            if plays:
+                level.play_card(*plays[0])
+            else:
+                level.end_player_turn()
+        next_screen = level.update()
+        level.draw()
+        return next_screen
+
+    def test_combat_frames_should_not_read_files(self):
+        self.level.onenter()
+        self.level.draw()
+        for enemy in self.level.instantiated_enemies:
+            enemy.current_life = 25
+
+        reads = []
+        def counting(function):
+            def wrapper(*args, **kwargs):
+                reads.append(args[:1])
+                return function(*args, **kwargs)
+            return wrapper
+
+        with mock.patch("pygame.image.load", counting(pygame.image.load)), \
+             mock.patch("pygame.mixer.Sound", counting(pygame.mixer.Sound)), \
+             mock.patch("assets.Font", counting(assets.Font)), \
+             mock.patch("builtins.open", counting(open)):
+            for _ in range(2000):
+                if self.play_frame() != None:
+                    break
+
+        self.assertTrue(self.level.check_win())
+        self.assertTrue(all(enemy.sprite_state == SpriteState.DEAD for enemy in self.level.instantiated_enemies))
+        self.assertEqual(reads, [])
+
+    def test_death_should_switch_sprite_once(self):
+        self.level.onenter()
+        self.level.draw()
+        enemy = self.level.instantiated_enemies[0]
+        enemy.current_life = 0
+        with mock.patch.object(enemy, "death_animate", wraps=enemy.death_animate) as death_animate:
+            for _ in range(5):
+                self.level.update()
+        self.assertEqual(death_animate.call_count, 1)
+        self.assertIs(enemy.sprite, enemy.sprites[SpriteState.DEAD])